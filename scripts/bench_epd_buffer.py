@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Compare PanelBufferPacker against the Waveshare epd7in3f getbuffer.
+
+Uses the real driver when ``waveshare_epd`` imports (on the Pi), otherwise a
+line-for-line copy of the vendor routine. Checks that the default ``vendor``
+mode is byte-identical and reports timings for every mode.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from weatherdisplay.config import Settings  # noqa: E402
+from weatherdisplay.hardware.epd_buffer import BUFFER_MODES, PanelBufferPacker  # noqa: E402
+
+
+def reference_getbuffer(image: Image.Image) -> list[int]:
+    """Copy of ``epd7in3f.EPD.getbuffer`` from the Waveshare e-Paper library."""
+    pal_image = Image.new("P", (1, 1))
+    pal_image.putpalette(
+        (0, 0, 0, 255, 255, 255, 0, 255, 0, 0, 0, 255, 255, 0, 0, 255, 255, 0, 255, 128, 0) + (0, 0, 0) * 249
+    )
+    image_7color = image.convert("RGB").quantize(palette=pal_image)
+    buf_7color = bytearray(image_7color.tobytes("raw"))
+    buf = [0x00] * int(800 * 480 / 2)
+    idx = 0
+    for i in range(0, len(buf_7color), 2):
+        buf[idx] = (buf_7color[i] << 4) + buf_7color[i + 1]
+        idx += 1
+    return buf
+
+
+def vendor_getbuffer():
+    try:
+        from waveshare_epd import epd7in3f
+
+        return "waveshare_epd", epd7in3f.EPD().getbuffer
+    except Exception:  # no driver or no GPIO access off-device
+        return "reference copy", reference_getbuffer
+
+
+def sample_frame(settings: Settings) -> Image.Image:
+    """A frame with the same ingredients as a real one: palette fills, anti-aliased text, a card."""
+    image = Image.new("RGB", (800, 480), settings.color("white"))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(str(settings.fonts["text"]), 68)
+    small = ImageFont.truetype(str(settings.fonts["text"]), 24)
+    draw.text((20, 18), "12:34", font=font, fill=settings.color("black"))
+    for row, name in enumerate(settings.palette):
+        draw.text((20, 120 + row * 32), f"{name} 72° 40%", font=small, fill=settings.color(name))
+        draw.rectangle([(260, 120 + row * 32), (380, 145 + row * 32)], fill=settings.color(name))
+    cards = sorted(settings.clothing_dir.glob("*.png"))
+    if cards:
+        image.paste(Image.open(cards[0]).convert("RGB").resize((400, 480)), (400, 0))
+    return image
+
+
+def timeit(fn, image: Image.Image, runs: int) -> tuple[list[float], object]:
+    result = None
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(image)
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    import os
+
+    os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+    settings = Settings.from_env(ROOT / ".env")
+    image = sample_frame(settings)
+
+    label, getbuffer = vendor_getbuffer()
+    vendor_times, vendor_buffer = timeit(getbuffer, image, args.runs)
+    vendor_bytes = bytes(vendor_buffer)
+    print(f"{'getbuffer (' + label + ')':<32} median {statistics.median(vendor_times) * 1000:8.1f} ms")
+
+    status = 0
+    for mode in BUFFER_MODES:
+        if mode == "driver":
+            continue
+        packer = PanelBufferPacker(settings.palette, mode)
+        times, buffer = timeit(packer.pack, image, args.runs)
+        note = ""
+        if mode == "vendor":
+            identical = bytes(buffer) == vendor_bytes
+            note = "byte-identical" if identical else "MISMATCH"
+            status |= 0 if identical else 1
+        print(f"{'packer ' + mode:<32} median {statistics.median(times) * 1000:8.1f} ms  {note}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
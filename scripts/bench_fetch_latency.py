@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Show that OpenWeatherClient.fetch_bundle waits for max(a, b), not a + b.
+
+The client's HTTP session is replaced by one that sleeps for a fixed latency per
+endpoint before answering with a synthetic payload, so no network is needed.
+With ``--stub`` the client instead talks real HTTP to an in-process
+``owm_stub_server`` that injects the same latency.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import bench_fixtures  # noqa: E402
+from weatherdisplay.config import Settings  # noqa: E402
+from weatherdisplay.services.openweather import OpenWeatherClient  # noqa: E402
+
+
+def _payloads(now: int) -> dict[str, dict]:
+    return {
+        "current": bench_fixtures.current_payload(800, "Clear", "clear sky", 72.0, now),
+        "forecast": bench_fixtures.forecast_payload(70.0, 0.1, now),
+    }
+
+
+class _Response:
+    status_code = 200
+    headers: dict[str, str] = {}
+
+    def __init__(self, payload: dict) -> None:
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict:
+        return json.loads(self.content)
+
+
+class SlowSession:
+    def __init__(self, latency: dict[str, float]) -> None:
+        self._latency = latency
+        self._payloads = _payloads(int(time.time()))
+
+    def get(self, url: str, **_kwargs: object) -> _Response:
+        name = "forecast" if url.rstrip("/").endswith("forecast") else "current"
+        time.sleep(self._latency[name])
+        return _Response(self._payloads[name])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--current", type=float, default=0.8, help="Latency of the current request (s)")
+    parser.add_argument("--forecast", type=float, default=1.2, help="Latency of the forecast request (s)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--stub", action="store_true", help="Go through the local stub server over HTTP")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+    settings = Settings.from_env(ROOT / ".env")
+    settings.cache_dir = Path(tempfile.mkdtemp(prefix="owm-bench-"))
+    settings.current_cache_ttl = 0
+    settings.forecast_cache_ttl = 0
+
+    latency = {"current": args.current, "forecast": args.forecast}
+    if args.stub:
+        from owm_stub_server import DEFAULT_FIXTURES, Faults, StubServer, load_fixtures
+
+        server = StubServer(("127.0.0.1", 0), load_fixtures(DEFAULT_FIXTURES), Faults(latency=latency, etag=False))
+        server.start()
+        settings.openweather_base_url = server.base_url
+        client = OpenWeatherClient(settings)
+    else:
+        client = OpenWeatherClient(settings)
+        client._session = SlowSession(latency)
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        client.fetch_bundle()
+        timings.append(time.perf_counter() - started)
+
+    serial = args.current + args.forecast
+    parallel = max(args.current, args.forecast)
+    best = min(timings)
+    print(f"latency current={args.current:.2f}s forecast={args.forecast:.2f}s")
+    print(f"serial bound a+b   = {serial:.3f}s")
+    print(f"parallel bound max = {parallel:.3f}s")
+    print(f"fetch_bundle       = best {best:.3f}s, worst {max(timings):.3f}s over {args.runs} run(s)")
+    if best >= serial:
+        print("FAIL: requests are not overlapping")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+"""Synthetic OpenWeather payloads and render inputs shared by the benchmark scripts.
+
+Conditions cover every icon family in ``assets/icons/weather_icon_map.json``
+(day and night for clear skies), and the temperatures and rain chances reach
+every slug ``choose_clothing_card`` can pick.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+# (condition code, OpenWeather "main", description)
+CONDITIONS: Tuple[Tuple[int, str, str], ...] = (
+    (211, "Thunderstorm", "thunderstorm"),
+    (301, "Drizzle", "drizzle"),
+    (501, "Rain", "moderate rain"),
+    (601, "Snow", "snow"),
+    (701, "Mist", "mist"),
+    (711, "Smoke", "smoke"),
+    (721, "Haze", "haze"),
+    (731, "Dust", "sand/dust whirls"),
+    (741, "Fog", "fog"),
+    (751, "Sand", "sand"),
+    (762, "Ash", "volcanic ash"),
+    (771, "Squall", "squalls"),
+    (781, "Tornado", "tornado"),
+    (800, "Clear", "clear sky"),
+    (801, "Clouds", "few clouds"),
+    (803, "Clouds", "broken clouds"),
+)
+# Temperatures (°F) and rain chances chosen to land on cold, mild, hot and rain cards.
+CLIMATES: Tuple[Tuple[float, float], ...] = ((38.0, 0.0), (68.0, 0.1), (93.0, 0.0), (61.0, 0.8))
+
+
+def current_payload(
+    code: int,
+    main: str,
+    description: str,
+    temp: float,
+    dt: Optional[int] = None,
+    daytime: bool = True,
+) -> dict[str, Any]:
+    dt = int(time.time()) if dt is None else dt
+    sunrise, sunset = (dt - 3600, dt + 3600) if daytime else (dt + 3600, dt + 7200)
+    return {
+        "coord": {"lon": -97.7432, "lat": 30.2578},
+        "weather": [{"id": code, "main": main, "description": description, "icon": "01d"}],
+        "base": "stations",
+        "main": {
+            "temp": temp,
+            "feels_like": temp - 1.5,
+            "temp_min": temp - 3,
+            "temp_max": temp + 3,
+            "pressure": 1015,
+            "humidity": 48,
+        },
+        "visibility": 10000,
+        "wind": {"speed": 7.4, "deg": 160, "gust": 12.1},
+        "clouds": {"all": 20},
+        "dt": dt,
+        "sys": {"country": "US", "sunrise": sunrise, "sunset": sunset},
+        "timezone": -18000,
+        "id": 4671654,
+        "name": "Austin",
+        "cod": 200,
+    }
+
+
+def forecast_payload(temp: float, pop: float, dt: Optional[int] = None, count: int = 40) -> dict[str, Any]:
+    dt = int(time.time()) if dt is None else dt
+    blocks = []
+    for index in range(count):
+        code, main, description = CONDITIONS[index % len(CONDITIONS)]
+        block_dt = dt - dt % 10800 + 10800 * (index + 1)
+        blocks.append(
+            {
+                "dt": block_dt,
+                "main": {
+                    "temp": temp + (index % 8) - 4,
+                    "feels_like": temp + (index % 8) - 5,
+                    "temp_min": temp - 5,
+                    "temp_max": temp + 5,
+                    "pressure": 1014,
+                    "sea_level": 1014,
+                    "grnd_level": 990,
+                    "humidity": 40 + index % 50,
+                    "temp_kf": 0,
+                },
+                "weather": [{"id": code, "main": main, "description": description, "icon": "02d"}],
+                "clouds": {"all": 40},
+                "wind": {"speed": 5.0 + index % 6, "deg": 180, "gust": 9.0},
+                "visibility": 10000,
+                "pop": pop,
+                "sys": {"pod": "d"},
+                "dt_txt": datetime.fromtimestamp(block_dt, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        )
+    return {"cod": "200", "message": 0, "cnt": count, "list": blocks, "city": {"id": 4671654, "name": "Austin"}}
+
+
+def payload_pairs() -> Iterator[Tuple[dict[str, Any], dict[str, Any]]]:
+    """(current, forecast) response pairs covering every icon family and clothing slug."""
+    dt = int(time.time())
+    for index, (code, main, description) in enumerate(CONDITIONS):
+        temp, pop = CLIMATES[index % len(CLIMATES)]
+        yield current_payload(code, main, description, temp, dt), forecast_payload(temp, pop, dt)
+    code, main, description = CONDITIONS[-3]  # clear sky at night
+    yield current_payload(code, main, description, 55.0, dt, daytime=False), forecast_payload(55.0, 0.0, dt)
+
+
+def battery_statuses() -> List[Any]:
+    from weatherdisplay.models import BatteryStatus
+
+    return [
+        None,
+        BatteryStatus(5.1, 5.15, 0.42, True, False, 0),
+        BatteryStatus(0.0, 4.85, 0.51, False, False, 0),
+        BatteryStatus(0.0, 4.66, 0.55, False, False, 0),
+    ]
+
+
+def render_payloads(client: Any, clothing_dir: Path) -> List[Any]:
+    """RenderPayloads pairing every condition with every card in ``clothing_dir`` (and none)."""
+    from weatherdisplay.models import RenderPayload
+
+    cards: List[Optional[str]] = [str(path) for path in sorted(clothing_dir.glob("*.png"))] + [None]
+    bundles = [client.parse_bundle(current, forecast) for current, forecast in payload_pairs()]
+    batteries = battery_statuses()
+    now = datetime.now(timezone.utc)
+    payloads = []
+    for index in range(max(len(bundles), len(cards))):
+        payloads.append(
+            RenderPayload(
+                weather=bundles[index % len(bundles)],
+                battery=batteries[index % len(batteries)],
+                clothing_image=cards[index % len(cards)],
+                last_updated=now + timedelta(minutes=10 * index),
+                stale_since=now if index % 5 == 4 else None,
+            )
+        )
+    return payloads
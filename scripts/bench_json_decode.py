@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Compare decoding OpenWeather responses whole against the projected decoder.
+
+Decodes the recorded responses in ``scripts/fixtures/openweather`` and the
+synthetic ones from ``bench_fixtures`` three ways: ``json.loads`` of the whole
+body (what ``resp.json()`` did), the stdlib streaming projection, and orjson
+plus projection when orjson is installed. Reports the median time per body and
+the peak and retained allocations (tracemalloc), and checks that every path
+parses to the same WeatherBundle.
+
+    python scripts/bench_json_decode.py
+    python scripts/bench_json_decode.py --repeat 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import bench_fixtures  # noqa: E402
+from weatherdisplay.config import Settings  # noqa: E402
+from weatherdisplay.services import owm_decode  # noqa: E402
+from weatherdisplay.services.openweather import OpenWeatherClient  # noqa: E402
+
+FIXTURES = ROOT / "scripts" / "fixtures" / "openweather"
+
+
+def bodies() -> List[Tuple[str, bytes, bytes]]:
+    """(label, current body, forecast body): the recorded pair, then the synthetic ones."""
+    pairs = [("recorded", (FIXTURES / "current.json").read_bytes(), (FIXTURES / "forecast.json").read_bytes())]
+    for index, (current, forecast) in enumerate(bench_fixtures.payload_pairs()):
+        pairs.append((f"synthetic-{index}", json.dumps(current).encode(), json.dumps(forecast).encode()))
+    return pairs
+
+
+def decoders() -> Dict[str, Callable[[str, bytes], Any]]:
+    paths: Dict[str, Callable[[str, bytes], Any]] = {
+        "json.loads": lambda endpoint, body: json.loads(body),
+        "stream": lambda endpoint, body: owm_decode.decode_payload(endpoint, body, fast=False),
+    }
+    if owm_decode.orjson is not None:
+        paths["orjson"] = owm_decode.decode_payload
+    return paths
+
+
+def measure(decode: Callable[[str, bytes], Any], endpoint: str, body: bytes, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(endpoint, body)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    payload = decode(endpoint, body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del payload
+    return {"us": statistics.median(timings) * 1e6, "peak_kib": peak / 1024, "kept_kib": retained / 1024}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Timed decodes of each body")
+    args = parser.parse_args()
+
+    client = OpenWeatherClient(Settings.from_mapping(dict(os.environ, OPENWEATHER_API_KEY="benchmark")))
+    paths = decoders()
+    pairs = bodies()
+    rows: Dict[Tuple[str, str], List[Dict[str, float]]] = {}
+    for label, current, forecast in pairs:
+        expected = client.parse_bundle(json.loads(current), json.loads(forecast))
+        for name, decode in paths.items():
+            bundle = client.parse_bundle(decode("current", current), decode("forecast", forecast))
+            if bundle != expected:
+                print(f"{name} parses {label} differently from json.loads")
+                return 1
+            for endpoint, body in (("current", current), ("forecast", forecast)):
+                rows.setdefault((endpoint, name), []).append(measure(decode, endpoint, body, max(1, args.repeat)))
+
+    metrics = ("us", "peak_kib", "kept_kib")
+    print(f"{'':<22}" + "".join(f"{metric:>12}" for metric in metrics) + f"{'vs json.loads':>16}")
+    for endpoint in ("current", "forecast"):
+        baseline = statistics.median(sample["us"] for sample in rows[(endpoint, "json.loads")])
+        for name in paths:
+            samples = rows[(endpoint, name)]
+            medians = {metric: statistics.median(sample[metric] for sample in samples) for metric in metrics}
+            print(
+                f"{endpoint + ' ' + name:<22}"
+                + "".join(f"{medians[metric]:>12.1f}" for metric in metrics)
+                + f"{medians['us'] / baseline - 1:>+16.0%}"
+            )
+    sizes = sorted(len(forecast) for _, _, forecast in pairs)
+    print(
+        f"(median over {len(pairs)} response pair(s), forecast bodies {sizes[0]}-{sizes[-1]} bytes, "
+        f"{args.repeat} timed decode(s) each; orjson {'installed' if 'orjson' in paths else 'not installed'})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Benchmark the stages of a wake: settings, icon font, parsing, rendering and display.
+
+Each stage runs in a fresh spawned interpreter so its peak RSS is measured in
+isolation. Timings are per call after ``--warmup`` untimed calls; the renderer
+and display stages reuse one instance across calls (a warm glyph atlas and card
+cache), which is what a daemon sees. Results are written as JSON; pass
+``--baseline`` to compare against an earlier run and exit non-zero on a
+regression.
+
+    python scripts/bench_pipeline.py --save-baseline      # on a known-good tree
+    python scripts/bench_pipeline.py --baseline var/bench/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import bench_fixtures  # noqa: E402
+
+STAGES = ("settings", "icon_font", "parse", "render", "display_show")
+DEFAULT_OUTPUT = ROOT / "var" / "bench" / "latest.json"
+DEFAULT_BASELINE = ROOT / "var" / "bench" / "baseline.json"
+
+
+def _settings(cache_dir: Path):
+    from weatherdisplay.config import Settings
+
+    os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+    settings = Settings.from_env(ROOT / ".env")
+    settings.cache_dir = cache_dir
+    settings.mock_display = True
+    return settings
+
+
+def _stage_settings(cache_dir: Path) -> Callable[[int], Any]:
+    from weatherdisplay.config import Settings
+
+    os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+    return lambda _: Settings.from_env(ROOT / ".env")
+
+
+def _stage_icon_font(cache_dir: Path) -> Callable[[int], Any]:
+    from PIL import ImageFont
+
+    from weatherdisplay.utils.icon_font import MaterialIconFont
+
+    settings = _settings(cache_dir)
+
+    def load(_: int) -> Any:
+        icons = MaterialIconFont(settings.fonts["icons"], settings.icon_codepoints)
+        return icons, ImageFont.truetype(str(settings.fonts["icons"]), 120)
+
+    return load
+
+
+def _stage_parse(cache_dir: Path) -> Callable[[int], Any]:
+    from weatherdisplay.services.openweather import OpenWeatherClient
+
+    client = OpenWeatherClient(_settings(cache_dir))
+    pairs = list(bench_fixtures.payload_pairs())
+    # One call parses every fixture pair; a single pair is too quick to time reliably.
+    return lambda _: [client.parse_bundle(current, forecast) for current, forecast in pairs]
+
+
+def _stage_render(cache_dir: Path) -> Callable[[int], Any]:
+    from weatherdisplay.render.layout import LayoutRenderer
+    from weatherdisplay.services.openweather import OpenWeatherClient
+
+    settings = _settings(cache_dir)
+    payloads = bench_fixtures.render_payloads(OpenWeatherClient(settings), settings.clothing_dir)
+    renderer = LayoutRenderer(settings)
+    return lambda index: renderer.build(payloads[index % len(payloads)])
+
+
+def _stage_display_show(cache_dir: Path) -> Callable[[int], Any]:
+    from weatherdisplay.hardware.display import DisplayDriver
+    from weatherdisplay.render.layout import LayoutRenderer
+    from weatherdisplay.services.openweather import OpenWeatherClient
+
+    settings = _settings(cache_dir)
+    payloads = bench_fixtures.render_payloads(OpenWeatherClient(settings), settings.clothing_dir)
+    renderer = LayoutRenderer(settings)
+    # Consecutive frames always differ, so every call takes the refresh path.
+    frames = [renderer.build(payload) for payload in payloads]
+    driver = DisplayDriver(settings)
+    return lambda index: driver.show(frames[index % len(frames)])
+
+
+def run_stage(name: str, runs: int, warmup: int) -> Dict[str, Any]:
+    """Set up ``name`` and time ``runs`` calls; runs inside the spawned worker."""
+    with tempfile.TemporaryDirectory(prefix="wd-bench-") as tmp:
+        started = time.perf_counter()
+        call = globals()[f"_stage_{name}"](Path(tmp))
+        setup = time.perf_counter() - started
+        for index in range(warmup):
+            call(index)
+        timings = []
+        for index in range(runs):
+            started = time.perf_counter()
+            call(warmup + index)
+            timings.append(time.perf_counter() - started)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_kib = peak // 1024 if sys.platform == "darwin" else peak
+    return {"setup_s": setup, "timings_s": timings, "peak_rss_kib": peak_kib}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(raw: Dict[str, Any]) -> Dict[str, Any]:
+    timings = raw["timings_s"]
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    return {
+        "runs": len(timings),
+        "setup_ms": ms(raw["setup_s"]),
+        "mean_ms": ms(sum(timings) / len(timings)),
+        "p50_ms": ms(percentile(timings, 0.50)),
+        "p90_ms": ms(percentile(timings, 0.90)),
+        "p99_ms": ms(percentile(timings, 0.99)),
+        "max_ms": ms(max(timings)),
+        "peak_rss_kib": raw["peak_rss_kib"],
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float,
+    rss_tolerance: float,
+    min_delta_ms: float = 1.0,
+) -> List[str]:
+    """Describe every stage whose p50/p90 or peak RSS grew beyond tolerance.
+
+    Timing changes smaller than ``min_delta_ms`` are treated as noise.
+    """
+    regressions = []
+    for name, stage in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            continue
+        for metric, tolerance in (("p50_ms", time_tolerance), ("p90_ms", time_tolerance), ("peak_rss_kib", rss_tolerance)):
+            limit = before[metric] * (1 + tolerance)
+            if metric.endswith("_ms"):
+                limit = max(limit, before[metric] + min_delta_ms)
+            if stage[metric] > limit:
+                regressions.append(
+                    f"{name}.{metric}: {stage[metric]:g} > {before[metric]:g} (+{tolerance:.0%} allowed)"
+                )
+    return regressions
+
+
+def print_table(results: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    print(f"{'stage':<14}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'mean ms':>10}{'RSS MiB':>10}")
+    for name, stage in results["stages"].items():
+        line = (
+            f"{name:<14}{stage['p50_ms']:>10.2f}{stage['p90_ms']:>10.2f}{stage['p99_ms']:>10.2f}"
+            f"{stage['max_ms']:>10.2f}{stage['mean_ms']:>10.2f}{stage['peak_rss_kib'] / 1024:>10.1f}"
+        )
+        before = (baseline or {}).get("stages", {}).get(name)
+        if before:
+            line += f"   p50 {stage['p50_ms'] / before['p50_ms'] - 1:+.0%} vs baseline"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30, help="Timed calls per stage")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls per stage before timing")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Only run this stage (repeatable)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, help="Compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--time-tolerance", type=float, default=0.20, help="Allowed p50/p90 growth (fraction)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.10, help="Allowed peak RSS growth (fraction)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore timing changes below this")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    results: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "warmup": args.warmup,
+        },
+        "stages": {},
+    }
+    for name in args.stage or STAGES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            raw = pool.submit(run_stage, name, args.runs, args.warmup).result()
+        results["stages"][name] = summarize(raw)
+
+    print_table(results, baseline)
+    text = json.dumps(results, indent=2)
+    targets = [args.output] + ([DEFAULT_BASELINE] if args.save_baseline else [])
+    for target in targets:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text + "\n")
+        print(f"Wrote {target}")
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.time_tolerance, args.rss_tolerance, args.min_delta_ms)
+    if regressions:
+        print("\n" + "!" * 72, file=sys.stderr)
+        print(f"PERFORMANCE REGRESSION against {args.baseline}:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        print("!" * 72, file=sys.stderr)
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
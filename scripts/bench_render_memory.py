@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare peak memory and frame time of the RGB and palette render paths.
+
+Each mode runs in a fresh interpreter that sets up a renderer and a packer, then
+renders the fixture payloads, hashes the tiles the display diffs and packs the
+panel buffer, as a wake does. Peak RSS is read after set-up, after the first
+frame and after the last one.
+
+    python scripts/bench_render_memory.py
+    python scripts/bench_render_memory.py --runs 5 --frames 40
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+MODES = ("rgb", "palette")
+
+
+def peak_rss_kib() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def render_frames(mode: str, frames: int) -> Dict[str, Any]:
+    """Render ``frames`` frames in ``mode``; runs in a fresh interpreter."""
+    import bench_fixtures
+    from weatherdisplay.config import Settings
+    from weatherdisplay.hardware.epd_buffer import PanelBufferPacker
+    from weatherdisplay.hardware.regions import TileGrid
+    from weatherdisplay.render.layout import HEIGHT, WIDTH, LayoutRenderer
+    from weatherdisplay.services.openweather import OpenWeatherClient
+
+    settings = Settings.from_mapping(dict(os.environ, OPENWEATHER_API_KEY="benchmark", RENDER_MODE=mode))
+    payloads = bench_fixtures.render_payloads(OpenWeatherClient(settings), settings.clothing_dir)
+    with tempfile.TemporaryDirectory(prefix="wd-render-") as tmp:
+        settings.cache_dir = Path(tmp)  # cold glyph atlas and card cache, as on a first wake
+        renderer = LayoutRenderer(settings)
+        grid = TileGrid((WIDTH, HEIGHT), settings.display_tile_size)
+        packer = PanelBufferPacker(settings.palette, "nearest")
+        setup_rss = peak_rss_kib()
+        timings: List[float] = []
+        first_rss = setup_rss
+        for index in range(frames):
+            started = time.perf_counter()
+            image = renderer.build(payloads[index % len(payloads)])
+            grid.hashes(image)
+            packer.pack(image)
+            timings.append(time.perf_counter() - started)
+            if index == 0:
+                first_rss = peak_rss_kib()
+    return {
+        "setup_rss_kib": setup_rss,
+        "first_frame_rss_kib": first_rss,
+        "peak_rss_kib": peak_rss_kib(),
+        "first_frame_ms": timings[0] * 1000,
+        "frame_ms": statistics.median(timings[1:] or timings) * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode")
+    parser.add_argument("--frames", type=int, default=20, help="Frames rendered by each interpreter")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(ROOT / "scripts"))
+        print(json.dumps(render_frames(args.child, max(1, args.frames))))
+        return 0
+
+    rows: Dict[str, List[Dict[str, Any]]] = {mode: [] for mode in MODES}
+    for _ in range(args.runs):
+        for mode in MODES:
+            command = [sys.executable, __file__, "--child", mode, "--frames", str(args.frames)]
+            rows[mode].append(json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout))
+    metrics = ("setup_rss_kib", "first_frame_rss_kib", "peak_rss_kib", "first_frame_ms", "frame_ms")
+    print(f"{'':<10}" + "".join(f"{metric:>21}" for metric in metrics))
+    medians = {}
+    for mode, samples in rows.items():
+        medians[mode] = {metric: statistics.median(sample[metric] for sample in samples) for metric in metrics}
+        print(f"{mode:<10}" + "".join(f"{medians[mode][metric]:>21.1f}" for metric in metrics))
+    change = {
+        metric: medians["palette"][metric] / medians["rgb"][metric] - 1 if medians["rgb"][metric] else 0.0
+        for metric in metrics
+    }
+    print(f"{'change':<10}" + "".join(f"{change[metric]:>+21.0%}" for metric in metrics))
+    print(f"(median of {args.runs} interpreter(s) per mode, {args.frames} frame(s) each)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
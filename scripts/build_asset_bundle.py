@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Compile the asset bundle loaded at start-up, and measure what it saves.
+
+The bundle (``var/cache/assets.bundle``) holds the icon map, the codepoints of
+the icons it names, the clothing card index and, when fontTools is installed,
+the text and icon fonts subset to the glyphs the layout draws. Start-up
+rebuilds it without subsetting whenever a source changes; run this script after
+changing fonts or icons to get the subset fonts back.
+
+    python scripts/build_asset_bundle.py
+    python scripts/build_asset_bundle.py --measure 20    # cold starts with and without the bundle
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+FACES = {
+    "time": ("text", 68),
+    "data": ("text", 32),
+    "small": ("text", 24),
+    "icon": ("icons", 120),
+    "icon_small": ("icons", 48),
+}
+
+
+def cold_start(use_bundle: bool) -> Dict[str, Any]:
+    """Start-up asset work of one wake; runs in a fresh interpreter."""
+    from PIL import ImageFont  # noqa: F401  imported up front so its cost is not billed to the fonts
+
+    started = time.perf_counter()
+    from weatherdisplay.config import Settings
+
+    values = dict(os.environ, OPENWEATHER_API_KEY="benchmark", ASSET_BUNDLE="1" if use_bundle else "0")
+    settings = Settings.from_mapping(values)
+    settings_done = time.perf_counter()
+
+    from weatherdisplay.render.glyph_atlas import GlyphAtlas
+    from weatherdisplay.utils.icon_font import MaterialIconFont
+
+    assets = settings.assets
+    icons = MaterialIconFont(settings.fonts["icons"], settings.icon_codepoints, assets.glyphs if use_bundle else None)
+    for entry in settings.icon_map.values():
+        icons.glyph(entry["icon"])
+    icons_done = time.perf_counter()
+
+    font_data = {settings.fonts[name]: data for name, data in assets.fonts.items()} if use_bundle else None
+    with tempfile.TemporaryDirectory(prefix="wd-assets-") as tmp:
+        faces = {face: (settings.fonts[font], size) for face, (font, size) in FACES.items()}
+        atlas = GlyphAtlas(Path(tmp) / "atlas.bin", faces, 1 << 20, font_data=font_data)
+        for face in faces:
+            atlas.font(face)
+    fonts_done = time.perf_counter()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "settings_ms": (settings_done - started) * 1000,
+        "icons_ms": (icons_done - settings_done) * 1000,
+        "fonts_ms": (fonts_done - icons_done) * 1000,
+        "total_ms": (fonts_done - started) * 1000,
+        "peak_rss_kib": peak // 1024 if sys.platform == "darwin" else peak,
+    }
+
+
+def measure(runs: int) -> None:
+    rows: Dict[str, List[Dict[str, Any]]] = {"sources": [], "bundle": []}
+    for _ in range(runs):
+        for mode in rows:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode], capture_output=True, text=True, check=True
+            ).stdout
+            rows[mode].append(json.loads(output))
+    metrics = ("settings_ms", "icons_ms", "fonts_ms", "total_ms", "peak_rss_kib")
+    print(f"{'':<10}" + "".join(f"{metric:>14}" for metric in metrics))
+    medians = {}
+    for mode, samples in rows.items():
+        medians[mode] = {metric: statistics.median(sample[metric] for sample in samples) for metric in metrics}
+        print(f"{mode:<10}" + "".join(f"{medians[mode][metric]:>14.2f}" for metric in metrics))
+    change = {
+        metric: medians["bundle"][metric] / medians["sources"][metric] - 1 if medians["sources"][metric] else 0.0
+        for metric in metrics
+    }
+    print(f"{'change':<10}" + "".join(f"{change[metric]:>+14.0%}" for metric in metrics))
+    print(f"(median of {runs} cold start(s) each)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-subset", action="store_true", help="Keep the fonts out of the bundle")
+    parser.add_argument("--measure", type=int, metavar="RUNS", help="Compare cold starts with and without the bundle")
+    parser.add_argument("--child", choices=("sources", "bundle"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(cold_start(args.child == "bundle")))
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-8s %(name)s - %(message)s")
+    from weatherdisplay.config import ASSET_BUNDLE_NAME, ROOT as APP_ROOT, asset_sources
+    from weatherdisplay.utils.asset_bundle import build_bundle
+
+    path = APP_ROOT / "var" / "cache" / ASSET_BUNDLE_NAME
+    bundle = build_bundle(path, asset_sources(), subset=not args.no_subset)
+    fonts = ", ".join(f"{name} {len(data)} bytes" for name, data in sorted(bundle.fonts.items())) or "none"
+    print(
+        f"Wrote {path} ({path.stat().st_size} bytes): {len(bundle.glyphs)} icon glyph(s), "
+        f"{len(bundle.clothing_cards)} card(s) in {bundle.clothing_dir}, subset fonts: {fonts}"
+    )
+    if args.measure:
+        measure(args.measure)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
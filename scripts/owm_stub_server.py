@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Local OpenWeatherMap stand-in with latency and failure injection.
+
+Serves ``/weather`` and ``/forecast`` under any path prefix by replaying the
+recorded payloads in ``--fixtures`` (``current.json`` and ``forecast.json``).
+Timestamps in the recordings are shifted by whole 3-hour steps to the server's
+start time, which keeps the forecast blocks in the future. Point the
+client at it with::
+
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8765/data/2.5 MOCK_DISPLAY=1 python src/main.py
+
+Faults are drawn per request from ``--seed`` so a run can be replayed. Latency
+accepts a single value or per-endpoint values (``current=0.8,forecast=1.2``).
+``GET /_stub/stats`` returns request and fault counters as JSON.
+
+``--record`` fetches fresh payloads from the live API (using ``.env``) into the
+fixtures directory and exits.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "openweather"
+ENDPOINTS = {"weather": "current", "forecast": "forecast"}
+_TIMESTAMP_KEYS = {"dt", "sunrise", "sunset"}
+
+
+def parse_per_endpoint(value: str) -> Dict[str, float]:
+    """``"0.5"`` applies to both endpoints; ``"current=0.8,forecast=1.2"`` sets each."""
+    if "=" not in value:
+        return {name: float(value) for name in ENDPOINTS.values()}
+    result = {name: 0.0 for name in ENDPOINTS.values()}
+    for part in value.split(","):
+        name, _, amount = part.partition("=")
+        if name.strip() not in result:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}")
+        result[name.strip()] = float(amount)
+    return result
+
+
+@dataclass(slots=True)
+class Faults:
+    """Per-request fault injection. Rates are probabilities in [0, 1]."""
+
+    latency: Dict[str, float] = field(default_factory=dict)
+    jitter: float = 0.0
+    bandwidth: int = 0  # bytes/s; 0 is unlimited
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (429, 500, 502, 503)
+    retry_after: Optional[int] = 30
+    truncate_rate: float = 0.0
+    reset_rate: float = 0.0
+    etag: bool = True
+
+
+def rebase(payload: Any, offset: int) -> Any:
+    """Shift every epoch timestamp in ``payload`` by ``offset`` seconds."""
+    if isinstance(payload, dict):
+        shifted = {}
+        for key, value in payload.items():
+            if key in _TIMESTAMP_KEYS and isinstance(value, int):
+                shifted[key] = value + offset
+            elif key == "dt_txt" and isinstance(payload.get("dt"), int):
+                shifted[key] = datetime.fromtimestamp(payload["dt"] + offset, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                shifted[key] = rebase(value, offset)
+        return shifted
+    if isinstance(payload, list):
+        return [rebase(item, offset) for item in payload]
+    return payload
+
+
+def load_fixtures(directory: Path, now: Optional[int] = None) -> Dict[str, bytes]:
+    """Encoded response bodies keyed by endpoint, rebased to ``now``."""
+    current = json.loads((directory / "current.json").read_text())
+    forecast = json.loads((directory / "forecast.json").read_text())
+    now = int(time.time()) if now is None else now
+    # Keep the 3-hour forecast grid aligned while moving it to the present.
+    offset = (now - int(current["dt"])) // 10800 * 10800
+    return {
+        "current": json.dumps(rebase(current, offset), separators=(",", ":")).encode("utf-8"),
+        "forecast": json.dumps(rebase(forecast, offset), separators=(",", ":")).encode("utf-8"),
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], bodies: Dict[str, bytes], faults: Faults, seed: Optional[int] = None) -> None:
+        super().__init__(address, _Handler)
+        self.bodies = bodies
+        self.faults = faults
+        self.stats: Counter[str] = Counter()
+        self.verbose = False
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def choice(self, options: Tuple[int, ...]) -> int:
+        with self._lock:
+            return self._random.choice(options)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread (for in-process benchmarks)."""
+        thread = threading.Thread(target=self.serve_forever, name="owm-stub", daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/_stub/stats":
+            self._send(200, json.dumps(dict(self.server.stats)).encode("utf-8"))
+            return
+        name = ENDPOINTS.get(path.rsplit("/", 1)[-1])
+        if name is None:
+            self._send(404, b'{"cod":"404","message":"not found"}')
+            return
+
+        server, faults = self.server, self.server.faults
+        server.count(f"{name}.requests")
+        delay = faults.latency.get(name, 0.0)
+        if faults.jitter:
+            with server._lock:
+                delay += server._random.uniform(0, faults.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if server.roll(faults.reset_rate):
+            server.count(f"{name}.reset")
+            self._reset()
+            return
+        if server.roll(faults.error_rate):
+            status = server.choice(faults.error_statuses)
+            server.count(f"{name}.{status}")
+            headers = {}
+            if status == 429 and faults.retry_after is not None:
+                headers["Retry-After"] = str(faults.retry_after)
+            self._send(status, json.dumps({"cod": status, "message": "injected"}).encode("utf-8"), headers)
+            return
+
+        body = server.bodies[name]
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if faults.etag and self.headers.get("If-None-Match") == etag:
+            server.count(f"{name}.304")
+            self._send(304, b"", {"ETag": etag})
+            return
+        truncate = server.roll(faults.truncate_rate)
+        server.count(f"{name}.{'truncated' if truncate else 200}")
+        self._send(200, body, {"ETag": etag} if faults.etag else {}, truncate=truncate)
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None, truncate: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if truncate:
+            # Advertise the full length, send half, then drop the connection.
+            self._write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self._write(body)
+
+    def _write(self, body: bytes) -> None:
+        bandwidth = self.server.faults.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        chunk = max(1, bandwidth // 20)
+        for start in range(0, len(body), chunk):
+            self.wfile.write(body[start : start + chunk])
+            self.wfile.flush()
+            time.sleep(len(body[start : start + chunk]) / bandwidth)
+
+    def _reset(self) -> None:
+        """Close with SO_LINGER=0 so the client sees a TCP RST instead of a clean EOF."""
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.close_connection = True
+        self.connection.close()
+
+    def finish(self) -> None:
+        try:
+            super().finish()
+        except OSError:
+            pass
+
+
+def record(directory: Path) -> None:
+    import requests
+
+    from weatherdisplay.config import Settings
+
+    settings = Settings.from_env(ROOT / ".env")
+    params = {"lat": settings.latitude, "lon": settings.longitude, "appid": settings.api_key, "units": settings.units}
+    directory.mkdir(parents=True, exist_ok=True)
+    for path, name in ENDPOINTS.items():
+        resp = requests.get(f"{settings.openweather_base_url}/{path}", params=params, timeout=30)
+        resp.raise_for_status()
+        (directory / f"{name}.json").write_text(json.dumps(resp.json(), indent=2) + "\n")
+        print(f"Recorded {name} -> {directory / f'{name}.json'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--record", action="store_true", help="Record live payloads into --fixtures and exit")
+    parser.add_argument("--latency", type=parse_per_endpoint, default={}, help="Seconds before answering")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency (s)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Body throughput in bytes/s (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an error status")
+    parser.add_argument("--error-status", default="429,500,502,503", help="Statuses to pick from")
+    parser.add_argument("--retry-after", type=int, default=30, help="Retry-After on 429s (negative to omit)")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Probability of a truncated body")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Probability of a connection reset")
+    parser.add_argument("--no-etag", action="store_true", help="Send no ETag and never answer 304")
+    parser.add_argument("--seed", type=int, help="Seed for fault selection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixtures)
+        return 0
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(code) for code in args.error_status.split(",")),
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        truncate_rate=args.truncate_rate,
+        reset_rate=args.reset_rate,
+        etag=not args.no_etag,
+    )
+    server = StubServer((args.host, args.port), load_fixtures(args.fixtures), faults, seed=args.seed)
+    server.verbose = args.verbose
+    print(f"Serving OpenWeatherMap stub at {server.base_url}  (OPENWEATHER_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(dict(server.stats), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Simulate a day of adaptive wakes against a fake Witty Pi 4.
+
+``FakeWittyPi`` models the registers the app touches: telemetry in 0-11 and
+the BCD startup alarm in 27-30, matched against a UTC RTC. ``FakeSMBus``
+exposes the board through the smbus2 calls ``WittyPiController`` makes, so the
+real controller and ``WakeScheduler`` run unmodified. After each wake the
+simulation advances the RTC until the alarm fires and checks that it fires at
+the planned time.
+
+    python scripts/sim_wittypi.py --hours 24 --start-voltage 5.05 --quiet-hours 23-6
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from weatherdisplay.config import Settings  # noqa: E402
+from weatherdisplay.hardware.wittypi import (  # noqa: E402
+    REG_ALARM1_DAY,
+    REG_ALARM1_HOUR,
+    REG_ALARM1_MINUTE,
+    REG_ALARM1_SECOND,
+    WittyPiController,
+    from_bcd,
+)
+from weatherdisplay.models import ForecastEntry, WeatherBundle, WeatherSnapshot  # noqa: E402
+from weatherdisplay.services.wake_schedule import WakeScheduler  # noqa: E402
+
+ADDRESS = 0x08
+
+
+class FakeWittyPi:
+    """Register file and RTC of one board."""
+
+    def __init__(self, rtc: datetime) -> None:
+        self.registers = bytearray(256)
+        self.rtc = rtc.astimezone(timezone.utc).replace(microsecond=0)
+        self.writes = 0
+
+    def set_power(self, output_voltage: float, external: bool, current: float = 0.45) -> None:
+        for register, value in ((0, 5.1 if external else 0.0), (2, output_voltage), (4, current)):
+            self.registers[register] = int(value)
+            self.registers[register + 1] = int(round(value * 100)) % 100
+        self.registers[6] = 0 if external else 1
+
+    def write(self, register: int, value: int) -> None:
+        if REG_ALARM1_SECOND <= register <= REG_ALARM1_DAY:
+            low, high = value & 0x0F, value >> 4
+            limit = {REG_ALARM1_SECOND: 59, REG_ALARM1_MINUTE: 59, REG_ALARM1_HOUR: 23, REG_ALARM1_DAY: 31}[register]
+            if low > 9 or high * 10 + low > limit:
+                raise OSError(22, f"invalid BCD 0x{value:02x} for register {register}")
+        self.registers[register] = value
+        self.writes += 1
+
+    def alarm(self) -> tuple[int, int, int, int]:
+        regs = (REG_ALARM1_DAY, REG_ALARM1_HOUR, REG_ALARM1_MINUTE, REG_ALARM1_SECOND)
+        return tuple(from_bcd(self.registers[register]) for register in regs)  # type: ignore[return-value]
+
+    def alarm_matches(self) -> bool:
+        return self.alarm() == (self.rtc.day, self.rtc.hour, self.rtc.minute, self.rtc.second)
+
+    def run_until_alarm(self, limit: timedelta = timedelta(days=2)) -> Optional[datetime]:
+        """Advance the RTC second by second until ALARM1 matches; ``None`` if it never does."""
+        end = self.rtc + limit
+        while self.rtc < end:
+            self.rtc += timedelta(seconds=1)
+            if self.alarm_matches():
+                return self.rtc
+        return None
+
+
+class FakeSMBus:
+    """The subset of ``smbus2.SMBus`` that ``WittyPiController`` uses."""
+
+    def __init__(self, board: FakeWittyPi, bus_id: int) -> None:
+        self._board = board
+        self.bus_id = bus_id
+
+    def __enter__(self) -> "FakeSMBus":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def _check(self, address: int) -> None:
+        if address != ADDRESS:
+            raise OSError(121, "Remote I/O error")
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> List[int]:
+        self._check(address)
+        return list(self._board.registers[register : register + length])
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        self._check(address)
+        return self._board.registers[register]
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self._check(address)
+        self._board.write(register, value)
+
+
+def synthetic_weather(now: datetime, swing: float) -> WeatherBundle:
+    """Diurnal temperature curve; ``swing`` scales how fast it changes."""
+
+    def temperature(at: datetime) -> float:
+        return 65 + swing * math.sin((at.hour + at.minute / 60 - 9) / 24 * 2 * math.pi)
+
+    current = WeatherSnapshot(now, temperature(now), temperature(now), 50, 5.0, None, 800, "Clear", "clear sky", "sunny", "#FFD800")
+    entries = []
+    for step in range(1, 5):
+        at = now + timedelta(hours=3 * step)
+        pop = 0.6 if swing > 20 and step == 2 else 0.0
+        entries.append(ForecastEntry(at, temperature(at), pop, "sunny", "#FFD800", "Clear"))
+    return WeatherBundle(current=current, next_hours=entries)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--start-voltage", type=float, default=5.05)
+    parser.add_argument("--drain-per-wake", type=float, default=0.004, help="Output voltage lost per wake (V)")
+    parser.add_argument("--external", action="store_true", help="Simulate USB power")
+    parser.add_argument("--swing", type=float, default=10.0, help="Daily temperature swing (degrees)")
+    parser.add_argument("--quiet-hours", default=None, help="e.g. 23-6 (overrides QUIET_HOURS)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENWEATHER_API_KEY", "simulation")
+    if args.quiet_hours is not None:
+        os.environ["QUIET_HOURS"] = args.quiet_hours
+    settings = Settings.from_env(ROOT / ".env")
+    scheduler = WakeScheduler(settings)
+    tz = ZoneInfo(settings.timezone)
+
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    board = FakeWittyPi(start)
+    controller = WittyPiController(ADDRESS, bus_factory=lambda bus_id: FakeSMBus(board, bus_id))
+    voltage = args.start_voltage
+    wakes = 0
+    failures = 0
+    while board.rtc < start + timedelta(hours=args.hours):
+        board.set_power(voltage, args.external)
+        battery = controller.read_battery_status()
+        now = board.rtc
+        plan = scheduler.plan(now, battery, synthetic_weather(now, args.swing))
+        if not controller.set_startup_alarm(plan.at):
+            print("FAIL: alarm write rejected")
+            return 1
+        fired = board.run_until_alarm()
+        ok = fired == plan.at
+        failures += 0 if ok else 1
+        wakes += 1
+        local = now.astimezone(tz)
+        battery_label = "ext" if args.external else f"{battery.percentage:3d}%" if battery else "n/a"
+        print(f"{local:%a %H:%M} {battery_label:>5}  next {plan}{'' if ok else f'  MISMATCH fired {fired}'}")
+        if not args.external:
+            voltage = max(4.6, voltage - args.drain_per_wake)
+
+    print(f"{wakes} wake(s) in {args.hours:g} h ({board.writes} register writes); {failures} mismatch(es)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
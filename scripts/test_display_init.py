@@ -30,6 +30,12 @@ for path in possible_paths:
         except ImportError:
             continue
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+from weatherdisplay.hardware.panel_watchdog import PanelTimeout, PanelWatchdog
+
+# Same phases as DisplayDriver; each call gives up after its deadline (seconds)
+watchdog = PanelWatchdog({'init': 10, 'refresh': 60, 'sleep': 10})
+
 if not waveshare_found:
     print("ERROR: waveshare_epd not found in any of these locations:")
     for path in possible_paths:
@@ -59,20 +65,10 @@ except Exception as e:
 print("\n3. Calling epd.init()...")
 print("   (This is where it typically hangs if there's a problem)")
 try:
-    # Set a timeout by using signal or threading
-    import signal
-    
-    def timeout_handler(signum, frame):
-        raise TimeoutError("init() took too long - likely stuck in ReadBusy()")
-    
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(10)  # 10 second timeout
-    
-    epd.init()
-    signal.alarm(0)  # Cancel alarm
+    watchdog.call('init', epd.init)
     print("   ✓ Display initialized successfully!")
     
-except TimeoutError as e:
+except PanelTimeout as e:
     print(f"   ✗ TIMEOUT: {e}")
     print("\n   This means the display is stuck waiting for BUSY pin.")
     print("   Possible causes:")
@@ -96,13 +92,11 @@ try:
     buffer = epd.getbuffer(img)
     
     print("   Sending to display...")
-    signal.alarm(30)  # 30 second timeout for display
-    epd.display(buffer)
-    signal.alarm(0)
+    watchdog.call('refresh', epd.display, buffer)
     print("   ✓ Display updated successfully!")
     
-except TimeoutError:
-    print("   ✗ TIMEOUT during display()")
+except PanelTimeout as e:
+    print(f"   ✗ TIMEOUT during display(): {e}")
     sys.exit(1)
 except Exception as e:
     print(f"   ✗ Failed: {e}")
@@ -112,7 +106,7 @@ except Exception as e:
 
 print("\n5. Putting display to sleep...")
 try:
-    epd.sleep()
+    watchdog.call('sleep', epd.sleep)
     print("   ✓ Display in sleep mode")
 except Exception as e:
     print(f"   ✗ Failed: {e}")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def configure_logging(verbose: bool = False) -> None:
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)-8s %(name)s - %(message)s")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fetch weather and render frames for a fleet of displays")
+    parser.add_argument("fleet", help="JSON file listing the devices (see fleet.example.json)")
+    parser.add_argument("--env", default=".env", help="Path to .env file with settings shared by every device")
+    parser.add_argument("--output", default=str(ROOT / "var" / "fleet"), help="Directory for the rendered frames")
+    parser.add_argument(
+        "--format",
+        action="append",
+        choices=("png", "epd"),
+        help="Write <id>.png and/or the packed panel buffer <id>.epd served by serve_frames.py (default: png)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes")
+    parser.add_argument("--fetch-concurrency", type=int, default=8, help="Weather fetches in flight at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Render every payload this many times (for benchmarking)")
+    parser.add_argument(
+        "--scaling",
+        action="store_true",
+        help="Render the batch with 1, 2, 4, ... up to --workers processes and compare throughput",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    return parser.parse_args()
+
+
+def worker_counts(limit: int) -> list[int]:
+    counts = []
+    count = 1
+    while count < limit:
+        counts.append(count)
+        count *= 2
+    return counts + [limit]
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging(args.verbose)
+
+    from dotenv import load_dotenv
+
+    from weatherdisplay.services.fleet import RenderPool, WeatherFetcher, load_fleet
+
+    load_dotenv(args.env)
+    devices = load_fleet(Path(args.fleet), os.environ)
+    LOGGER.info("Fetching weather for %d device(s)", len(devices))
+    with WeatherFetcher(devices, args.fetch_concurrency) as fetcher:
+        payloads, errors = fetcher.fetch()
+    if not payloads:
+        LOGGER.error("No device has weather to render")
+        return 2
+
+    reports = []
+    for workers in worker_counts(args.workers) if args.scaling else [args.workers]:
+        with RenderPool(devices, Path(args.output), workers, args.format or ["png"]) as pool:
+            report = pool.render(payloads, args.repeat)
+        LOGGER.info("Rendered %s", report)
+        reports.append(report)
+
+    if args.scaling:
+        single = reports[0].frames_per_second or 1.0
+        for report in reports:
+            speedup = report.frames_per_second / single
+            print(
+                f"{report.workers:3d} worker(s): {report.frames_per_second:7.1f} frames/s "
+                f"x{speedup:4.1f} ({speedup / report.workers:4.0%} efficiency)"
+            )
+    failed = len(errors) + sum(len(report.frames) - len(report.rendered) for report in reports)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,21 +2,47 @@ from __future__ import annotations
 
 import argparse
 import logging
+import os
+import signal
 import subprocess
+import sys
+import threading
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from zoneinfo import ZoneInfo
+from weatherdisplay.utils import spans
+from weatherdisplay.utils.startup_profile import run_with_import_profile
 
-from weatherdisplay.config import Settings
-from weatherdisplay.hardware.display import DisplayDriver
-from weatherdisplay.hardware.wittypi import WittyPiController
-from weatherdisplay.models import BatteryStatus, RenderPayload
-from weatherdisplay.render.clothing import choose_clothing_card
-from weatherdisplay.render.layout import LayoutRenderer
-from weatherdisplay.services.openweather import OpenWeatherClient, WeatherFetchError
+if TYPE_CHECKING:
+    from weatherdisplay.config import Settings
+    from weatherdisplay.hardware.battery_log import BatteryLog
+    from weatherdisplay.hardware.display import DisplayDriver
+    from weatherdisplay.hardware.display_worker import DisplayWorker
+    from weatherdisplay.hardware.wittypi import WittyPiController
+    from weatherdisplay.models import BatteryStatus, WeatherBundle
+    from weatherdisplay.render.layout import LayoutRenderer
+    from weatherdisplay.render.significance import SignificanceModel
+    from weatherdisplay.services.forecast_store import ForecastStore
+    from weatherdisplay.services.frame_client import FrameClient
+    from weatherdisplay.services.openweather import OpenWeatherClient
+    from weatherdisplay.services.prerender import PrerenderedFrame, SlotFrameStore
+    from weatherdisplay.services.revalidate import StaleWhileRevalidate
+    from weatherdisplay.utils.stage_graph import StageGraph
 
 LOGGER = logging.getLogger(__name__)
 
+EXIT_OK = 0
+EXIT_FETCH_FAILED = 2
+EXIT_LOW_VOLTAGE = 3
+EXIT_DISPLAY_FAILED = 4
+# A single reading this far below the cutoff shuts down without waiting for the
+# discharge trend to confirm it.
+HARD_CUTOFF_MARGIN = 0.1
+# How long a one-shot wake waits for a background revalidation after its cycle
+# before exiting and leaving the fetch to the next wake.
+REVALIDATE_GRACE_SECONDS = 1.0
+
 
 def configure_logging(verbose: bool = False) -> None:
     level = logging.DEBUG if verbose else logging.INFO
@@ -25,8 +51,26 @@ def configure_logging(verbose: bool = False) -> None:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Weather display refresher")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("run", "report"),
+        default="run",
+        help="run a refresh (default) or report per-stage timings of recent runs",
+    )
     parser.add_argument("--env", default=".env", help="Path to .env file")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay resident and refresh every UPDATE_INTERVAL_MINUTES instead of exiting after one cycle",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Run one cycle under the import timer and log a per-module import-time breakdown",
+    )
+    parser.add_argument("--runs", type=int, default=50, help="Recent runs covered by the report")
     return parser.parse_args()
 
 
@@ -35,48 +79,551 @@ def _should_request_shutdown(battery: BatteryStatus | None, cutoff: float) -> bo
         return False
     if battery.is_external_power:
         return False
-    return battery.output_voltage <= cutoff
+    # The trend, not the smoothed voltage, which trails a discharge by slope x smoothing time.
+    level = battery.trend_voltage if battery.trend_voltage is not None else battery.output_voltage
+    return level <= cutoff or battery.output_voltage <= cutoff - HARD_CUTOFF_MARGIN
 
 
-def main() -> int:
-    args = parse_args()
-    configure_logging(args.verbose)
+class Runtime:
+    """Long-lived collaborators shared by every refresh cycle.
 
-    settings = Settings.from_env(args.env)
-    weather_client = OpenWeatherClient(settings)
-    witty = WittyPiController(settings.witty_i2c_address)
-    display = DisplayDriver(settings)
-    renderer = LayoutRenderer(settings)
+    Each collaborator is built (and its module imported) on first use, so a
+    cycle that exits early never loads the HTTP, rendering or panel stacks.
+    """
 
-    try:
-        weather = weather_client.fetch_bundle()
-    except WeatherFetchError as exc:
-        LOGGER.error("Weather fetch failed: %s", exc)
-        return 2
-
-    battery = witty.read_battery_status()
-    if _should_request_shutdown(battery, settings.low_voltage_cutoff):
-        LOGGER.warning(
-            "Output voltage %.2fV below %.2fV threshold; requesting safe shutdown",
-            battery.output_voltage if battery else 0.0,
-            settings.low_voltage_cutoff,
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._weather_client: Optional[OpenWeatherClient] = None
+        self._frame_client: Optional[FrameClient] = None
+        self._weather: Optional[StaleWhileRevalidate] = None
+        self._witty: Optional[WittyPiController] = None
+        self._battery_log: Optional[BatteryLog] = None
+        self._display: Optional[DisplayDriver] = None
+        self._display_worker: Optional[DisplayWorker] = None
+        self._renderer: Optional[LayoutRenderer] = None
+        self._significance: Optional[SignificanceModel] = None
+        self._prerendered: Optional[SlotFrameStore] = None
+        self._forecast_store: Optional[ForecastStore] = None
+        # Inputs of the most recent cycle, for scheduling the next wake.
+        self.last_battery: Optional[BatteryStatus] = None
+        self.last_weather: Optional[WeatherBundle] = None
+        self.last_stale = False
+
+    @property
+    def weather_client(self) -> OpenWeatherClient:
+        if self._weather_client is None:
+            from weatherdisplay.services.openweather import OpenWeatherClient
+
+            self._weather_client = OpenWeatherClient(self.settings, self.forecast_store)
+        return self._weather_client
+
+    @property
+    def forecast_store(self) -> ForecastStore:
+        if self._forecast_store is None:
+            from weatherdisplay.services.forecast_store import FORECAST_STORE_NAME, ForecastStore
+
+            self._forecast_store = ForecastStore(self.settings.cache_dir / FORECAST_STORE_NAME)
+        return self._forecast_store
+
+    @property
+    def frame_client(self) -> FrameClient:
+        if self._frame_client is None:
+            from weatherdisplay.services.frame_client import FrameClient
+
+            self._frame_client = FrameClient(self.settings)
+        return self._frame_client
+
+    @property
+    def weather(self) -> StaleWhileRevalidate:
+        if self._weather is None:
+            from weatherdisplay.services.bundle_store import BundleStore
+            from weatherdisplay.services.revalidate import StaleWhileRevalidate
+
+            store = BundleStore(self.settings.cache_dir / "last_bundle.json")
+            self._weather = StaleWhileRevalidate(self.weather_client, store, self.settings, self.forecast_store)
+        return self._weather
+
+    @property
+    def witty(self) -> WittyPiController:
+        if self._witty is None:
+            from weatherdisplay.hardware.wittypi import WittyPiController
+
+            self._witty = WittyPiController(self.settings.witty_i2c_address)
+        return self._witty
+
+    @property
+    def battery_log(self) -> BatteryLog:
+        if self._battery_log is None:
+            from datetime import timedelta
+
+            from weatherdisplay.hardware.battery_log import BatteryLog
+
+            self._battery_log = BatteryLog(
+                self.settings.cache_dir / "battery.ring",
+                capacity=self.settings.battery_history_samples,
+                smoothing=timedelta(minutes=self.settings.battery_smoothing_minutes),
+            )
+        return self._battery_log
+
+    @property
+    def display(self) -> DisplayDriver:
+        if self._display is None:
+            from weatherdisplay.hardware.display import DisplayDriver
+
+            self._display = DisplayDriver(self.settings)
+        return self._display
+
+    @property
+    def display_worker(self) -> DisplayWorker:
+        if self._display_worker is None:
+            from weatherdisplay.hardware.display_worker import DisplayWorker
+
+            self._display_worker = DisplayWorker(self.display)
+        return self._display_worker
+
+    @property
+    def renderer(self) -> LayoutRenderer:
+        if self._renderer is None:
+            from weatherdisplay.render.layout import LayoutRenderer
+
+            self._renderer = LayoutRenderer(self.settings)
+        return self._renderer
+
+    @property
+    def significance(self) -> SignificanceModel:
+        if self._significance is None:
+            from weatherdisplay.render.significance import SignificanceModel
+
+            self._significance = SignificanceModel.from_settings(self.settings)
+        return self._significance
+
+    @property
+    def prerendered(self) -> SlotFrameStore:
+        if self._prerendered is None:
+            from weatherdisplay.config import render_profile
+            from weatherdisplay.services.prerender import PRERENDER_DIR_NAME, SlotFrameStore
+
+            directory = self.settings.cache_dir / PRERENDER_DIR_NAME
+            self._prerendered = SlotFrameStore(directory, render_profile(self.settings))
+        return self._prerendered
+
+    def close(self) -> None:
+        """Let a queued or running refresh finish so the panel is asleep before exit."""
+        if self._display_worker is not None:
+            self._display_worker.close()
+
+    def settle_weather(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a background weather fetch; ``False`` if it is still running."""
+        return self._weather is None or self._weather.settle(timeout)
+
+
+def _read_battery(runtime: Runtime) -> Optional[BatteryStatus]:
+    battery = runtime.witty.read_battery_status()
+    if battery is not None:
+        battery = runtime.battery_log.record(battery, runtime.settings.low_voltage_cutoff)
+        LOGGER.info(
+            "Battery %.2fV now, %.2fV smoothed, %s on trend (%d%%); time to empty %s",
+            battery.output_voltage,
+            battery.voltage,
+            f"{battery.trend_voltage:.2f}V" if battery.trend_voltage is not None else "n/a",
+            battery.percentage,
+            battery.time_to_empty or "n/a",
         )
-        subprocess.run(["sudo", "shutdown", "-h", "now", "Witty Pi battery low"], check=False)
-        return 3
-    clothing = choose_clothing_card(weather, settings.clothing_dir)
+    runtime.last_battery = battery
+    return battery
+
+
+def _battery_stage(runtime: Runtime, graph: StageGraph):
+    """Stage that reads the battery and cancels ``graph`` when it is too low to go on."""
+    cutoff = runtime.settings.low_voltage_cutoff
+
+    def stage(_inputs):
+        battery = _read_battery(runtime)
+        if _should_request_shutdown(battery, cutoff):
+            LOGGER.warning(
+                "Output voltage %.2fV (%s on trend) below %.2fV threshold; requesting safe shutdown",
+                battery.output_voltage if battery else 0.0,
+                f"{battery.trend_voltage:.2f}V" if battery and battery.trend_voltage is not None else "n/a",
+                cutoff,
+            )
+            graph.cancel("battery low")
+        return battery
+
+    return stage
 
+
+def run_cycle(runtime: Runtime, wait_for_panel: bool = True) -> int:
+    """One wake, run as a stage graph.
+
+    The battery read, weather fetch and panel ``init()`` are independent I/O waits
+    and start together; the payload is built once the battery and weather are in,
+    and rendering starts as soon as the payload is ready. A low battery cancels
+    the graph, so no further stages start and the in-flight fetch is abandoned.
+    With ``PARALLEL_WAKE=0`` the same stages run one at a time, and the panel is
+    only woken once there is a frame to show.
+
+    The panel itself is driven by :class:`DisplayWorker`. With ``wait_for_panel``
+    the cycle waits for the refresh (and the panel's sleep) to finish; the daemon
+    passes ``False`` and lets the refresh run on while it waits for the next slot.
+    With ``FRAME_SERVER_URL`` set the wake is :func:`run_client_cycle` instead.
+
+    With ``PRERENDER_SLOTS`` set, a fresh fetch also renders the frames of the
+    next wake slots once the current frame is rendered, and a wake whose slot
+    has such a frame is :func:`run_prerendered_cycle` instead.
+    """
+    from zoneinfo import ZoneInfo
+
+    if runtime.settings.frame_server_url:
+        return run_client_cycle(runtime, wait_for_panel)
+
+    settings = runtime.settings
     tz = ZoneInfo(settings.timezone)
-    payload = RenderPayload(
-        weather=weather,
-        battery=battery,
-        clothing_image=clothing,
-        last_updated=datetime.now(tz),
+    store = runtime.prerendered if settings.prerender_slots > 0 else None
+    if store is not None:
+        frame = store.lookup(datetime.now(tz))
+        if frame is not None:
+            return run_prerendered_cycle(runtime, frame, wait_for_panel)
+        LOGGER.info("No prerendered frame for this slot; fetching")
+
+    from weatherdisplay.models import RenderPayload
+    from weatherdisplay.render.clothing import choose_clothing_card
+    from weatherdisplay.services.openweather import WeatherFetchError
+    from weatherdisplay.utils.stage_graph import StageGraph
+
+    parallel = settings.parallel_wake
+    display = runtime.display  # built up front: Runtime properties are not thread-safe
+    worker = runtime.display_worker
+    graph = StageGraph(max_workers=3 if parallel else 1)
+    if parallel:
+        worker.prepare()
+
+    def weather_stage(_inputs):
+        weather, stale_since = runtime.weather.fetch()
+        runtime.last_weather = weather
+        runtime.last_stale = stale_since is not None
+        return weather, stale_since
+
+    def payload_stage(inputs):
+        weather, stale_since = inputs["weather"]
+        with spans.span("clothing"):
+            clothing = choose_clothing_card(weather, settings.clothing_dir, settings.clothing_cards)
+        payload = RenderPayload(
+            weather=weather,
+            battery=inputs["battery"],
+            clothing_image=clothing,
+            last_updated=datetime.now(tz),
+            stale_since=stale_since,
+        )
+        fingerprint = runtime.significance.fingerprint(payload)
+        previous = display.shown_fingerprint()
+        changed = runtime.significance.changed_fields(previous, fingerprint)
+        if not changed:
+            LOGGER.info("Payload unchanged within significance thresholds; skipping render and refresh")
+            return None
+        if previous is None:
+            LOGGER.info("No record of the displayed payload; rendering")
+        else:
+            LOGGER.info(
+                "Payload changed: %s",
+                ", ".join(f"{name} {previous.get(name)!r} -> {fingerprint.get(name)!r}" for name in changed),
+            )
+        return payload, fingerprint
+
+    def render_stage(inputs):
+        if inputs["payload"] is None:
+            return None
+        payload, fingerprint = inputs["payload"]
+        return runtime.renderer.build(payload), fingerprint
+
+    def show_stage(inputs):
+        if inputs["render"] is None:
+            worker.sleep()
+            return None
+        image, fingerprint = inputs["render"]
+        ticket = worker.submit(image, fingerprint)
+        if not wait_for_panel:
+            LOGGER.info("Frame queued for the display")
+            return ticket
+        ticket.result()
+        LOGGER.info("Display updated successfully")
+        return ticket
+
+    def prerender_stage(inputs):
+        from weatherdisplay.services.prerender import prerender_frames
+
+        weather, stale_since = inputs["weather"]
+        if stale_since is not None:
+            LOGGER.info("Not prerendering upcoming frames from a stored snapshot")
+            return None
+        try:
+            slots = prerender_frames(
+                settings,
+                runtime.renderer,
+                store,
+                weather,
+                inputs["battery"],
+                datetime.now(tz),
+                runtime.forecast_store.load(),
+                runtime.weather_client.icons,
+            )
+        except Exception as exc:  # without frames the next wake simply fetches
+            LOGGER.warning("Prerendering upcoming frames failed: %s", exc)
+            return None
+        if slots:
+            first, last = slots[0].strftime("%H:%M"), slots[-1].strftime("%H:%M")
+            LOGGER.info("Prerendered %d frame(s) for the slots from %s to %s", len(slots), first, last)
+        else:
+            LOGGER.info("The forecast covers no upcoming slot; nothing prerendered")
+        return slots
+
+    graph.add("battery", _battery_stage(runtime, graph))
+    graph.add("weather", weather_stage)
+    graph.add("payload", payload_stage, deps=("battery", "weather"))
+    graph.add("render", render_stage, deps=("payload",))
+    graph.add("show", show_stage, deps=("render",))
+    if store is not None:
+        # After the current frame's render, so the two never compete; it overlaps the panel refresh.
+        graph.add("prerender", prerender_stage, deps=("battery", "weather", "render"))
+    return _finish_cycle(runtime, graph, "weather", WeatherFetchError, wait_for_panel)
+
+
+def run_prerendered_cycle(runtime: Runtime, frame: PrerenderedFrame, wait_for_panel: bool = True) -> int:
+    """One wake that shows the frame an earlier fetch prerendered for this slot.
+
+    Nothing is fetched or rendered: the battery is read (a low one still shuts
+    the Pi down) and the stored packed frame is written to the panel.
+    """
+    from weatherdisplay.utils.stage_graph import StageGraph
+
+    worker = runtime.display_worker  # built up front: Runtime properties are not thread-safe
+    graph = StageGraph(max_workers=1)
+    if runtime.settings.parallel_wake:
+        worker.prepare()
+    LOGGER.info("Showing the frame prerendered for %s-%s", frame.at.strftime("%H:%M"), frame.until.strftime("%H:%M"))
+
+    def show_stage(_inputs):
+        ticket = worker.submit_packed(frame.buffer, frame.etag)
+        if wait_for_panel:
+            ticket.result()
+            LOGGER.info("Display updated successfully")
+        return ticket
+
+    graph.add("battery", _battery_stage(runtime, graph))
+    graph.add("show", show_stage, deps=("battery",))
+    return _finish_cycle(runtime, graph, None, None, wait_for_panel)
+
+
+def run_client_cycle(runtime: Runtime, wait_for_panel: bool = True) -> int:
+    """One wake as a thin client of ``FRAME_SERVER_URL``.
+
+    The server renders and packs the frame; the Pi reads its battery, asks for
+    the frame with the ETag of the one on the panel (a 304 ends the wake) and
+    writes the received bytes straight to the panel. Nothing is rendered locally.
+    """
+    from weatherdisplay.services.frame_client import FrameFetchError
+    from weatherdisplay.utils.stage_graph import StageGraph
+
+    display = runtime.display
+    worker = runtime.display_worker
+    frames = runtime.frame_client
+    graph = StageGraph(max_workers=2 if runtime.settings.parallel_wake else 1)
+
+    def frame_stage(_inputs):
+        etag, previous = display.shown_packed()
+        return frames.fetch(etag, previous)
+
+    def show_stage(inputs):
+        update = inputs["frame"]
+        if update is None:
+            return None
+        ticket = worker.submit_packed(update.buffer, update.etag, update.regions)
+        if wait_for_panel:
+            ticket.result()
+            LOGGER.info("Display updated successfully")
+        return ticket
+
+    graph.add("battery", _battery_stage(runtime, graph))
+    graph.add("frame", frame_stage)
+    graph.add("show", show_stage, deps=("battery", "frame"))
+    return _finish_cycle(runtime, graph, "frame", FrameFetchError, wait_for_panel)
+
+
+def _finish_cycle(
+    runtime: Runtime,
+    graph: StageGraph,
+    fetch_stage: Optional[str],
+    fetch_error: Optional[type],
+    wait_for_panel: bool,
+) -> int:
+    """Run ``graph``, settle the panel and map the outcome to an exit code (``fetch_stage`` may be ``None``)."""
+    from weatherdisplay.hardware.panel_watchdog import PanelTimeout
+    from weatherdisplay.utils.stage_graph import StageSkipped
+
+    worker = runtime.display_worker
+    result = graph.run()
+    LOGGER.info("Wake stages: %s", result.summary())
+
+    if "show" not in result.results:
+        worker.sleep()
+    if result.cancel_reason is not None or wait_for_panel:
+        worker.wait_idle()
+    if result.cancel_reason is not None:
+        subprocess.run(["sudo", "shutdown", "-h", "now", "Witty Pi battery low"], check=False)
+        return EXIT_LOW_VOLTAGE
+    if fetch_stage is not None and isinstance(result.errors.get(fetch_stage), fetch_error):
+        LOGGER.error("%s fetch failed: %s", fetch_stage.capitalize(), result.errors[fetch_stage])
+        return EXIT_FETCH_FAILED
+    if isinstance(result.errors.get("show"), PanelTimeout):
+        LOGGER.error("Display refresh failed: %s", result.errors["show"])
+        return EXIT_DISPLAY_FAILED
+    for error in result.errors.values():
+        if not isinstance(error, StageSkipped):
+            raise error
+    return EXIT_OK
+
+
+def span_log(settings: Settings) -> Optional[spans.SpanLog]:
+    """Where run spans go; ``None`` when ``SPAN_LOG_MAX_BYTES`` is 0."""
+    if settings.span_log_max_bytes <= 0:
+        return None
+    return spans.SpanLog(settings.cache_dir / spans.SPAN_LOG_NAME, settings.span_log_max_bytes)
+
+
+def forecast_report(settings: Settings) -> str:
+    """Freshness of the stored full forecast, for choosing how often to fetch."""
+    from zoneinfo import ZoneInfo
+
+    from weatherdisplay.services.forecast_store import FORECAST_STORE_NAME, ForecastStore
+
+    store = ForecastStore(settings.cache_dir / FORECAST_STORE_NAME)
+    series = store.load()
+    if series is None:
+        return f"No forecast stored in {store.path}"
+    return f"Stored forecast: {series.freshness(datetime.now(ZoneInfo(settings.timezone)))}"
+
+
+def timed_cycle(runtime: Runtime, wait_for_panel: bool = True) -> int:
+    """:func:`run_cycle` as a ``cycle`` span, then write the run's spans."""
+    try:
+        with spans.span("cycle") as attrs:
+            status = run_cycle(runtime, wait_for_panel)
+            attrs["status"] = status
+    finally:
+        spans.finish_run(span_log(runtime.settings))
+    return status
+
+
+def schedule_power_off(runtime: Runtime, status: int) -> int:
+    """Program the Witty Pi to wake the Pi for the next cycle, then power off.
+
+    If the alarm cannot be written the Pi stays up, so the systemd timer keeps
+    refreshing instead of the display going dark.
+    """
+    if status == EXIT_LOW_VOLTAGE:
+        return status
+    from datetime import timezone
+
+    from weatherdisplay.services.wake_schedule import WakeScheduler
+
+    plan = WakeScheduler(runtime.settings).plan(
+        datetime.now(timezone.utc),
+        runtime.last_battery,
+        runtime.last_weather,
+        fetch_failed=status == EXIT_FETCH_FAILED or runtime.last_stale,
     )
+    LOGGER.info("Next wake %s", plan)
+    if not runtime.witty.set_startup_alarm(plan.at):
+        LOGGER.error("Could not program the next wake; staying powered")
+        return status
+    subprocess.run(["sudo", "shutdown", "-h", "now", "Weather display sleeping until next wake"], check=False)
+    return status
+
+
+def run_daemon(runtime: Runtime) -> int:
+    """Run refresh cycles on a fixed grid anchored at start-up.
+
+    Deadlines are computed as ``start + n * interval`` on the monotonic clock, so
+    the time spent inside a cycle never pushes later refreshes back. A cycle that
+    overruns its slot skips the missed deadlines instead of firing back-to-back.
+    Cycles hand their frame to the display worker and do not wait for the panel;
+    a frame still queued when the next one arrives is dropped in its favour.
+    """
+    interval = max(1, runtime.settings.update_interval_minutes) * 60
+    stop = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        LOGGER.info("Received signal %d; stopping after the current cycle", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    LOGGER.info("Daemon started; refreshing every %d minute(s)", interval // 60)
+    next_deadline = time.monotonic()
+    while not stop.is_set():
+        started = time.monotonic()
+        if spans.current_run() is None:
+            spans.start_run()
+        try:
+            status = timed_cycle(runtime, wait_for_panel=False)
+        except Exception:  # keep the schedule alive across unexpected failures
+            LOGGER.exception("Refresh cycle crashed")
+            status = 1
+        LOGGER.info("Refresh cycle finished with status %d in %.2fs", status, time.monotonic() - started)
+        LOGGER.info("Display: %s", runtime.display_worker.status())
+        if status == EXIT_LOW_VOLTAGE:
+            runtime.close()
+            return status
+
+        next_deadline += interval
+        now = time.monotonic()
+        if next_deadline <= now:
+            skipped = int((now - next_deadline) // interval) + 1
+            next_deadline += skipped * interval
+            LOGGER.warning("Refresh cycle overran its slot; skipping %d scheduled refresh(es)", skipped)
+        stop.wait(next_deadline - now)
+
+    runtime.close()
+    LOGGER.info("Daemon stopped")
+    return EXIT_OK
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging(args.verbose)
+
+    if args.profile_startup:
+        argv = [arg for arg in sys.argv if arg != "--profile-startup"]
+        return run_with_import_profile(argv)
+
+    from weatherdisplay.config import Settings
+
+    if args.command == "report":
+        settings = Settings.from_env(args.env)
+        log = span_log(settings)
+        print(spans.report(log, args.runs) if log is not None else "Span logging is off (SPAN_LOG_MAX_BYTES=0)")
+        print(forecast_report(settings))
+        return EXIT_OK
+
+    spans.start_run()
+    with spans.span("settings"):
+        settings = Settings.from_env(args.env)
+    runtime = Runtime(settings)
+    if args.daemon:
+        return run_daemon(runtime)
 
-    image = renderer.build(payload)
-    display.show(image)
-    LOGGER.info("Display updated successfully")
-    return 0
+    started = time.monotonic()
+    status = timed_cycle(runtime)
+    LOGGER.info("Refresh cycle finished with status %d in %.2fs", status, time.monotonic() - started)
+    if settings.wake_mode == "alarm":
+        status = schedule_power_off(runtime, status)
+    if not runtime.settle_weather(REVALIDATE_GRACE_SECONDS):
+        # Interpreter exit joins the fetch threads, which would hold the wake
+        # until the fetch deadline; the next wake fetches again instead.
+        LOGGER.info("Leaving the background weather fetch to the next wake")
+        logging.shutdown()
+        os._exit(status)
+    return status
 
 
 if __name__ == "__main__":
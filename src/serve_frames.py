@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+LOGGER = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def configure_logging(verbose: bool = False) -> None:
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)-8s %(name)s - %(message)s")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve packed panel frames to thin-client displays")
+    parser.add_argument(
+        "--frames",
+        default=str(ROOT / "var" / "fleet"),
+        help="Directory of <device id>.epd frames (written by fleet.py --format epd)",
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--tile", type=int, default=80, help="Tile edge in pixels for frame deltas")
+    parser.add_argument("--history", type=int, default=4, help="Previous frames per device kept for deltas")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging(args.verbose)
+
+    from weatherdisplay.hardware.frame_codec import PANEL_SIZE
+    from weatherdisplay.services.frame_server import FrameServer, FrameStore
+
+    store = FrameStore(Path(args.frames), PANEL_SIZE, args.history)
+    server = FrameServer((args.host, args.port), store, args.tile)
+    LOGGER.info("Serving %s on http://%s:%d/frames/<device id>", args.frames, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        LOGGER.info("Served %s", dict(server.stats))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Mapping
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from .utils.asset_bundle import AssetBundle, AssetSources, compile_assets, load_or_build
+
 ROOT = Path(__file__).resolve().parents[2]  # Go up to workspace root
 ASSETS = ROOT / "assets"
+DEFAULT_OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
+# Seconds each blocking e-paper phase may take before the panel counts as hung.
+# The 7.3" (F) panel needs about 35 s for a full refresh.
+DEFAULT_DISPLAY_DEADLINES = {"init": 20.0, "refresh": 90.0, "sleep": 10.0}
+ASSET_BUNDLE_NAME = "assets.bundle"
+
+
+def asset_sources() -> AssetSources:
+    return AssetSources(
+        fonts={
+            "text": ASSETS / "fonts" / "RobotoMono-Regular.ttf",
+            "icons": ASSETS / "fonts" / "MaterialIconsOutlined-Regular.ttf",
+        },
+        icon_map=ASSETS / "icons" / "weather_icon_map.json",
+        codepoints=ASSETS / "icons" / "material_icons_outlined.codepoints",
+        clothing_dirs=(ROOT / "public" / "right-section", ASSETS / "clothing"),
+    )
 
 
 @dataclass(slots=True)
@@ -39,50 +59,116 @@ class Settings:
             "green": "#0B8457",
         }
     )
+    significance: Mapping[str, float] = field(
+        default_factory=lambda: {
+            "temperature": 1.0,
+            "humidity": 5.0,
+            "wind": 2.0,
+            "pop": 0.1,
+            "battery": 10.0,
+            "clock_minutes": 30,
+        }
+    )
+    current_cache_ttl: int = 300
+    forecast_cache_ttl: int = 3600
+    fetch_deadline: float = 15.0
+    stale_render_budget: float = 5.0
+    display_tile_size: int = 80
+    partial_refresh_limit: int = 5
+    epd_buffer_mode: str = "vendor"
+    glyph_atlas_max_bytes: int = 2 * 1024 * 1024
+    openweather_base_url: str = DEFAULT_OPENWEATHER_BASE_URL
+    fetch_retry_attempts: int = 3
+    fetch_retry_backoff: float = 0.5
+    fetch_connect_timeout: float = 4.0
+    wake_mode: str = "timer"
+    wake_min_minutes: int = 5
+    wake_max_minutes: int = 60
+    quiet_hours: Optional[Tuple[int, int]] = None
+    battery_history_samples: int = 2016
+    battery_smoothing_minutes: float = 30.0
+    parallel_wake: bool = True
+    display_deadlines: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_DISPLAY_DEADLINES))
+    frame_server_url: Optional[str] = None
+    assets: Optional[AssetBundle] = None
+    span_log_max_bytes: int = 1024 * 1024
+    render_mode: str = "rgb"
+    prerender_slots: int = 0
 
     @classmethod
     def from_env(cls, env_path: str | os.PathLike[str] = ".env") -> "Settings":
         load_dotenv(env_path)
-        api_key = os.environ.get("OPENWEATHER_API_KEY", "").strip()
+        return cls.from_mapping(os.environ)
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, str]) -> "Settings":
+        """Build settings from ``KEY=value`` pairs named like the environment variables."""
+        api_key = values.get("OPENWEATHER_API_KEY", "").strip()
         if not api_key:
             raise RuntimeError("OPENWEATHER_API_KEY missing in environment")
 
-        latitude = float(os.environ.get("LOCATION_LAT", "0"))
-        longitude = float(os.environ.get("LOCATION_LON", "0"))
-        units = os.environ.get("UNITS", "imperial").lower()
-        timezone = os.environ.get("TZ", "UTC")
-        interval = int(os.environ.get("UPDATE_INTERVAL_MINUTES", "10"))
-        display_driver = os.environ.get("DISPLAY_DRIVER", "waveshare_epd.epd7in3f")
-        mock_display = os.environ.get("MOCK_DISPLAY", "0") not in {"0", "false", "False"}
+        latitude = float(values.get("LOCATION_LAT", "0"))
+        longitude = float(values.get("LOCATION_LON", "0"))
+        units = values.get("UNITS", "imperial").lower()
+        timezone = values.get("TZ", "UTC")
+        interval = int(values.get("UPDATE_INTERVAL_MINUTES", "10"))
+        display_driver = values.get("DISPLAY_DRIVER", "waveshare_epd.epd7in3f")
+        mock_display = values.get("MOCK_DISPLAY", "0") not in {"0", "false", "False"}
 
-        witty_addr_raw = os.environ.get("WITTY_PI_I2C_ADDRESS", "0x08")
+        witty_addr_raw = values.get("WITTY_PI_I2C_ADDRESS", "0x08")
         witty_addr = int(witty_addr_raw, 16) if witty_addr_raw.startswith("0x") else int(witty_addr_raw)
 
-        fonts = {
-            "text": ASSETS / "fonts" / "RobotoMono-Regular.ttf",
-            "icons": ASSETS / "fonts" / "MaterialIconsOutlined-Regular.ttf",
-        }
-        for name, path in fonts.items():
-            if not path.exists():
-                raise FileNotFoundError(f"Font '{name}' expected at {path}")
-
-        icon_map_path = ASSETS / "icons" / "weather_icon_map.json"
-        icon_map = json.loads(icon_map_path.read_text())
-        codepoints_path = ASSETS / "icons" / "material_icons_outlined.codepoints"
-        if not codepoints_path.exists():
-            raise FileNotFoundError(f"Missing Material icon codepoints file at {codepoints_path}")
-
-        public_clothing = ROOT / "public" / "right-section"
-        fallback_clothing = ASSETS / "clothing"
-        public_clothing.mkdir(parents=True, exist_ok=True)
-        fallback_clothing.mkdir(parents=True, exist_ok=True)
-        has_public_assets = any(public_clothing.glob("*.png"))
-        clothing_dir = public_clothing if has_public_assets else fallback_clothing
-
         cache_dir = ROOT / "var" / "cache"
         cache_dir.mkdir(parents=True, exist_ok=True)
 
-        cutoff = float(os.environ.get("LOW_VOLTAGE_CUTOFF", "4.65"))
+        # The compiled bundle replaces reading the icon map, codepoints and clothing directories on every run.
+        sources = asset_sources()
+        if values.get("ASSET_BUNDLE", "1") not in {"0", "false", "False"}:
+            assets = load_or_build(cache_dir / ASSET_BUNDLE_NAME, sources)
+        else:
+            assets = compile_assets(sources)
+
+        cutoff = float(values.get("LOW_VOLTAGE_CUTOFF", "4.65"))
+        current_ttl = int(values.get("CURRENT_CACHE_TTL_SECONDS", "300"))
+        forecast_ttl = int(values.get("FORECAST_CACHE_TTL_SECONDS", "3600"))
+        fetch_deadline = float(values.get("FETCH_DEADLINE_SECONDS", "15"))
+        stale_budget = float(values.get("STALE_RENDER_BUDGET_SECONDS", "5"))
+        tile_size = int(values.get("DISPLAY_TILE_SIZE", "80"))
+        partial_limit = int(values.get("PARTIAL_REFRESH_LIMIT", "5"))
+        buffer_mode = values.get("EPD_BUFFER_MODE", "vendor").lower()
+        atlas_max_bytes = int(values.get("GLYPH_ATLAS_MAX_BYTES", str(2 * 1024 * 1024)))
+        retry_attempts = int(values.get("FETCH_RETRY_ATTEMPTS", "3"))
+        retry_backoff = float(values.get("FETCH_RETRY_BACKOFF_SECONDS", "0.5"))
+        connect_timeout = float(values.get("FETCH_CONNECT_TIMEOUT_SECONDS", "4"))
+        wake_mode = values.get("WAKE_MODE", "timer").strip().lower()
+        wake_min = int(values.get("WAKE_MIN_MINUTES", "5"))
+        wake_max = int(values.get("WAKE_MAX_MINUTES", "60"))
+        quiet_raw = values.get("QUIET_HOURS", "").strip()
+        quiet_hours = None
+        if quiet_raw:
+            start, _, end = quiet_raw.partition("-")
+            quiet_hours = (int(start) % 24, int(end) % 24)
+        battery_samples = int(values.get("BATTERY_HISTORY_SAMPLES", "2016"))
+        battery_smoothing = float(values.get("BATTERY_SMOOTHING_MINUTES", "30"))
+        parallel_wake = values.get("PARALLEL_WAKE", "1") not in {"0", "false", "False"}
+        display_deadlines = dict(DEFAULT_DISPLAY_DEADLINES)
+        for item in values.get("DISPLAY_DEADLINES", "").split(","):
+            phase, sep, seconds = item.partition("=")
+            if sep:
+                display_deadlines[phase.strip()] = float(seconds)
+        frame_server_url = values.get("FRAME_SERVER_URL", "").strip() or None
+        span_log_max_bytes = int(values.get("SPAN_LOG_MAX_BYTES", str(1024 * 1024)))
+        render_mode = values.get("RENDER_MODE", "rgb").strip().lower()
+        prerender_slots = max(0, int(values.get("PRERENDER_SLOTS", "0")))
+        base_url = values.get("OPENWEATHER_BASE_URL", "").strip().rstrip("/") or DEFAULT_OPENWEATHER_BASE_URL
+        significance = {
+            "temperature": float(values.get("SIGNIFICANCE_TEMPERATURE_STEP", "1")),
+            "humidity": float(values.get("SIGNIFICANCE_HUMIDITY_STEP", "5")),
+            "wind": float(values.get("SIGNIFICANCE_WIND_STEP", "2")),
+            "pop": float(values.get("SIGNIFICANCE_POP_STEP", "0.1")),
+            "battery": float(values.get("SIGNIFICANCE_BATTERY_STEP", "10")),
+            "clock_minutes": int(values.get("SIGNIFICANCE_CLOCK_MINUTES", "30")),
+        }
 
         return cls(
             api_key=api_key,
@@ -95,16 +181,65 @@ class Settings:
             mock_display=mock_display,
             witty_i2c_address=witty_addr,
             low_voltage_cutoff=cutoff,
-            fonts=fonts,
-            icon_codepoints=codepoints_path,
-            icon_map=icon_map,
-            clothing_dir=clothing_dir,
+            fonts=dict(sources.fonts),
+            icon_codepoints=sources.codepoints,
+            icon_map=assets.icon_map,
+            clothing_dir=assets.clothing_dir,
             cache_dir=cache_dir,
+            significance=significance,
+            current_cache_ttl=current_ttl,
+            forecast_cache_ttl=forecast_ttl,
+            fetch_deadline=fetch_deadline,
+            stale_render_budget=stale_budget,
+            display_tile_size=tile_size,
+            partial_refresh_limit=partial_limit,
+            epd_buffer_mode=buffer_mode,
+            glyph_atlas_max_bytes=atlas_max_bytes,
+            openweather_base_url=base_url,
+            fetch_retry_attempts=retry_attempts,
+            fetch_retry_backoff=retry_backoff,
+            fetch_connect_timeout=connect_timeout,
+            wake_mode=wake_mode,
+            wake_min_minutes=wake_min,
+            wake_max_minutes=wake_max,
+            quiet_hours=quiet_hours,
+            battery_history_samples=battery_samples,
+            battery_smoothing_minutes=battery_smoothing,
+            parallel_wake=parallel_wake,
+            display_deadlines=display_deadlines,
+            frame_server_url=frame_server_url,
+            assets=assets,
+            span_log_max_bytes=span_log_max_bytes,
+            render_mode=render_mode,
+            prerender_slots=prerender_slots,
         )
 
+    @property
+    def clothing_cards(self) -> Optional[FrozenSet[str]]:
+        """File names of the cards in ``clothing_dir``, when the asset bundle indexed them."""
+        return self.assets.clothing_cards if self.assets is not None else None
+
     def color(self, key: str, fallback: str | None = None) -> str:
         if key in self.palette:
             return self.palette[key]
         if fallback:
             return fallback
         raise KeyError(key)
+
+
+def render_profile(settings: Settings) -> str:
+    """Key shared by settings whose frames one :class:`LayoutRenderer` (and packer) draws identically.
+
+    Fleet workers share a renderer per profile; prerendered frames are discarded when it changes.
+    """
+    parts = [
+        sorted((name, str(path)) for name, path in settings.fonts.items()),
+        str(settings.icon_codepoints),
+        str(settings.clothing_dir),
+        str(settings.cache_dir),
+        sorted(settings.palette.items()),
+        settings.glyph_atlas_max_bytes,
+        settings.epd_buffer_mode,
+        settings.render_mode,
+    ]
+    return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()[:12]
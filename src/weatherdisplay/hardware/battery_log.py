@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import struct
+import time
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from ..models import BatteryStatus
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"WDBATT1\0"
+# magic, capacity, head (next slot), count, then the estimator state:
+# last timestamp, smoothed output voltage, smoothed output current,
+# fitted voltage slope (V/s), flags (bit 0: estimator seeded).
+_HEADER = struct.Struct("<8sIIIdddd I4x")
+# timestamp, input V, output V, output A, flags (bit 0 external, bit 1 low-voltage), action code
+_RECORD = struct.Struct("<dfffBB2x")
+# The discharge trend is fitted to at most this many on-battery samples, all
+# within ``TREND_WINDOW`` time constants of the newest one.
+TREND_SAMPLES = 12
+TREND_WINDOW = 4
+
+
+@dataclass(slots=True)
+class BatterySample:
+    timestamp: float
+    input_voltage: float
+    output_voltage: float
+    output_current: float
+    is_external_power: bool
+    is_low_voltage_shutdown: bool
+    last_action_code: int
+
+
+@dataclass(slots=True)
+class _State:
+    capacity: int
+    head: int = 0
+    count: int = 0
+    timestamp: float = 0.0
+    voltage: float = 0.0
+    current: float = 0.0
+    slope: float = 0.0
+    seeded: bool = False
+
+
+class BatteryLog:
+    """Fixed-size ring of battery samples in a memory-mapped file.
+
+    The file is ``capacity`` packed records behind a header, so its size never
+    changes. The header also carries the running estimator state: exponentially
+    smoothed output voltage and current (time constant ``smoothing``) for
+    display, and the discharge slope. The smoothed voltage trails a steady
+    discharge by about slope x ``smoothing``, so the slope and the level the
+    cutoff is checked against come from a least-squares line through the last
+    raw samples instead (see :meth:`trend`).
+    """
+
+    def __init__(self, path: Path, capacity: int = 2016, smoothing: timedelta = timedelta(minutes=30)) -> None:
+        self._path = path
+        self._tau = max(1.0, smoothing.total_seconds())
+        size = _HEADER.size + capacity * _RECORD.size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+b") as handle:
+            if handle.seek(0, 2) != size:
+                handle.truncate(0)
+                handle.truncate(size)
+            self._map = mmap.mmap(handle.fileno(), size)
+        self._state = self._read_header(capacity)
+
+    def _read_header(self, capacity: int) -> _State:
+        magic, stored_capacity, head, count, timestamp, voltage, current, slope, flags = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or stored_capacity != capacity or head >= capacity or count > capacity:
+            if magic != b"\0" * len(MAGIC):
+                LOGGER.warning("Resetting battery log %s (unrecognised header)", self._path)
+            state = _State(capacity=capacity)
+            self._write_header(state)
+            return state
+        return _State(capacity, head, count, timestamp, voltage, current, slope, bool(flags & 1))
+
+    def _write_header(self, state: _State) -> None:
+        _HEADER.pack_into(
+            self._map,
+            0,
+            MAGIC,
+            state.capacity,
+            state.head,
+            state.count,
+            state.timestamp,
+            state.voltage,
+            state.current,
+            state.slope,
+            int(state.seeded),
+        )
+
+    def append(self, status: BatteryStatus, timestamp: Optional[float] = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        state = self._state
+        flags = int(status.is_external_power) | int(status.is_low_voltage_shutdown) << 1
+        _RECORD.pack_into(
+            self._map,
+            _HEADER.size + state.head * _RECORD.size,
+            timestamp,
+            status.input_voltage,
+            status.output_voltage,
+            status.output_current,
+            flags,
+            status.last_action_code & 0xFF,
+        )
+        state.head = (state.head + 1) % state.capacity
+        state.count = min(state.capacity, state.count + 1)
+        self._update_estimate(status, timestamp)
+        # Record first, header second: a torn write loses at most this sample.
+        self._write_header(state)
+        self._map.flush()
+
+    def _update_estimate(self, status: BatteryStatus, timestamp: float) -> None:
+        state = self._state
+        dt = timestamp - state.timestamp
+        if not state.seeded or dt <= 0:
+            state.voltage, state.current = status.output_voltage, status.output_current
+            state.slope = 0.0
+            state.seeded = True
+            state.timestamp = max(state.timestamp, timestamp)
+            return
+        alpha = 1.0 - math.exp(-dt / self._tau)
+        state.voltage += alpha * (status.output_voltage - state.voltage)
+        state.current += alpha * (status.output_current - state.current)
+        trend = self.trend()
+        state.slope = trend[1] if trend is not None else 0.0
+        state.timestamp = timestamp
+
+    def _recent(self, count: int) -> Iterator[Tuple[float, float, bool]]:
+        """(timestamp, output V, external power) of up to ``count`` samples, newest first."""
+        state = self._state
+        for offset in range(1, min(count, state.count) + 1):
+            slot = (state.head - offset) % state.capacity
+            timestamp, _, output_v, _, flags, _ = _RECORD.unpack_from(self._map, _HEADER.size + slot * _RECORD.size)
+            yield timestamp, output_v, bool(flags & 1)
+
+    def trend(self) -> Optional[Tuple[float, float]]:
+        """Output voltage at the newest sample and its slope (V/s), from a least-squares line.
+
+        The line goes through the newest samples of the current run on battery,
+        up to ``TREND_SAMPLES`` of them within ``TREND_WINDOW`` time constants.
+        Unlike the smoothed voltage its value at the newest sample does not lag
+        a steady discharge. ``None`` on external power or with fewer than three
+        samples.
+        """
+        points: List[Tuple[float, float]] = []
+        for timestamp, voltage, external in self._recent(TREND_SAMPLES):
+            if external or (points and points[0][0] - timestamp > TREND_WINDOW * self._tau):
+                break
+            points.append((timestamp, voltage))
+        if len(points) < 3:
+            return None
+        newest = points[0][0]
+        mean_t = sum(newest - t for t, _ in points) / len(points)
+        mean_v = sum(v for _, v in points) / len(points)
+        spread = sum((newest - t - mean_t) ** 2 for t, _ in points)
+        if spread <= 0:
+            return None
+        # Fitted against time before the newest sample, so the intercept is the level now.
+        slope = -sum((newest - t - mean_t) * (v - mean_v) for t, v in points) / spread
+        return mean_v + slope * mean_t, slope
+
+    def time_to_empty(self, cutoff: float) -> Optional[timedelta]:
+        """Projected time until the fitted voltage reaches ``cutoff``; ``None`` if not discharging."""
+        trend = self.trend()
+        if trend is None or trend[1] >= 0:
+            return None
+        level, slope = trend
+        return timedelta(seconds=max(0.0, (level - cutoff) / -slope))
+
+    def record(self, status: BatteryStatus, cutoff: float, timestamp: Optional[float] = None) -> BatteryStatus:
+        """Append ``status`` and return a copy carrying the smoothed and fitted values."""
+        self.append(status, timestamp)
+        trend = self.trend()
+        return replace(
+            status,
+            smoothed_voltage=self._state.voltage,
+            smoothed_current=self._state.current,
+            trend_voltage=trend[0] if trend is not None else None,
+            time_to_empty=self.time_to_empty(cutoff),
+        )
+
+    def samples(self) -> Iterator[BatterySample]:
+        """Stored samples, oldest first (for diagnostics)."""
+        state = self._state
+        start = (state.head - state.count) % state.capacity
+        for offset in range(state.count):
+            slot = (start + offset) % state.capacity
+            timestamp, input_v, output_v, current, flags, action = _RECORD.unpack_from(
+                self._map, _HEADER.size + slot * _RECORD.size
+            )
+            yield BatterySample(timestamp, input_v, output_v, current, bool(flags & 1), bool(flags & 2), action)
+
+    def close(self) -> None:
+        self._map.close()
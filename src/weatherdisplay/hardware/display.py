@@ -1,77 +1,324 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-
-from PIL import Image
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, TypeVar
 
 from ..config import Settings
+from ..utils.fs import atomic_write_bytes, atomic_write_text
+from ..utils.spans import span
+from .frame_codec import PANEL_SIZE
+from .panel_watchdog import PanelTimeout, PanelWatchdog
+from .regions import Region, TileGrid, dirty_sections
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class RefreshReport:
+    """What the last call to :meth:`DisplayDriver.show` found and did."""
+
+    regions: List[Region] = field(default_factory=list)
+    sections: List[str] = field(default_factory=list)
+    mode: str = "skipped"
+    # Seconds spent in each panel phase (init, pack, refresh, sleep), including
+    # an init() done ahead of time by :meth:`DisplayDriver.prepare`.
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def dirty_area(self) -> int:
+        return sum(region.area for region in self.regions)
+
+    def describe_phases(self) -> str:
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items()) or "no panel calls"
+
 
 class DisplayDriver:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._cache_path = settings.cache_dir / "last_frame.png"
         self._hash_path = settings.cache_dir / "last_frame.sha1"
+        self._tiles_path = settings.cache_dir / "last_frame.tiles.json"
+        self._payload_path = settings.cache_dir / "last_payload.json"
+        # Thin-client mode: the packed frame received from the frame server and its ETag.
+        self._packed_path = settings.cache_dir / "last_frame.epd"
+        self._etag_path = settings.cache_dir / "last_frame.etag"
         self._mock = settings.mock_display
         self._epd = None
-        
-        # Only import and initialize waveshare if not in mock mode
-        if not self._mock:
-            try:
-                LOGGER.info("Importing waveshare_epd module...")
-                from waveshare_epd import epd7in3f
-                LOGGER.info("Creating EPD() instance...")
-                self._epd = epd7in3f.EPD()
+        self._packer = None
+        self._awake = False
+        self._watchdog = PanelWatchdog(settings.display_deadlines)
+        self._phase_times: Dict[str, float] = {}
+        self.current_phase: Optional[str] = None
+        self.last_report = RefreshReport()
+
+    def _load_epd(self) -> bool:
+        """Import the waveshare driver and create the ``EPD`` instance on first use.
+
+        Falls back to mock mode when the driver is missing or cannot be created.
+        """
+        if self._mock:
+            return False
+        if self._epd is not None:
+            return True
+        try:
+            LOGGER.info("Importing waveshare_epd module...")
+            from waveshare_epd import epd7in3f
+            LOGGER.info("Creating EPD() instance...")
+            self._epd = epd7in3f.EPD()
+            from .epd_buffer import build_packer
+
+            self._packer = build_packer(self._settings.palette, self._settings.epd_buffer_mode)
+        except ImportError:
+            LOGGER.warning("waveshare_epd not available, falling back to mock mode")
+            self._mock = True
+        except Exception as exc:
+            LOGGER.error("Failed to create e-paper driver: %s", exc, exc_info=True)
+            self._mock = True
+        return not self._mock
+
+    def _phase(self, name: str, fn: Callable[..., T], *args: Any) -> T:
+        """Make one panel call under the watchdog and add its duration to the report.
+
+        After a failed call the panel state is unknown, so the next refresh starts
+        with a fresh ``init()`` and reports only its own phases.
+        """
+        started = time.monotonic()
+        self.current_phase = name
+        try:
+            with span(f"panel.{name}"):
+                result = self._watchdog.call(name, fn, *args)
+        except Exception:
+            self._awake = False
+            self._phase_times.clear()
+            raise
+        finally:
+            self.current_phase = None
+        self._phase_times[name] = self._phase_times.get(name, 0.0) + time.monotonic() - started
+        return result
+
+    @property
+    def stuck_phase(self) -> Optional[str]:
+        """Phase of an abandoned panel call that has still not returned, if any."""
+        stuck = self._watchdog.stuck
+        return stuck.phase if stuck is not None else None
+
+    def _take_phase_times(self) -> Dict[str, float]:
+        times, self._phase_times = self._phase_times, {}
+        return times
+
+    def _wake_panel(self, partial: bool = False) -> bool:
+        """Run ``init()`` (or ``init_part()`` for a windowed refresh) before a refresh.
+
+        The panel is put to sleep after every refresh, so this runs again on each
+        wake; the module import and ``EPD()`` instance are kept for the process lifetime.
+        A full ``init()`` already done by :meth:`prepare` is not repeated.
+        Falls back to mock mode when the panel fails to initialise; raises
+        :class:`PanelTimeout` when it stays BUSY past the ``init`` deadline.
+        """
+        if not self._load_epd():
+            return False
+        if self._awake and not partial:
+            return True
+        try:
+            init_part = getattr(self._epd, "init_part", None)
+            if partial and init_part is not None:
+                LOGGER.info("Calling epd.init_part()...")
+                self._phase("init", init_part)
+            else:
                 LOGGER.info("Calling epd.init()...")
-                self._epd.init()
-                LOGGER.info("Display initialized successfully")
-            except ImportError:
-                LOGGER.warning("waveshare_epd not available, falling back to mock mode")
-                self._mock = True
-            except Exception as exc:
-                LOGGER.error("Failed to initialize e-paper display: %s", exc, exc_info=True)
-                self._mock = True
-
-    def show(self, image: Image.Image) -> None:
-        checksum = hashlib.sha1(image.tobytes()).hexdigest()
+                self._phase("init", self._epd.init)
+            self._awake = True
+            LOGGER.info("Display initialized successfully")
+        except PanelTimeout:
+            # A wedged panel is a hardware fault, not a missing driver: do not fall back to mock mode.
+            raise
+        except Exception as exc:
+            LOGGER.error("Failed to initialize e-paper display: %s", exc, exc_info=True)
+            self._mock = True
+        return not self._mock
+
+    def prepare(self) -> bool:
+        """Import the driver and run ``init()`` ahead of :meth:`show`, so the SPI reset
+        and BUSY wait can overlap other work. Pair with :meth:`sleep` if nothing is shown."""
+        return self._wake_panel()
+
+    def sleep(self) -> None:
+        """Put the panel into deep sleep if it is awake (after a refresh, or a :meth:`prepare` that led nowhere)."""
+        awake, self._awake = self._awake, False
+        if awake and self._epd is not None:
+            LOGGER.info("Putting display to sleep")
+            self._phase("sleep", self._epd.sleep)
+
+    def shown_fingerprint(self) -> Optional[dict[str, Any]]:
+        """Payload fingerprint of the frame currently on the panel, if known."""
+        try:
+            return json.loads(self._payload_path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable payload fingerprint %s", self._payload_path)
+            return None
+
+    def _remember(self, fingerprint: Optional[Mapping[str, Any]]) -> None:
+        if fingerprint is None:
+            if self._payload_path.exists():
+                self._payload_path.unlink()
+            return
+        atomic_write_text(self._payload_path, json.dumps(fingerprint, separators=(",", ":")))
+
+    def _load_tile_state(self) -> dict[str, Any]:
+        try:
+            return json.loads(self._tiles_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _buffer(self, image: Image.Image):
+        """Panel buffer for ``image``; the in-project packer replaces the vendor ``getbuffer``."""
+        if self._packer is not None:
+            return self._phase("pack", self._packer.pack, image)
+        return self._phase("pack", self._epd.getbuffer, image)
+
+    def _supports_partial(self) -> bool:
+        """Windowed refresh: ``display_Partial(buffer, x0, y0, x1, y1)`` with a full-frame buffer.
+
+        The 7.3" (F) panel has no such command, so it always takes the full refresh path.
+        """
+        return self._epd is not None and hasattr(self._epd, "display_Partial")
+
+    def show(self, image: Image.Image, fingerprint: Optional[Mapping[str, Any]] = None) -> RefreshReport:
+        from ..render.layout import SECTIONS
+
+        grid = TileGrid(image.size, self._settings.display_tile_size)
+        with span("display.hash"):
+            tiles = grid.hashes(image)
+            checksum = hashlib.sha1("".join(tiles).encode("ascii")).hexdigest()
         if self._hash_path.exists() and self._hash_path.read_text() == checksum:
             LOGGER.info("Display content unchanged; skipping refresh")
-            return
+            self.sleep()
+            self._remember(fingerprint)
+            self.last_report = RefreshReport(phases=self._take_phase_times())
+            return self.last_report
 
-        if self._mock:
+        state = self._load_tile_state()
+        if state.get("tile") == grid.tile and state.get("size") == list(image.size):
+            regions = grid.regions(grid.dirty(state.get("hashes", []), tiles))
+        else:
+            regions = [Region(0, 0, image.width, image.height)]
+        report = RefreshReport(regions=regions, sections=dirty_sections(regions, SECTIONS))
+        LOGGER.info(
+            "Dirty regions: %s (%.0f%% of panel; sections: %s)",
+            ", ".join(str(region) for region in regions),
+            100 * report.dirty_area / (image.width * image.height),
+            ", ".join(report.sections) or "none",
+        )
+
+        partials = int(state.get("partials", 0))
+        use_partial = (
+            self._load_epd()
+            and self._supports_partial()
+            and partials < self._settings.partial_refresh_limit
+            and report.dirty_area < image.width * image.height
+        )
+        if not self._wake_panel(partial=use_partial):
+            report.mode = "mock"
             image.save(self._cache_path)
-            self._hash_path.write_text(checksum)
             LOGGER.info("Mock display updated -> %s", self._cache_path)
-            return
+        elif use_partial:
+            report.mode = "partial"
+            LOGGER.info(
+                "Partially refreshing %d region(s) (%d/%d before a full refresh)",
+                len(regions),
+                partials + 1,
+                self._settings.partial_refresh_limit,
+            )
+            buffer = self._buffer(image)
 
-        if self._epd is None:
-            LOGGER.error("Display driver unavailable")
-            return
+            def refresh_regions() -> None:
+                for region in regions:
+                    self._epd.display_Partial(buffer, *region.box)
+
+            self._phase("refresh", refresh_regions)
+            self.sleep()
+            image.save(self._cache_path)
+            partials += 1
+        else:
+            report.mode = "full"
+            LOGGER.info("Refreshing e-paper display")
+            buffer = self._buffer(image)
+            self._phase("refresh", self._epd.display, buffer)
+            self.sleep()
+            image.save(self._cache_path)
+            partials = 0
 
-        LOGGER.info("Refreshing e-paper display")
-        buffer = self._epd.getbuffer(image)
-        self._epd.display(buffer)
-        self._epd.sleep()
-        image.save(self._cache_path)
         self._hash_path.write_text(checksum)
+        self._forget(self._packed_path, self._etag_path)
+        state = {"tile": grid.tile, "size": list(image.size), "hashes": tiles, "partials": partials}
+        atomic_write_text(self._tiles_path, json.dumps(state, separators=(",", ":")))
+        self._remember(fingerprint)
+        report.phases = self._take_phase_times()
+        self.last_report = report
+        return report
+
+    def shown_packed(self) -> tuple[Optional[str], Optional[bytes]]:
+        """ETag and bytes of the frame-server frame on the panel, if that is what it shows."""
+        try:
+            return self._etag_path.read_text().strip(), self._packed_path.read_bytes()
+        except FileNotFoundError:
+            return None, None
+
+    def show_packed(self, buffer: bytes, etag: str, regions: Optional[List[Region]] = None) -> RefreshReport:
+        """Write a frame already in the panel's packed 4bpp layout straight to the panel.
+
+        ``regions`` (from a tile delta) are only reported; the 7.3" (F) panel
+        always refreshes the whole frame.
+        """
+        if self._etag_path.exists() and self._etag_path.read_text().strip() == etag:
+            LOGGER.info("Frame %s already on the panel; skipping refresh", etag)
+            self.sleep()
+            self.last_report = RefreshReport(phases=self._take_phase_times())
+            return self.last_report
+
+        report = RefreshReport(regions=list(regions or [Region(0, 0, *PANEL_SIZE)]))
+        if not self._wake_panel():
+            report.mode = "mock"
+            from .epd_buffer import unpack_nibbles
+
+            unpack_nibbles(buffer, PANEL_SIZE).save(self._cache_path)
+            LOGGER.info("Mock display updated from packed frame -> %s", self._cache_path)
+        else:
+            report.mode = "full"
+            LOGGER.info("Refreshing e-paper display from packed frame %s", etag)
+            self._phase("refresh", self._epd.display, buffer)
+            self.sleep()
+
+        atomic_write_bytes(self._packed_path, bytes(buffer))
+        atomic_write_text(self._etag_path, etag)
+        # The rendered-frame state no longer describes the panel.
+        self._forget(self._hash_path, self._tiles_path)
+        self._remember(None)
+        report.phases = self._take_phase_times()
+        self.last_report = report
+        return report
+
+    @staticmethod
+    def _forget(*paths: Path) -> None:
+        for path in paths:
+            if path.exists():
+                path.unlink()
 
     def clear(self) -> None:
-        if self._mock:
-            if self._cache_path.exists():
-                self._cache_path.unlink()
-            if self._hash_path.exists():
-                self._hash_path.unlink()
-            return
-        if self._epd is None:
-            return
-        self._epd.Clear()
-        self._epd.sleep()
-        if self._cache_path.exists():
-            self._cache_path.unlink()
-        if self._hash_path.exists():
-            self._hash_path.unlink()
+        if self._wake_panel():
+            self._phase("refresh", self._epd.Clear)
+            self.sleep()
+        self._forget(self._cache_path, self._hash_path, self._tiles_path, self._packed_path, self._etag_path)
+        self._remember(None)
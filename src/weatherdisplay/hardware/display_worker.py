@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, List, Mapping, Optional
+
+from ..utils import spans
+from .display import DisplayDriver, RefreshReport
+from .panel_watchdog import PanelTimeout
+from .regions import Region
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WorkerStatus:
+    """Snapshot of :class:`DisplayWorker` for logs and callers polling progress."""
+
+    state: str = "idle"  # idle, prepare, show, sleep or stopped
+    phase: Optional[str] = None  # panel call in progress (init, pack, refresh, sleep)
+    pending: bool = False  # a frame is waiting behind the current job
+    submitted: int = 0
+    shown: int = 0
+    superseded: int = 0
+    failed: int = 0
+    last_duration: Optional[float] = None  # seconds from dequeue to the end of the last show
+    last_report: Optional[RefreshReport] = None
+    last_error: Optional[str] = None
+    stuck: Optional[str] = None  # phase of an abandoned panel call that has not returned
+
+    def __str__(self) -> str:
+        parts = [self.state if self.phase is None else f"{self.state}/{self.phase}"]
+        parts.append(f"{self.shown} shown, {self.superseded} superseded, {self.failed} failed")
+        if self.last_report is not None and self.last_duration is not None:
+            parts.append(
+                f"last {self.last_report.mode} in {self.last_duration:.1f}s ({self.last_report.describe_phases()})"
+            )
+        if self.stuck:
+            parts.append(f"panel stuck in {self.stuck}")
+        elif self.last_error:
+            parts.append(f"last error: {self.last_error}")
+        return "; ".join(parts)
+
+
+@dataclass(slots=True)
+class _Frame:
+    show: Callable[[], RefreshReport]
+    future: Future
+    run: Optional[spans.Run] = None  # the wake that submitted it, which its panel spans belong to
+
+
+class DisplayWorker:
+    """Own the panel on a background thread so callers never wait on it.
+
+    Frames go into a one-slot mailbox: a frame submitted while another is still
+    waiting replaces it, and the superseded frame's future is cancelled, so only
+    the newest frame reaches the panel. :meth:`prepare` and :meth:`sleep` queue
+    an early ``init()`` or a deep sleep behind the current job and are dropped
+    when a frame (which does both) is pending. Every panel call runs under the
+    driver's :class:`PanelWatchdog`, so a hung BUSY line fails the job with
+    :class:`PanelTimeout` instead of stalling the worker.
+    """
+
+    def __init__(self, driver: DisplayDriver) -> None:
+        self._driver = driver
+        self._cond = threading.Condition()
+        self._frame: Optional[_Frame] = None
+        self._want_prepare = False
+        self._want_sleep = False
+        self._closed = False
+        self._status = WorkerStatus()
+        self._thread = threading.Thread(target=self._run, name="display-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, image: Image.Image, fingerprint: Optional[Mapping[str, Any]] = None) -> Future:
+        """Queue ``image``; the future resolves to its :class:`RefreshReport` (or is cancelled if superseded)."""
+        return self._enqueue(partial(self._driver.show, image, fingerprint))
+
+    def submit_packed(self, buffer: bytes, etag: str, regions: Optional[List[Region]] = None) -> Future:
+        """Queue a frame already packed for the panel (see :meth:`DisplayDriver.show_packed`)."""
+        return self._enqueue(partial(self._driver.show_packed, buffer, etag, regions))
+
+    def _enqueue(self, show: Callable[[], RefreshReport]) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("display worker is closed")
+            if self._frame is not None and self._frame.future.cancel():
+                self._status.superseded += 1
+                LOGGER.info("Dropping a queued frame superseded by a newer one")
+            self._frame = _Frame(show, future, spans.current_run())
+            self._want_sleep = False
+            self._status.submitted += 1
+            self._status.pending = True
+            self._cond.notify()
+        return future
+
+    def prepare(self) -> None:
+        """Run the panel ``init()`` ahead of the next frame (no-op if a frame is already queued)."""
+        with self._cond:
+            if self._frame is None and not self._closed:
+                self._want_prepare, self._want_sleep = True, False
+                self._cond.notify()
+
+    def sleep(self) -> None:
+        """Put the panel to sleep once the current job is done (no-op if a frame is queued)."""
+        with self._cond:
+            if self._frame is None and not self._closed:
+                self._want_prepare, self._want_sleep = False, True
+                self._cond.notify()
+
+    def status(self) -> WorkerStatus:
+        with self._cond:
+            status = replace(self._status)
+        status.phase = self._driver.current_phase
+        status.stuck = self._driver.stuck_phase
+        return status
+
+    def _idle(self) -> bool:
+        queued = self._frame is not None or self._want_prepare or self._want_sleep
+        return not queued and self._status.state in {"idle", "stopped"}
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running; ``False`` on timeout."""
+        with self._cond:
+            return self._cond.wait_for(self._idle, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Finish queued work, then stop the thread. Returns ``False`` if it was still busy at ``timeout``."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _next_job(self) -> Optional[str]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame is not None or self._want_prepare or self._want_sleep or self._closed)
+            if self._frame is not None:
+                job = "show"
+            elif self._want_prepare:
+                job = "prepare"
+            elif self._want_sleep:
+                job = "sleep"
+            else:
+                return None
+            self._want_prepare = self._want_sleep = False
+            self._status.state = job
+            return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            try:
+                if job == "show":
+                    self._show()
+                elif job == "prepare":
+                    self._driver.prepare()
+                else:
+                    self._driver.sleep()
+            except Exception as exc:  # reported through status(); the worker keeps serving
+                LOGGER.error("Display %s failed: %s", job, exc, exc_info=not isinstance(exc, PanelTimeout))
+                with self._cond:
+                    self._status.last_error = str(exc)
+            finally:
+                with self._cond:
+                    self._status.state = "idle"
+                    self._cond.notify_all()
+        with self._cond:
+            self._status.state = "stopped"
+            self._cond.notify_all()
+
+    def _show(self) -> None:
+        with self._cond:
+            frame, self._frame = self._frame, None
+            self._status.pending = False
+        if frame is None or not frame.future.set_running_or_notify_cancel():
+            return
+        started = time.monotonic()
+        try:
+            with spans.bind(frame.run):
+                report = frame.show()
+        except Exception as exc:
+            with self._cond:
+                self._status.failed += 1
+            frame.future.set_exception(exc)
+            raise
+        duration = time.monotonic() - started
+        with self._cond:
+            self._status.shown += 1
+            self._status.last_report = report
+            self._status.last_duration = duration
+            self._status.last_error = None
+        LOGGER.info("Display %s refresh done in %.1fs (%s)", report.mode, duration, report.describe_phases())
+        frame.future.set_result(report)
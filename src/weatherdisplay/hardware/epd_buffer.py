@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, List, Mapping, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+from .frame_codec import PANEL_SIZE
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+LOGGER = logging.getLogger(__name__)
+
+# Colour order of the epd7in3f controller; a pixel's 4-bit code is its index here.
+PANEL_COLORS: Tuple[Tuple[str, Tuple[int, int, int]], ...] = (
+    ("black", (0, 0, 0)),
+    ("white", (255, 255, 255)),
+    ("green", (0, 255, 0)),
+    ("blue", (0, 0, 255)),
+    ("red", (255, 0, 0)),
+    ("yellow", (255, 255, 0)),
+    ("orange", (255, 128, 0)),
+)
+BUFFER_MODES = ("vendor", "nearest", "ordered", "diffusion", "driver")
+
+_BAYER_4X4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+
+
+def _panel_palette_image() -> Image.Image:
+    from PIL import Image
+
+    flat: List[int] = []
+    for _, rgb in PANEL_COLORS:
+        flat.extend(rgb)
+    image = Image.new("P", (1, 1))
+    # Same padding as the vendor driver: the unused slots are black.
+    image.putpalette(flat + [0, 0, 0] * (256 - len(PANEL_COLORS)))
+    return image
+
+
+class PanelBufferPacker:
+    """Quantize a frame to panel colour codes and pack two pixels per byte.
+
+    Modes:
+
+    ``vendor``
+        Pillow's Floyd–Steinberg quantization against the controller palette,
+        exactly as ``epd7in3f.EPD.getbuffer`` does it, followed by a vectorized
+        pack. The output is byte-identical to the vendor buffer.
+    ``nearest``
+        Each pixel takes the nearest ``Settings.palette`` colour and is sent as
+        that colour's panel code. No dithering.
+    ``ordered``
+        Like ``nearest`` with a 4×4 Bayer threshold applied first.
+    ``diffusion``
+        Pillow's Floyd–Steinberg quantization against ``Settings.palette`` and
+        then mapped to panel codes.
+
+    A ``P`` frame drawn in ``Settings.palette`` (``RENDER_MODE=palette``) is
+    already quantized: every mode but ``ordered`` maps its indices straight to
+    panel codes, which gives the same bytes without an RGB copy. ``vendor``
+    does so only when every palette colour is exactly a controller colour, so
+    dithering would have nothing to diffuse.
+    """
+
+    def __init__(self, palette: Mapping[str, str], mode: str = "vendor", ordered_strength: float = 48.0) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for PanelBufferPacker")
+        if mode not in BUFFER_MODES or mode == "driver":
+            raise ValueError(f"Unsupported panel buffer mode: {mode}")
+        from PIL import ImageColor
+
+        self.mode = mode
+        self._ordered_strength = ordered_strength
+        self._colors = np.array([ImageColor.getrgb(value)[:3] for value in palette.values()], dtype=np.int32)
+        self._codes = np.array(
+            [self._panel_code(name, rgb) for name, rgb in zip(palette, self._colors)], dtype=np.uint8
+        )
+        if mode == "vendor":
+            self._quantize_palette = _panel_palette_image()
+        elif mode == "diffusion":
+            from ..render.palette import palette_image
+
+            self._quantize_palette = palette_image(palette)
+        self._flat_palette = [int(channel) for rgb in self._colors for channel in rgb]
+        self._index_codes = self._palette_index_codes()
+
+    def _palette_index_codes(self) -> "np.ndarray | None":
+        """Panel code per ``P`` index of a frame drawn in the palette, or ``None`` if it must be requantized."""
+        if self.mode == "ordered":
+            return None
+        codes = self._codes
+        if self.mode == "vendor":
+            panel = [rgb for _, rgb in PANEL_COLORS]
+            if any(tuple(int(c) for c in rgb) not in panel for rgb in self._colors):
+                return None
+            codes = np.array([panel.index(tuple(int(c) for c in rgb)) for rgb in self._colors], dtype=np.uint8)
+        # Indices past the palette never appear in a rendered frame; they take colour 0's code.
+        lookup = np.full(256, codes[0], dtype=np.uint8)
+        lookup[: len(codes)] = codes
+        return lookup
+
+    @staticmethod
+    def _panel_code(name: str, rgb: "np.ndarray") -> int:
+        for code, (panel_name, _) in enumerate(PANEL_COLORS):
+            if panel_name == name:
+                return code
+        distances = [sum((int(a) - b) ** 2 for a, b in zip(rgb, panel_rgb)) for _, panel_rgb in PANEL_COLORS]
+        return distances.index(min(distances))
+
+    def pack(self, image: Image.Image) -> bytearray:
+        if image.size == (PANEL_SIZE[1], PANEL_SIZE[0]):
+            image = image.rotate(90, expand=True)
+        elif image.size != PANEL_SIZE:
+            LOGGER.warning("Invalid image dimensions: %d x %d, expected %d x %d", *image.size, *PANEL_SIZE)
+        codes = self.codes(image)
+        return pack_nibbles(codes)
+
+    def codes(self, image: Image.Image) -> "np.ndarray":
+        """Per-pixel panel colour codes as a 2-D ``uint8`` array."""
+        if self._index_codes is not None and image.mode == "P" and self._drawn_in_palette(image):
+            return self._index_codes[np.asarray(image, dtype=np.uint8)]
+        if self.mode == "vendor":
+            indexed = image.convert("RGB").quantize(palette=self._quantize_palette)
+            return np.asarray(indexed, dtype=np.uint8)
+        if self.mode == "diffusion":
+            indexed = image.convert("RGB").quantize(palette=self._quantize_palette)
+            return self._codes[np.asarray(indexed, dtype=np.uint8)]
+
+        rgb = np.asarray(image.convert("RGB"), dtype=np.int32)
+        if self.mode == "ordered":
+            height, width = rgb.shape[:2]
+            threshold = (np.array(_BAYER_4X4, dtype=np.float32) + 0.5) / 16.0 - 0.5
+            tiled = np.tile(threshold, (-(-height // 4), -(-width // 4)))[:height, :width]
+            rgb = np.clip(rgb + (tiled * self._ordered_strength).astype(np.int32)[..., None], 0, 255)
+        return self._codes[self._nearest(rgb)]
+
+    def _drawn_in_palette(self, image: Image.Image) -> bool:
+        flat = image.getpalette() or []
+        return flat[: len(self._flat_palette)] == self._flat_palette
+
+    def _nearest(self, rgb: "np.ndarray") -> "np.ndarray":
+        """Index of the closest palette colour per pixel.
+
+        Rendered frames hold few distinct colours (palette fills plus anti-aliasing
+        ramps), so distances are computed once per distinct colour.
+        """
+        keys = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+        unique, inverse = np.unique(keys.reshape(-1), return_inverse=True)
+        colors = np.stack(((unique >> 16) & 0xFF, (unique >> 8) & 0xFF, unique & 0xFF), axis=1)
+        distances = ((colors[:, None, :] - self._colors[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1).astype(np.uint8)[inverse].reshape(keys.shape)
+
+
+def pack_nibbles(codes: "np.ndarray") -> bytearray:
+    """Pack 4-bit codes two per byte, first pixel in the high nibble (epd7in3f layout)."""
+    flat = np.ascontiguousarray(codes, dtype=np.uint8).reshape(-1)
+    return bytearray(((flat[0::2] << 4) | flat[1::2]).tobytes())
+
+
+def unpack_nibbles(buffer: bytes, size: Tuple[int, int]) -> Image.Image:
+    """RGB preview of a packed frame (inverse of :func:`pack_nibbles` plus the panel colours)."""
+    from PIL import Image
+
+    if np is None:
+        raise RuntimeError("numpy is required to unpack panel buffers")
+    packed = np.frombuffer(bytes(buffer), dtype=np.uint8)
+    codes = np.empty(packed.size * 2, dtype=np.uint8)
+    codes[0::2], codes[1::2] = packed >> 4, packed & 0x0F
+    image = Image.frombuffer("P", size, codes.tobytes(), "raw", "P", 0, 1)
+    image.putpalette(_panel_palette_image().getpalette())
+    return image.convert("RGB")
+
+
+def build_packer(palette: Mapping[str, str], mode: str) -> PanelBufferPacker | None:
+    """Return a packer for ``mode``, or ``None`` to use the driver's ``getbuffer``."""
+    if mode == "driver":
+        return None
+    if np is None:
+        LOGGER.warning("numpy unavailable; using the driver's getbuffer")
+        return None
+    return PanelBufferPacker(palette, mode)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+from .regions import Region, TileGrid
+
+# epd7in3f resolution. Defined here rather than in epd_buffer so thin clients never import numpy.
+PANEL_SIZE = (800, 480)
+
+FRAME_CONTENT_TYPE = "application/vnd.weatherdisplay.epd4"
+DELTA_CONTENT_TYPE = "application/vnd.weatherdisplay.epd4-delta"
+
+DELTA_MAGIC = b"WDDELTA1"
+# magic, frame width, frame height, region count
+_DELTA_HEADER = struct.Struct("<8sHHH")
+# left, top, right, bottom (pixels, right/bottom exclusive); the region's packed rows follow
+_DELTA_REGION = struct.Struct("<HHHH")
+
+
+class FrameFormatError(ValueError):
+    """A packed frame or delta does not match the expected geometry."""
+
+
+def frame_etag(buffer: bytes) -> str:
+    """Content hash of a packed frame, quoted for use as an HTTP ETag."""
+    return '"' + hashlib.blake2b(buffer, digest_size=16).hexdigest() + '"'
+
+
+def packed_size(size: Tuple[int, int]) -> int:
+    width, height = size
+    return width * height // 2
+
+
+def _check(buffer: bytes, size: Tuple[int, int]) -> None:
+    if size[0] % 2:
+        raise FrameFormatError(f"Packed frames need an even width, got {size[0]}")
+    if len(buffer) != packed_size(size):
+        raise FrameFormatError(f"Packed frame is {len(buffer)} bytes, expected {packed_size(size)} for {size[0]}x{size[1]}")
+
+
+def dirty_tiles(old: bytes, new: bytes, grid: TileGrid) -> List[int]:
+    """Indices of tiles whose packed bytes differ, compared row by row without unpacking."""
+    stride = grid.width // 2
+    old_view, new_view = memoryview(old), memoryview(new)
+    dirty = []
+    for index in range(grid.columns * grid.rows):
+        left, top, right, bottom = grid.tile_box(index)
+        start, end = left // 2, right // 2
+        for y in range(top, bottom):
+            offset = y * stride
+            if old_view[offset + start : offset + end] != new_view[offset + start : offset + end]:
+                dirty.append(index)
+                break
+    return dirty
+
+
+def encode_delta(old: bytes, new: bytes, size: Tuple[int, int], tile: int) -> Tuple[bytes, List[Region]]:
+    """Tiles of ``new`` that differ from ``old``, merged into rectangles, as a delta body."""
+    _check(old, size)
+    _check(new, size)
+    if tile % 2:
+        raise FrameFormatError(f"Delta tiles must be an even number of pixels wide, got {tile}")
+    grid = TileGrid(size, tile)
+    regions = grid.regions(dirty_tiles(old, new, grid))
+    stride = size[0] // 2
+    parts = [_DELTA_HEADER.pack(DELTA_MAGIC, size[0], size[1], len(regions))]
+    for region in regions:
+        parts.append(_DELTA_REGION.pack(*region.box))
+        start, end = region.left // 2, region.right // 2
+        parts.extend(new[y * stride + start : y * stride + end] for y in range(region.top, region.bottom))
+    return b"".join(parts), regions
+
+
+def apply_delta(base: bytes, delta: bytes, size: Tuple[int, int]) -> Tuple[bytearray, List[Region]]:
+    """Patch a copy of ``base`` with ``delta``; returns the new frame and the regions it touched."""
+    _check(base, size)
+    try:
+        magic, width, height, count = _DELTA_HEADER.unpack_from(delta)
+    except struct.error as exc:
+        raise FrameFormatError("Truncated frame delta") from exc
+    if magic != DELTA_MAGIC or (width, height) != tuple(size):
+        raise FrameFormatError(f"Delta is for a {width}x{height} frame, expected {size[0]}x{size[1]}")
+    frame = bytearray(base)
+    stride = width // 2
+    offset = _DELTA_HEADER.size
+    regions = []
+    for _ in range(count):
+        try:
+            region = Region(*_DELTA_REGION.unpack_from(delta, offset))
+        except struct.error as exc:
+            raise FrameFormatError("Truncated frame delta") from exc
+        offset += _DELTA_REGION.size
+        if region.left % 2 or region.right % 2 or region.right > width or region.bottom > height:
+            raise FrameFormatError(f"Delta region {region} does not fit the packed frame")
+        start, end = region.left // 2, region.right // 2
+        row = end - start
+        for y in range(region.top, region.bottom):
+            chunk = delta[offset : offset + row]
+            if len(chunk) != row:
+                raise FrameFormatError("Truncated frame delta")
+            frame[y * stride + start : y * stride + end] = chunk
+            offset += row
+        regions.append(region)
+    if offset != len(delta):
+        raise FrameFormatError(f"{len(delta) - offset} trailing byte(s) after the last delta region")
+    return frame, regions
+
+
+def parse_etags(header: Optional[str]) -> Sequence[str]:
+    """Entity tags listed in an ``If-None-Match`` header (weak prefixes dropped)."""
+    if not header:
+        return ()
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PanelTimeout(RuntimeError):
+    """A panel call did not return within its phase deadline."""
+
+    def __init__(self, phase: str, deadline: Optional[float], message: Optional[str] = None) -> None:
+        super().__init__(message or f"e-paper {phase} did not finish within {deadline:g}s (BUSY never released?)")
+        self.phase = phase
+        self.deadline = deadline
+
+
+@dataclass(slots=True)
+class StuckCall:
+    phase: str
+    thread: threading.Thread
+    since: float
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.since
+
+
+class PanelWatchdog:
+    """Run blocking panel calls against per-phase deadlines.
+
+    The waveshare drivers poll the BUSY line in an unbounded loop, so a panel
+    that never releases it blocks the caller forever. Each call runs on a helper
+    thread and the caller waits at most the deadline for its phase; phases
+    without one (or with ``0``) run inline. A call that overruns cannot be
+    killed, so it is abandoned: until it returns, later calls raise
+    :class:`PanelTimeout` straight away instead of issuing SPI commands under it.
+    """
+
+    def __init__(self, deadlines: Mapping[str, float]) -> None:
+        self._deadlines = dict(deadlines)
+        self._stuck: Optional[StuckCall] = None
+
+    @property
+    def stuck(self) -> Optional[StuckCall]:
+        stuck = self._stuck
+        if stuck is not None and not stuck.thread.is_alive():
+            LOGGER.warning("Abandoned e-paper %s call returned after %.1fs", stuck.phase, stuck.elapsed)
+            self._stuck = stuck = None
+        return stuck
+
+    def call(self, phase: str, fn: Callable[..., T], *args: Any) -> T:
+        deadline = self._deadlines.get(phase) or None
+        stuck = self.stuck
+        if stuck is not None:
+            raise PanelTimeout(
+                phase, deadline, f"e-paper still stuck in {stuck.phase} ({stuck.elapsed:.0f}s); not starting {phase}"
+            )
+        if deadline is None:
+            return fn(*args)
+
+        outcome: dict[str, Any] = {}
+        done = threading.Event()
+
+        def target() -> None:
+            try:
+                outcome["value"] = fn(*args)
+            except BaseException as exc:  # handed back to the calling thread
+                outcome["error"] = exc
+            finally:
+                done.set()
+
+        started = time.monotonic()
+        thread = threading.Thread(target=target, name=f"epd-{phase}", daemon=True)
+        thread.start()
+        if not done.wait(deadline):
+            self._stuck = StuckCall(phase, thread, started)
+            raise PanelTimeout(phase, deadline)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Mapping, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """Axis-aligned rectangle in panel pixels; ``right``/``bottom`` are exclusive."""
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @property
+    def box(self) -> Box:
+        return (self.left, self.top, self.right, self.bottom)
+
+    @property
+    def area(self) -> int:
+        return (self.right - self.left) * (self.bottom - self.top)
+
+    def intersects(self, box: Box) -> bool:
+        left, top, right, bottom = box
+        return self.left < right and left < self.right and self.top < bottom and top < self.bottom
+
+    def __str__(self) -> str:
+        return f"{self.right - self.left}x{self.bottom - self.top}+{self.left}+{self.top}"
+
+
+class TileGrid:
+    """Fixed grid of square tiles used to diff consecutive frames."""
+
+    def __init__(self, size: Tuple[int, int], tile: int) -> None:
+        self.width, self.height = size
+        self.tile = tile
+        self.columns = -(-self.width // tile)
+        self.rows = -(-self.height // tile)
+
+    def tile_box(self, index: int) -> Box:
+        row, column = divmod(index, self.columns)
+        left, top = column * self.tile, row * self.tile
+        return (left, top, min(left + self.tile, self.width), min(top + self.tile, self.height))
+
+    def hashes(self, image: Image.Image) -> List[str]:
+        return [
+            hashlib.blake2b(image.crop(self.tile_box(index)).tobytes(), digest_size=8).hexdigest()
+            for index in range(self.columns * self.rows)
+        ]
+
+    def dirty(self, previous: Sequence[str], current: Sequence[str]) -> List[int]:
+        if len(previous) != len(current):
+            return list(range(len(current)))
+        return [index for index, (old, new) in enumerate(zip(previous, current)) if old != new]
+
+    def regions(self, dirty: Sequence[int]) -> List[Region]:
+        """Merge dirty tiles into rectangles.
+
+        Horizontal runs of dirty tiles in each tile row become spans, and spans that
+        cover the same columns in consecutive rows are merged vertically.
+        """
+        dirty_set = set(dirty)
+        open_spans: dict[Tuple[int, int], List[int]] = {}
+        regions: List[Region] = []
+        for row in range(self.rows):
+            spans: List[Tuple[int, int]] = []
+            column = 0
+            while column < self.columns:
+                if row * self.columns + column in dirty_set:
+                    start = column
+                    while column < self.columns and row * self.columns + column in dirty_set:
+                        column += 1
+                    spans.append((start, column))
+                else:
+                    column += 1
+            next_open: dict[Tuple[int, int], List[int]] = {}
+            for span in spans:
+                rows = open_spans.pop(span, [row, row])
+                rows[1] = row
+                next_open[span] = rows
+            regions.extend(self._region(span, rows) for span, rows in open_spans.items())
+            open_spans = next_open
+        regions.extend(self._region(span, rows) for span, rows in open_spans.items())
+        return sorted(regions, key=lambda region: (region.top, region.left))
+
+    def _region(self, span: Tuple[int, int], rows: Sequence[int]) -> Region:
+        return Region(
+            left=span[0] * self.tile,
+            top=rows[0] * self.tile,
+            right=min(span[1] * self.tile, self.width),
+            bottom=min((rows[1] + 1) * self.tile, self.height),
+        )
+
+
+def dirty_sections(regions: Sequence[Region], sections: Mapping[str, Box]) -> List[str]:
+    return [name for name, box in sections.items() if any(region.intersects(box) for region in regions)]
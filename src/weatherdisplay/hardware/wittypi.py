@@ -1,29 +1,56 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
-
-try:
-    from smbus2 import SMBus
-except ImportError:  # pragma: no cover
-    SMBus = None  # type: ignore
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
 
 from ..models import BatteryStatus
+from ..utils.spans import span
 
 LOGGER = logging.getLogger(__name__)
 
+# Witty Pi 4 startup alarm (ALARM1): second, minute, hour, day-of-month in BCD,
+# compared against the board's RTC, which runs on UTC.
+REG_ALARM1_SECOND = 27
+REG_ALARM1_MINUTE = 28
+REG_ALARM1_HOUR = 29
+REG_ALARM1_DAY = 30
+
+
+def to_bcd(value: int) -> int:
+    return (value // 10) << 4 | value % 10
+
+
+def from_bcd(value: int) -> int:
+    return (value >> 4) * 10 + (value & 0x0F)
+
+
+def _load_smbus():
+    """Import smbus2 on first use so paths that never touch I2C skip it."""
+    try:
+        from smbus2 import SMBus
+    except ImportError:  # pragma: no cover
+        return None
+    return SMBus
+
 
 class WittyPiController:
-    def __init__(self, i2c_address: int, bus: int = 1) -> None:
+    def __init__(self, i2c_address: int, bus: int = 1, bus_factory: Optional[Callable[[int], Any]] = None) -> None:
+        """``bus_factory(bus_id)`` returns an SMBus-like context manager; defaults to ``smbus2.SMBus``."""
         self.address = i2c_address
         self.bus_id = bus
+        self._bus_factory = bus_factory
+
+    def _factory(self) -> Optional[Callable[[int], Any]]:
+        return self._bus_factory or _load_smbus()
 
     def read_battery_status(self) -> Optional[BatteryStatus]:
+        SMBus = self._factory()
         if SMBus is None:
             LOGGER.debug("smbus2 unavailable; skipping Witty Pi telemetry")
             return None
         try:
-            with SMBus(self.bus_id) as bus:
+            with span("i2c.battery"), SMBus(self.bus_id) as bus:
                 raw = bus.read_i2c_block_data(self.address, 0, 16)
         except FileNotFoundError:
             LOGGER.warning("I2C bus %s unavailable", self.bus_id)
@@ -51,3 +78,33 @@ class WittyPiController:
             is_low_voltage_shutdown=bool(low_voltage_flag),
             last_action_code=last_reason,
         )
+
+    def set_startup_alarm(self, when: datetime) -> bool:
+        """Program ALARM1 so the board powers the Pi on at ``when`` (to the second)."""
+        when = when.astimezone(timezone.utc)
+        values = {
+            REG_ALARM1_SECOND: to_bcd(when.second),
+            REG_ALARM1_MINUTE: to_bcd(when.minute),
+            REG_ALARM1_HOUR: to_bcd(when.hour),
+            REG_ALARM1_DAY: to_bcd(when.day),
+        }
+        SMBus = self._factory()
+        if SMBus is None:
+            LOGGER.warning("smbus2 unavailable; cannot program the Witty Pi startup alarm")
+            return False
+        try:
+            with SMBus(self.bus_id) as bus:
+                for register, value in values.items():
+                    bus.write_byte_data(self.address, register, value)
+                readback = [bus.read_byte_data(self.address, register) for register in values]
+        except FileNotFoundError:
+            LOGGER.warning("I2C bus %s unavailable", self.bus_id)
+            return False
+        except OSError as exc:
+            LOGGER.error("Unable to program Witty Pi startup alarm: %s", exc)
+            return False
+        if readback != list(values.values()):
+            LOGGER.error("Witty Pi startup alarm readback mismatch: wrote %s, read %s", list(values.values()), readback)
+            return False
+        LOGGER.info("Witty Pi startup alarm set for %s UTC", when.strftime("%d %H:%M:%S"))
+        return True
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional, Sequence
 
 
@@ -18,6 +18,9 @@ class WeatherSnapshot:
     description: str
     icon_key: str
     icon_color: str
+    # Of the observation's day; they tell day from night at other times.
+    sunrise: Optional[datetime] = None
+    sunset: Optional[datetime] = None
 
 
 @dataclass(slots=True)
@@ -28,6 +31,7 @@ class ForecastEntry:
     icon_key: str
     icon_color: str
     description: str
+    condition_code: int = 802
 
 
 @dataclass(slots=True)
@@ -44,12 +48,23 @@ class BatteryStatus:
     is_external_power: bool
     is_low_voltage_shutdown: bool
     last_action_code: int
+    # Filled in from the battery log (see hardware.battery_log); None for a bare sample.
+    smoothed_voltage: Optional[float] = None
+    smoothed_current: Optional[float] = None
+    # Output voltage now from the discharge trend, which does not lag like the smoothed one.
+    trend_voltage: Optional[float] = None
+    time_to_empty: Optional[timedelta] = None
+
+    @property
+    def voltage(self) -> float:
+        """Smoothed output voltage when available, else the instantaneous reading."""
+        return self.output_voltage if self.smoothed_voltage is None else self.smoothed_voltage
 
     @property
     def percentage(self) -> int:
         # Rough guess using 4.8-5.2V range for USB supply.
         span = 5.2 - 4.6
-        pct = max(0.0, min(1.0, (self.output_voltage - 4.6) / span))
+        pct = max(0.0, min(1.0, (self.voltage - 4.6) / span))
         return int(round(pct * 100))
 
 
@@ -59,3 +74,4 @@ class RenderPayload:
     battery: Optional[BatteryStatus]
     clothing_image: Optional[str]
     last_updated: datetime
+    stale_since: Optional[datetime] = None
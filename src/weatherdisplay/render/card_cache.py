@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+from PIL import Image
+
+from ..utils.fs import atomic_write_bytes
+from .palette import palette_image
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CardCache:
+    """Clothing cards stored pre-resized and mapped to the panel palette.
+
+    Each card is decoded, resized and quantized once and then kept as raw pixel
+    data under ``cache_dir/cards/<variant>``, one subdirectory per target size,
+    palette and pixel mode, so renderers with different palettes or modes can
+    share ``cache_dir`` without pruning each other's entries. Entries are keyed
+    on the source path and its mtime as well, so editing a card produces a new
+    entry. Loading a card memory-maps the raw file instead of decoding a PNG
+    and resampling it.
+    """
+
+    def __init__(self, cache_dir: Path, size: Tuple[int, int], palette: Mapping[str, str], mode: str = "RGB") -> None:
+        self._size = size
+        self._palette = palette
+        self._mode = mode
+        self._entry_bytes = size[0] * size[1] * Image.getmodebands(mode)
+        self._palette_key = ",".join(f"{name}={value}" for name, value in palette.items())
+        variant = f"{size[0]}x{size[1]}|{self._palette_key}|{mode}"
+        self._directory = cache_dir / "cards" / hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, source: Path) -> Path:
+        stat = source.stat()
+        key = f"{source.resolve()}|{stat.st_mtime_ns}|{self._size[0]}x{self._size[1]}|{self._palette_key}|{self._mode}"
+        return self._directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.raw"
+
+    def load(self, source: Path) -> Optional[Image.Image]:
+        try:
+            entry = self._entry_path(source)
+        except FileNotFoundError:
+            return None
+        try:
+            with entry.open("rb") as handle:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return self._build(source, entry)
+        if len(data) != self._entry_bytes:
+            LOGGER.warning("Rebuilding clothing card %s: cache entry has %d bytes", source.name, len(data))
+            data.close()
+            return self._build(source, entry)
+        return Image.frombuffer(self._mode, self._size, data, "raw", self._mode, 0, 1)
+
+    def _build(self, source: Path, entry: Path) -> Image.Image:
+        card = Image.open(source).convert("RGB").resize(self._size)
+        card = card.quantize(palette=palette_image(self._palette), dither=Image.Dither.NONE)
+        if self._mode != "P":
+            card = card.convert(self._mode)
+        atomic_write_bytes(entry, card.tobytes())
+        LOGGER.info("Cached clothing card %s -> %s", source.name, entry.name)
+        return card
+
+    def warm(self, directory: Path) -> int:
+        """Build entries for every card in ``directory`` and drop ones of this variant no longer referenced."""
+        keep = set()
+        for source in sorted(directory.glob("*.png")):
+            entry = self._entry_path(source)
+            keep.add(entry.name)
+            if not entry.exists():
+                self._build(source, entry)
+        for stale in self._directory.glob("*.raw"):
+            if stale.name not in keep:
+                stale.unlink()
+        # Entries from before the per-variant subdirectories.
+        for stale in self._directory.parent.glob("*.raw"):
+            stale.unlink()
+        return len(keep)
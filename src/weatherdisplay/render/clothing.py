@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Collection, Optional
 
 from ..models import ForecastEntry, WeatherBundle
 
 
-def choose_clothing_card(weather: WeatherBundle, assets_dir: Path) -> Optional[str]:
+def choose_clothing_card(
+    weather: WeatherBundle, assets_dir: Path, cards: Optional[Collection[str]] = None
+) -> Optional[str]:
+    """Path of the card for ``weather``; ``cards`` (file names in ``assets_dir``) saves a stat when known."""
     current_temp = weather.current.temperature
     description = weather.current.description.lower()
     rain_probability = max((entry.precipitation_probability for entry in weather.next_hours), default=0.0)
@@ -22,6 +25,7 @@ def choose_clothing_card(weather: WeatherBundle, assets_dir: Path) -> Optional[s
         slug = "mild"
 
     card = assets_dir / f"{slug}.png"
-    if card.exists():
+    exists = card.name in cards if cards is not None else card.exists()
+    if exists:
         return str(card)
     return None
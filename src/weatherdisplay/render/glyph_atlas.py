@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import mmap
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ..utils.fs import atomic_write_bytes
+from ..utils.spans import span
+
+LOGGER = logging.getLogger(__name__)
+MAGIC = b"WDGLYPH1\n"
+
+
+@dataclass(slots=True)
+class _Entry:
+    left: int
+    top: int
+    width: int
+    height: int
+    data: bytes | memoryview
+    uses: int = 1
+
+    def mask(self, mode: str = "L") -> Image.Image:
+        return Image.frombuffer(mode, (self.width, self.height), self.data, "raw", mode, 0, 1)
+
+
+def _mask_bytes(mode: str, width: int, height: int) -> int:
+    # "1" masks are packed eight pixels to a byte, each row padded to whole bytes.
+    return -(-width // 8) * height if mode == "1" else width * height
+
+
+class GlyphAtlas:
+    """Pre-rasterized text runs and icon glyphs, composited by blitting.
+
+    Each entry is the anti-aliased coverage mask FreeType produces for a string
+    at one face and size, together with its bearing offset. Drawing an entry
+    with ``ImageDraw.bitmap`` goes through the same ``draw_bitmap`` blend that
+    ``ImageDraw.text`` uses, so the output is pixel-identical for any fill colour.
+
+    Entries used on more than one wake are persisted to ``path`` (a JSON index
+    followed by the raw masks). The file is memory-mapped on load and discarded
+    when any font file changes. The in-memory set is an LRU bounded by
+    ``max_bytes``. ``font_data`` maps a font path to subset font bytes to
+    rasterize with instead of the file (see ``utils.asset_bundle``).
+
+    ``mask_mode="1"`` stores bilevel masks instead, rasterized the way Pillow
+    draws text on ``1`` and ``P`` images (no anti-aliasing, which a palette
+    canvas cannot blend), at one bit per pixel.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        faces: Mapping[str, Tuple[Path, int]],
+        max_bytes: int,
+        font_data: Optional[Mapping[Path, bytes | memoryview]] = None,
+        mask_mode: str = "L",
+    ) -> None:
+        if mask_mode not in {"L", "1"}:
+            raise ValueError(f"Unsupported glyph mask mode: {mask_mode}")
+        self._mask_mode = mask_mode
+        self._path = path
+        self._faces = dict(faces)
+        self._font_data = dict(font_data or {})
+        self._fonts: Dict[str, ImageFont.FreeTypeFont] = {}
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._signature = self._font_signature()
+        self._load()
+
+    def _font_signature(self) -> Dict[str, list]:
+        signature = {}
+        for face, (path, size) in sorted(self._faces.items()):
+            stat = path.stat()
+            signature[face] = [str(path), stat.st_mtime_ns, stat.st_size, size]
+        return signature
+
+    def font(self, face: str) -> ImageFont.FreeTypeFont:
+        """FreeType face for ``face``, loaded only when a string has to be rasterized."""
+        font = self._fonts.get(face)
+        if font is None:
+            path, size = self._faces[face]
+            data = self._font_data.get(path)
+            with span("font.load", face=face):
+                font = ImageFont.truetype(io.BytesIO(data) if data is not None else str(path), size)
+            self._fonts[face] = font
+        return font
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[int, int], text: str, face: str, fill: str) -> None:
+        entry = self._lookup(face, text)
+        if entry.width and entry.height:
+            draw.bitmap((xy[0] + entry.left, xy[1] + entry.top), entry.mask(self._mask_mode), fill=fill)
+
+    def _lookup(self, face: str, text: str) -> _Entry:
+        key = (face, text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry.uses += 1
+            if entry.uses == 2:
+                self._dirty = True
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self._rasterize(face, text)
+        self._insert(key, entry)
+        return entry
+
+    def _rasterize(self, face: str, text: str) -> _Entry:
+        font = self.font(face)
+        left, top, right, bottom = font.getbbox(text, mode=self._mask_mode)
+        width, height = max(0, right - left), max(0, bottom - top)
+        if not width or not height:
+            return _Entry(left, top, 0, 0, b"")
+        canvas = Image.new(self._mask_mode, (width, height), 0)
+        ImageDraw.Draw(canvas).text((-left, -top), text, font=font, fill=255 if self._mask_mode == "L" else 1)
+        return _Entry(left, top, width, height, canvas.tobytes())
+
+    def _insert(self, key: Tuple[str, str], entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._bytes += len(entry.data)
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+            if evicted.uses > 1:
+                self._dirty = True
+
+    def _load(self) -> None:
+        try:
+            with self._path.open("rb") as handle:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return
+        view = memoryview(data)
+        try:
+            if bytes(view[: len(MAGIC)]) != MAGIC:
+                raise ValueError("bad magic")
+            header_end = data.find(b"\n", len(MAGIC))
+            header = json.loads(bytes(view[len(MAGIC) : header_end]))
+        except ValueError as exc:
+            LOGGER.warning("Discarding unreadable glyph atlas %s: %s", self._path, exc)
+            return
+        if header.get("fonts") != self._signature or header.get("mask", "L") != self._mask_mode:
+            LOGGER.info("Fonts changed; rebuilding glyph atlas")
+            self._dirty = True
+            return
+        offset = header_end + 1
+        for face, text, left, top, width, height, uses in header["entries"]:
+            size = _mask_bytes(self._mask_mode, width, height)
+            self._insert((face, text), _Entry(left, top, width, height, view[offset : offset + size], uses))
+            offset += size
+        LOGGER.debug("Loaded %d glyph atlas entries (%d bytes)", len(self._entries), self._bytes)
+
+    def flush(self) -> None:
+        """Persist entries seen on more than one wake, if that set changed."""
+        if not self._dirty:
+            return
+        rows = []
+        blobs = []
+        for (face, text), entry in self._entries.items():
+            if entry.uses < 2:
+                continue
+            rows.append([face, text, entry.left, entry.top, entry.width, entry.height, entry.uses])
+            blobs.append(bytes(entry.data))
+        header = json.dumps(
+            {"fonts": self._signature, "mask": self._mask_mode, "entries": rows}, separators=(",", ":"), ensure_ascii=False
+        )
+        atomic_write_bytes(self._path, MAGIC + header.encode("utf-8") + b"\n" + b"".join(blobs))
+        self._dirty = False
+        LOGGER.debug("Persisted %d glyph atlas entries", len(rows))
+
+    def stats(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es), {len(self._entries)} entries, {self._bytes} bytes"
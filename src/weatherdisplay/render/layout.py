@@ -2,62 +2,136 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Dict, Optional, Sequence, Union
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from ..config import Settings
 from ..models import BatteryStatus, ForecastEntry, RenderPayload, WeatherBundle
 from ..utils.icon_font import MaterialIconFont
+from ..utils.spans import span
+from .card_cache import CardCache
+from .glyph_atlas import GlyphAtlas
+from .palette import nearest_index, palette_colors, palette_image
 
 WIDTH, HEIGHT = 800, 480
 LEFT_WIDTH = 400
 RIGHT_WIDTH = 400
 PADDING = 20
+SECTIONS = {
+    "left": (0, 0, LEFT_WIDTH, HEIGHT),
+    "right": (LEFT_WIDTH, 0, WIDTH, HEIGHT),
+}
+# RENDER_MODE -> Pillow mode of the canvas.
+RENDER_MODES = {"rgb": "RGB", "palette": "P"}
+Ink = Union[str, int]
 
 
 class LayoutRenderer:
-    """Compose the 800×480 canvas for the e-paper display."""
+    """Compose the 800×480 canvas for the e-paper display.
+
+    With ``RENDER_MODE=palette`` the canvas is a single ``P`` image whose
+    palette is ``Settings.palette`` in declaration order: colours become
+    palette indices, text is drawn from 1-bit glyph masks (as Pillow does for
+    ``P`` images) and clothing cards are pasted from the palette-mode card
+    cache, so a frame takes one byte per pixel instead of three.
+    """
 
     def __init__(self, settings: Settings) -> None:
+        with span("render.init"):
+            self._init(settings)
+
+    def _init(self, settings: Settings) -> None:
         self._settings = settings
-        self._time_font = ImageFont.truetype(str(settings.fonts["text"]), 68)
-        self._data_font = ImageFont.truetype(str(settings.fonts["text"]), 32)
-        self._mono_small = ImageFont.truetype(str(settings.fonts["text"]), 24)
-        self._icon_font = MaterialIconFont(settings.fonts["icons"], settings.icon_codepoints)
-        self._icon_face = ImageFont.truetype(str(settings.fonts["icons"]), 120)
-        self._icon_small_face = ImageFont.truetype(str(settings.fonts["icons"]), 48)
+        mode = RENDER_MODES.get(settings.render_mode)
+        if mode is None:
+            raise ValueError(f"Unsupported render mode: {settings.render_mode}")
+        self._mode = mode
+        self._colors = palette_colors(settings.palette)
+        self._inks: Dict[str, Ink] = {}
+        assets = settings.assets
+        self._icon_font = MaterialIconFont(
+            settings.fonts["icons"], settings.icon_codepoints, assets.glyphs if assets is not None else None
+        )
+        self._atlas = GlyphAtlas(
+            settings.cache_dir / ("glyph_atlas.bin" if mode == "RGB" else "glyph_atlas.p.bin"),
+            {
+                "time": (settings.fonts["text"], 68),
+                "data": (settings.fonts["text"], 32),
+                "small": (settings.fonts["text"], 24),
+                "icon": (settings.fonts["icons"], 120),
+                "icon_small": (settings.fonts["icons"], 48),
+            },
+            max_bytes=settings.glyph_atlas_max_bytes,
+            font_data={settings.fonts[name]: data for name, data in assets.fonts.items()} if assets is not None else None,
+            mask_mode="L" if mode == "RGB" else "1",
+        )
+        self._right_cache: Optional[tuple[Optional[str], Image.Image]] = None
+        self._cards = CardCache(settings.cache_dir, (RIGHT_WIDTH, HEIGHT), settings.palette, mode=mode)
+        self._cards.warm(settings.clothing_dir)
 
     def build(self, payload: RenderPayload) -> Image.Image:
-        canvas = Image.new("RGB", (WIDTH, HEIGHT), color=self._settings.color("white"))
-        left = self._build_left(payload.weather, payload.battery, payload.last_updated)
-        right = self._build_right(payload.clothing_image)
-        canvas.paste(left, (0, 0))
-        canvas.paste(right, (LEFT_WIDTH, 0))
+        with span("render.build"):
+            canvas = self._new_image((WIDTH, HEIGHT))
+            draw = ImageDraw.Draw(canvas)
+            self._draw_left(draw, payload.weather, payload.battery, payload.last_updated)
+            # The left section is drawn in place; the card covers anything that ran past it.
+            canvas.paste(self._cached_right(payload.clothing_image), (LEFT_WIDTH, 0))
+            if payload.stale_since is not None:
+                self._draw_stale_marker(draw, payload.stale_since)
+            self._atlas.flush()
         return canvas
 
-    def _build_left(self, weather: WeatherBundle, battery: Optional[BatteryStatus], current_time: datetime) -> Image.Image:
-        section = Image.new("RGB", (LEFT_WIDTH, HEIGHT), color=self._settings.color("white"))
-        draw = ImageDraw.Draw(section)
-
-        draw.text((PADDING, 18), current_time.strftime("%H:%M"), font=self._time_font, fill=self._settings.color("black"))
-        draw.text((PADDING, 110), current_time.strftime("%a %b %d"), font=self._data_font, fill=self._settings.color("blue"))
+    def _new_image(self, size: tuple[int, int]) -> Image.Image:
+        if self._mode == "RGB":
+            return Image.new("RGB", size, color=self._settings.color("white"))
+        image = Image.new("P", size, color=self._ink(self._settings.color("white")))
+        image.putpalette(palette_image(self._settings.palette).getpalette())
+        return image
+
+    def _ink(self, color: str) -> Ink:
+        """``color`` as the canvas takes it: unchanged for RGB, the nearest palette index for ``P``."""
+        if self._mode == "RGB":
+            return color
+        ink = self._inks.get(color)
+        if ink is None:
+            ink = self._inks[color] = nearest_index(self._colors, color)
+        return ink
+
+    def _text(self, draw: ImageDraw.ImageDraw, xy: tuple[int, int], text: str, face: str, fill: str) -> None:
+        self._atlas.draw(draw, xy, text, face, self._ink(fill))
+
+    def _draw_stale_marker(self, draw: ImageDraw.ImageDraw, stale_since: datetime) -> None:
+        """Banner across the top of the right panel when showing a stored snapshot."""
+        draw.rectangle([(LEFT_WIDTH, 0), (WIDTH - 1, 40)], fill=self._ink(self._settings.color("red")))
+        label = f"Stale since {stale_since.strftime('%H:%M')}"
+        self._text(draw, (LEFT_WIDTH + PADDING, 6), label, "small", self._settings.color("white"))
+
+    def _draw_left(
+        self,
+        draw: ImageDraw.ImageDraw,
+        weather: WeatherBundle,
+        battery: Optional[BatteryStatus],
+        current_time: datetime,
+    ) -> None:
+        self._text(draw, (PADDING, 18), current_time.strftime("%H:%M"), "time", self._settings.color("black"))
+        self._text(draw, (PADDING, 110), current_time.strftime("%a %b %d"), "data", self._settings.color("blue"))
 
         self._draw_battery(draw, battery)
         self._draw_current_weather(draw, weather)
         self._draw_forecast(draw, weather.next_hours)
-        return section
 
     def _draw_battery(self, draw: ImageDraw.ImageDraw, battery: Optional[BatteryStatus]) -> None:
         top = (LEFT_WIDTH - 180, 24)
         bottom = (LEFT_WIDTH - 20, 84)
         outline = self._settings.color("black")
-        draw.rectangle([top, bottom], outline=outline, width=3)
+        ink = self._ink(outline)
+        draw.rectangle([top, bottom], outline=ink, width=3)
         nub = [(bottom[0], 40), (bottom[0] + 14, 68)]
-        draw.rectangle(nub, fill=outline)
+        draw.rectangle(nub, fill=ink)
 
         if not battery:
-            draw.text((top[0] + 12, top[1] + 6), "--%", font=self._data_font, fill=outline)
+            self._text(draw, (top[0] + 12, top[1] + 6), "--%", "data", outline)
             return
 
         inner_width = bottom[0] - top[0] - 10
@@ -69,26 +143,26 @@ class LayoutRenderer:
                 (top[0] + 5, top[1] + 5),
                 (top[0] + 5 + filled, bottom[1] - 5),
             ),
-            fill=fill_color,
+            fill=self._ink(fill_color),
         )
-        draw.text((top[0] - 110, top[1] + 6), f"{battery.percentage:3d}%", font=self._data_font, fill=outline)
+        self._text(draw, (top[0] - 110, top[1] + 6), f"{battery.percentage:3d}%", "data", outline)
 
     def _draw_current_weather(self, draw: ImageDraw.ImageDraw, weather: WeatherBundle) -> None:
         current = weather.current
         icon = self._icon_font.glyph(current.icon_key)
         icon_color = current.icon_color
-        draw.text((PADDING, 160), icon, font=self._icon_face, fill=icon_color)
+        self._text(draw, (PADDING, 160), icon, "icon", icon_color)
 
         temp_text = f"{current.temperature:.0f}°"
-        draw.text((PADDING + 150, 170), temp_text, font=self._data_font, fill=self._settings.color("black"))
-        draw.text((PADDING + 150, 210), current.description, font=self._mono_small, fill=self._settings.color("blue"))
+        self._text(draw, (PADDING + 150, 170), temp_text, "data", self._settings.color("black"))
+        self._text(draw, (PADDING + 150, 210), current.description, "small", self._settings.color("blue"))
 
         feels = f"Feels {current.feels_like:.0f}°"
         humidity = f"Humidity {current.humidity}%"
         wind = f"Wind {current.wind_speed:.1f} mph"
-        draw.text((PADDING, 310), feels, font=self._mono_small, fill=self._settings.color("black"))
-        draw.text((PADDING, 340), humidity, font=self._mono_small, fill=self._settings.color("black"))
-        draw.text((PADDING, 370), wind, font=self._mono_small, fill=self._settings.color("black"))
+        self._text(draw, (PADDING, 310), feels, "small", self._settings.color("black"))
+        self._text(draw, (PADDING, 340), humidity, "small", self._settings.color("black"))
+        self._text(draw, (PADDING, 370), wind, "small", self._settings.color("black"))
 
     def _draw_forecast(self, draw: ImageDraw.ImageDraw, forecast: Sequence[ForecastEntry]) -> None:
         start_y = 380
@@ -98,24 +172,35 @@ class LayoutRenderer:
         for idx, entry in enumerate(forecast):
             x = PADDING + idx * col_width
             hour_text = entry.timestamp.strftime("%H:%M")
-            draw.text((x, start_y), hour_text, font=self._mono_small, fill=self._settings.color("blue"))
+            self._text(draw, (x, start_y), hour_text, "small", self._settings.color("blue"))
             glyph = self._icon_font.glyph(entry.icon_key)
-            draw.text((x, start_y + 24), glyph, font=self._icon_small_face, fill=entry.icon_color)
+            self._text(draw, (x, start_y + 24), glyph, "icon_small", entry.icon_color)
             temp = f"{entry.temperature:.0f}°"
-            draw.text((x, start_y + 80), temp, font=self._mono_small, fill=self._settings.color("black"))
+            self._text(draw, (x, start_y + 80), temp, "small", self._settings.color("black"))
             pop = f"{int(entry.precipitation_probability * 100)}%"
-            draw.text((x, start_y + 110), pop, font=self._mono_small, fill=self._settings.color("blue"))
+            self._text(draw, (x, start_y + 110), pop, "small", self._settings.color("blue"))
+
+    def _cached_right(self, clothing_path: Optional[str]) -> Image.Image:
+        """Reuse the right section while the clothing card stays the same.
+
+        The right panel depends on nothing but the card, so a long-running process
+        composes it once per card instead of once per frame.
+        """
+        if self._right_cache is not None and self._right_cache[0] == clothing_path:
+            return self._right_cache[1]
+        right = self._build_right(clothing_path)
+        self._right_cache = (clothing_path, right)
+        return right
 
     def _build_right(self, clothing_path: Optional[str]) -> Image.Image:
-        section = Image.new("RGB", (RIGHT_WIDTH, HEIGHT), color=self._settings.color("white"))
         if clothing_path:
-            img_path = Path(clothing_path)
-            if img_path.exists():
-                card = Image.open(img_path).convert("RGB")
-                section.paste(card.resize((RIGHT_WIDTH, HEIGHT)))
-                return section
+            card = self._cards.load(Path(clothing_path))
+            if card is not None:
+                return card
         # fallback
+        section = self._new_image((RIGHT_WIDTH, HEIGHT))
         draw = ImageDraw.Draw(section)
-        draw.rectangle([(0, 0), (RIGHT_WIDTH - 1, HEIGHT - 1)], outline=self._settings.color("blue"), width=4)
-        draw.text((PADDING, HEIGHT // 2 - 20), "No outfit data", font=self._data_font, fill=self._settings.color("blue"))
+        outline = self._ink(self._settings.color("blue"))
+        draw.rectangle([(0, 0), (RIGHT_WIDTH - 1, HEIGHT - 1)], outline=outline, width=4)
+        self._text(draw, (PADDING, HEIGHT // 2 - 20), "No outfit data", "data", self._settings.color("blue"))
         return section
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import List, Mapping, Sequence, Tuple
+
+from PIL import Image, ImageColor
+
+RGB = Tuple[int, int, int]
+
+
+def palette_colors(palette: Mapping[str, str]) -> List[RGB]:
+    """Settings palette as RGB triples, in declaration order."""
+    return [ImageColor.getrgb(value)[:3] for value in palette.values()]
+
+
+def nearest_index(colors: Sequence[RGB], value: str) -> int:
+    """Index of the entry in ``colors`` closest to the colour ``value``."""
+    rgb = ImageColor.getrgb(value)[:3]
+    distances = [sum((a - b) ** 2 for a, b in zip(rgb, color)) for color in colors]
+    return distances.index(min(distances))
+
+
+def palette_image(palette: Mapping[str, str]) -> Image.Image:
+    """1×1 ``P`` image carrying the palette, for ``Image.quantize(palette=...)``.
+
+    Unused slots repeat the first color so nearest-color lookups never land
+    outside the declared entries.
+    """
+    colors = palette_colors(palette)
+    flat: List[int] = []
+    for color in colors + [colors[0]] * (256 - len(colors)):
+        flat.extend(color)
+    image = Image.new("P", (1, 1))
+    image.putpalette(flat)
+    return image
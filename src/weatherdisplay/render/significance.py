@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from ..config import Settings
+from ..models import RenderPayload
+
+
+def _quantize(value: Optional[float], step: float) -> Optional[float]:
+    if value is None:
+        return None
+    if step <= 0:
+        return value
+    return round(value / step) * step
+
+
+@dataclass(slots=True)
+class SignificanceModel:
+    """Decide whether a payload differs enough from the displayed one to redraw.
+
+    Every value the layout shows is reduced to the resolution that matters on the
+    panel. Two payloads with equal fingerprints would render the same frame up to
+    those steps, so the render, hash and e-paper refresh can all be skipped.
+    """
+
+    temperature_step: float = 1.0
+    humidity_step: float = 5.0
+    wind_step: float = 2.0
+    pop_step: float = 0.1
+    battery_step: float = 10.0
+    clock_minutes: int = 30
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SignificanceModel":
+        steps = settings.significance
+        return cls(
+            temperature_step=float(steps["temperature"]),
+            humidity_step=float(steps["humidity"]),
+            wind_step=float(steps["wind"]),
+            pop_step=float(steps["pop"]),
+            battery_step=float(steps["battery"]),
+            clock_minutes=int(steps["clock_minutes"]),
+        )
+
+    def fingerprint(self, payload: RenderPayload) -> Dict[str, Any]:
+        current = payload.weather.current
+        clock_seconds = max(1, self.clock_minutes) * 60
+        battery = payload.battery
+        fingerprint = {
+            "clock": math.floor(payload.last_updated.timestamp() / clock_seconds) * clock_seconds,
+            "date": payload.last_updated.strftime("%a %b %d"),
+            "temperature": _quantize(current.temperature, self.temperature_step),
+            "feels_like": _quantize(current.feels_like, self.temperature_step),
+            "humidity": _quantize(current.humidity, self.humidity_step),
+            "wind": _quantize(current.wind_speed, self.wind_step),
+            "icon": [current.icon_key, current.icon_color],
+            "description": current.description,
+            "forecast": [
+                [
+                    entry.timestamp.strftime("%H:%M"),
+                    _quantize(entry.temperature, self.temperature_step),
+                    _quantize(entry.precipitation_probability, self.pop_step),
+                    entry.icon_key,
+                    entry.icon_color,
+                ]
+                for entry in payload.weather.next_hours
+            ],
+            "battery": _quantize(battery.percentage, self.battery_step) if battery else None,
+            "clothing": payload.clothing_image,
+            "stale": payload.stale_since.strftime("%H:%M") if payload.stale_since else None,
+        }
+        # Round-trip through JSON so fresh and persisted fingerprints compare equal.
+        return json.loads(json.dumps(fingerprint))
+
+    @staticmethod
+    def changed_fields(previous: Optional[Mapping[str, Any]], current: Mapping[str, Any]) -> List[str]:
+        if previous is None:
+            return list(current)
+        keys = set(previous) | set(current)
+        return sorted(key for key in keys if previous.get(key) != current.get(key))
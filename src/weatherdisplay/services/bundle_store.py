@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from zoneinfo import ZoneInfo
+
+from ..models import ForecastEntry, WeatherBundle, WeatherSnapshot
+from ..utils.fs import atomic_write_text
+
+LOGGER = logging.getLogger(__name__)
+FORMAT_VERSION = 1
+
+
+@dataclass(slots=True)
+class StoredBundle:
+    bundle: WeatherBundle
+    saved_at: datetime
+
+
+def _encode(record: object) -> dict[str, Any]:
+    encoded: dict[str, Any] = {}
+    for field in fields(record):
+        value = getattr(record, field.name)
+        encoded[field.name] = int(value.timestamp()) if isinstance(value, datetime) else value
+    return encoded
+
+
+def _decode(cls: type, raw: dict[str, Any], tz: ZoneInfo) -> Any:
+    values = {}
+    for field in fields(cls):
+        if field.name not in raw:
+            continue
+        value = raw[field.name]
+        is_time = field.type in ("datetime", "Optional[datetime]") and value is not None
+        values[field.name] = datetime.fromtimestamp(value, tz) if is_time else value
+    return cls(**values)
+
+
+class BundleStore:
+    """Persist the last successfully fetched WeatherBundle as compact JSON."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def save(self, bundle: WeatherBundle) -> None:
+        document = {
+            "v": FORMAT_VERSION,
+            "saved_at": int(time.time()),
+            "current": _encode(bundle.current),
+            "next_hours": [_encode(entry) for entry in bundle.next_hours],
+        }
+        atomic_write_text(self._path, json.dumps(document, separators=(",", ":")))
+
+    def load(self, tz: ZoneInfo) -> Optional[StoredBundle]:
+        try:
+            document = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError as exc:
+            LOGGER.warning("Ignoring unreadable weather snapshot %s: %s", self._path, exc)
+            return None
+        if document.get("v") != FORMAT_VERSION:
+            LOGGER.info("Ignoring weather snapshot with format version %s", document.get("v"))
+            return None
+        try:
+            bundle = WeatherBundle(
+                current=_decode(WeatherSnapshot, document["current"], tz),
+                next_hours=[_decode(ForecastEntry, entry, tz) for entry in document["next_hours"]],
+            )
+        except (KeyError, TypeError) as exc:
+            LOGGER.warning("Ignoring malformed weather snapshot %s: %s", self._path, exc)
+            return None
+        return StoredBundle(bundle=bundle, saved_at=datetime.fromtimestamp(document["saved_at"], tz))
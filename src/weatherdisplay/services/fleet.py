@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from ..config import Settings, render_profile
+from ..models import RenderPayload
+from ..utils.fs import atomic_write_bytes
+
+if TYPE_CHECKING:
+    from ..hardware.epd_buffer import PanelBufferPacker
+    from ..render.layout import LayoutRenderer
+    from .openweather import OpenWeatherClient
+
+LOGGER = logging.getLogger(__name__)
+
+DEVICE_ID = re.compile(r"[A-Za-z0-9_.-]+")
+# "png" for previews and full-stack devices; "epd" for the packed panel buffer the frame server serves.
+FRAME_FORMATS = ("png", "epd")
+
+
+@dataclass(slots=True)
+class Device:
+    id: str
+    settings: Settings
+
+
+@dataclass(slots=True)
+class FrameResult:
+    device_id: str
+    path: Optional[Path] = None
+    render_seconds: float = 0.0
+    worker: int = 0
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FleetReport:
+    workers: int
+    startup_seconds: float
+    render_seconds: float
+    frames: List[FrameResult] = field(default_factory=list)
+
+    @property
+    def rendered(self) -> List[FrameResult]:
+        return [frame for frame in self.frames if frame.error is None]
+
+    @property
+    def frames_per_second(self) -> float:
+        return len(self.rendered) / self.render_seconds if self.render_seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        rendered = self.rendered
+        per_frame = statistics.median(frame.render_seconds for frame in rendered) * 1000 if rendered else 0.0
+        failed = len(self.frames) - len(rendered)
+        return (
+            f"{len(rendered)} frame(s) in {self.render_seconds:.2f}s on {self.workers} worker(s): "
+            f"{self.frames_per_second:.1f} frames/s, {per_frame:.0f} ms/frame p50 in-worker, "
+            f"{len({frame.worker for frame in rendered})} worker(s) used, start-up {self.startup_seconds:.2f}s"
+            + (f", {failed} failed" if failed else "")
+        )
+
+
+def load_fleet(path: Path, base: Mapping[str, str]) -> List[Device]:
+    """Devices listed in a fleet file, each with its own :class:`Settings`.
+
+    The file is JSON: ``{"defaults": {...}, "devices": [{"id": "...", ...}]}``.
+    Keys are the environment variable names used in ``.env``; a device's keys
+    override ``defaults``, which override ``base`` (normally the environment).
+    """
+    spec = json.loads(path.read_text())
+    defaults = {key: str(value) for key, value in spec.get("defaults", {}).items()}
+    devices = []
+    seen = set()
+    for entry in spec.get("devices", []):
+        values = {key: str(value) for key, value in entry.items() if key != "id"}
+        device_id = str(entry.get("id", ""))
+        if not DEVICE_ID.fullmatch(device_id):
+            raise ValueError(f"Fleet device id {device_id!r} must match {DEVICE_ID.pattern}")
+        if device_id in seen:
+            raise ValueError(f"Duplicate fleet device id {device_id!r}")
+        seen.add(device_id)
+        devices.append(Device(device_id, Settings.from_mapping({**base, **defaults, **values})))
+    return devices
+
+
+def build_payload(device: Device, weather) -> RenderPayload:
+    from ..render.clothing import choose_clothing_card
+
+    settings = device.settings
+    return RenderPayload(
+        weather=weather,
+        battery=None,  # only the device itself can read its Witty Pi
+        clothing_image=choose_clothing_card(weather, settings.clothing_dir, settings.clothing_cards),
+        last_updated=datetime.now(ZoneInfo(settings.timezone)),
+    )
+
+
+class WeatherFetcher:
+    """One :class:`OpenWeatherClient` per device, kept for the fleet's lifetime.
+
+    Each client keeps its HTTP session (and so its connections) and fetch
+    threads across batches instead of rebuilding them for every fetch.
+    """
+
+    def __init__(self, devices: Sequence[Device], concurrency: int = 8) -> None:
+        from .openweather import OpenWeatherClient
+
+        self._devices = list(devices)
+        self._clients: Dict[str, OpenWeatherClient] = {
+            device.id: OpenWeatherClient(device.settings) for device in self._devices
+        }
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="fleet-fetch")
+
+    def fetch(self) -> Tuple[Dict[str, RenderPayload], Dict[str, str]]:
+        """Fetch every device's weather; returns payloads and per-device errors."""
+
+        def fetch(device: Device) -> RenderPayload:
+            return build_payload(device, self._clients[device.id].fetch_bundle())
+
+        payloads: Dict[str, RenderPayload] = {}
+        errors: Dict[str, str] = {}
+        futures = {device.id: self._pool.submit(fetch, device) for device in self._devices}
+        for device_id, future in futures.items():
+            try:
+                payloads[device_id] = future.result()
+            except Exception as exc:  # one site's outage must not stop the rest of the batch
+                LOGGER.error("Weather fetch for %s failed: %s", device_id, exc)
+                errors[device_id] = str(exc)
+        return payloads, errors
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        for client in self._clients.values():
+            client.close()
+
+    def __enter__(self) -> "WeatherFetcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+# Per-process state of a render worker, set up once by _init_worker.
+_profiles: Dict[str, Settings] = {}
+_renderers: Dict[str, LayoutRenderer] = {}
+_packers: Dict[str, PanelBufferPacker] = {}
+_output_dir: Optional[Path] = None
+_formats: Tuple[str, ...] = ("png",)
+
+
+def _renderer(profile: str) -> LayoutRenderer:
+    renderer = _renderers.get(profile)
+    if renderer is None:
+        from ..render.layout import LayoutRenderer
+
+        renderer = _renderers[profile] = LayoutRenderer(_profiles[profile])
+    return renderer
+
+
+def _packer(profile: str) -> PanelBufferPacker:
+    packer = _packers.get(profile)
+    if packer is None:
+        from ..hardware.epd_buffer import PanelBufferPacker
+
+        settings = _profiles[profile]
+        # "driver" means the vendor getbuffer, which the byte-identical "vendor" mode reproduces.
+        mode = "vendor" if settings.epd_buffer_mode == "driver" else settings.epd_buffer_mode
+        packer = _packers[profile] = PanelBufferPacker(settings.palette, mode)
+    return packer
+
+
+def _init_worker(profiles: Dict[str, Settings], output_dir: Path, formats: Tuple[str, ...]) -> None:
+    global _output_dir, _formats
+    _profiles.update(profiles)
+    _output_dir = output_dir
+    _formats = formats
+    # Fonts, icon codepoints, the glyph atlas and clothing cards load here, once per process.
+    for profile in profiles:
+        _renderer(profile)
+        if "epd" in formats:
+            _packer(profile)
+
+
+def _ready(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _render_frame(job: Tuple[str, str, RenderPayload]) -> FrameResult:
+    device_id, profile, payload = job
+    started = time.perf_counter()
+    try:
+        image = _renderer(profile).build(payload)
+        if "epd" in _formats:
+            path = _output_dir / f"{device_id}.epd"
+            atomic_write_bytes(path, bytes(_packer(profile).pack(image)))
+        if "png" in _formats:
+            buffer = io.BytesIO()
+            # Fast zlib level: the frames are rewritten every cycle and read over a LAN.
+            image.save(buffer, format="PNG", compress_level=1)
+            path = _output_dir / f"{device_id}.png"
+            atomic_write_bytes(path, buffer.getvalue())
+    except Exception as exc:  # reported per frame
+        return FrameResult(device_id, error=f"{type(exc).__name__}: {exc}", worker=os.getpid())
+    return FrameResult(device_id, path, time.perf_counter() - started, os.getpid())
+
+
+class RenderPool:
+    """Spawned worker processes, each holding one warm renderer per render profile.
+
+    Devices that share fonts, palette and asset directories (normally all of
+    them) share a profile, so a worker pays for font and card loading once and
+    then renders any device's payload.
+    """
+
+    def __init__(
+        self,
+        devices: Sequence[Device],
+        output_dir: Path,
+        workers: Optional[int] = None,
+        formats: Sequence[str] = ("png",),
+    ) -> None:
+        unknown = set(formats) - set(FRAME_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown frame format(s): {', '.join(sorted(unknown))}")
+        self._workers = max(1, workers or os.cpu_count() or 1)
+        self._device_profiles = {device.id: render_profile(device.settings) for device in devices}
+        profiles = {render_profile(device.settings): device.settings for device in devices}
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._warm_shared_caches(profiles.values())
+        started = time.perf_counter()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(profiles, output_dir, tuple(formats)),
+        )
+        # Start every worker now so start-up is not billed to the first batch.
+        pids = set(self._pool.map(_ready, [0.05] * self._workers))
+        self.startup_seconds = time.perf_counter() - started
+        LOGGER.info("%d render worker(s) ready in %.2fs", len(pids), self.startup_seconds)
+
+    @staticmethod
+    def _warm_shared_caches(profiles) -> None:
+        """Build the on-disk card cache once here instead of racing to build it in every worker."""
+        from ..render.card_cache import CardCache
+        from ..render.layout import HEIGHT, RENDER_MODES, RIGHT_WIDTH
+
+        for settings in profiles:
+            mode = RENDER_MODES.get(settings.render_mode, "RGB")  # an unknown mode fails in the workers
+            cards = CardCache(settings.cache_dir, (RIGHT_WIDTH, HEIGHT), settings.palette, mode=mode)
+            cards.warm(settings.clothing_dir)
+
+    def render(self, payloads: Mapping[str, RenderPayload], repeat: int = 1) -> FleetReport:
+        jobs = [
+            (device_id, self._device_profiles[device_id], payload)
+            for _ in range(max(1, repeat))
+            for device_id, payload in payloads.items()
+        ]
+        chunksize = max(1, len(jobs) // (self._workers * 4))
+        started = time.perf_counter()
+        frames = list(self._pool.map(_render_frame, jobs, chunksize=chunksize))
+        report = FleetReport(self._workers, self.startup_seconds, time.perf_counter() - started, frames)
+        for frame in frames:
+            if frame.error is not None:
+                LOGGER.error("Rendering %s failed: %s", frame.device_id, frame.error)
+        return report
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
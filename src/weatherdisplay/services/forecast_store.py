@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import io
+import logging
+import zipfile
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+from ..models import ForecastEntry, WeatherBundle, WeatherSnapshot
+from ..utils.fs import atomic_write_bytes
+
+if TYPE_CHECKING:
+    from .openweather import IconResolver
+
+LOGGER = logging.getLogger(__name__)
+
+FORECAST_STORE_NAME = "forecast.npz"
+FORMAT_VERSION = 2
+# ``main`` of the atmosphere (7xx) conditions, whose icons are looked up by that name.
+_ATMOSPHERE = {
+    701: "Mist",
+    711: "Smoke",
+    721: "Haze",
+    731: "Dust",
+    741: "Fog",
+    751: "Sand",
+    761: "Dust",
+    762: "Ash",
+    771: "Squall",
+    781: "Tornado",
+}
+# OpenWeather's ``weather[0].description`` (in English) for each condition code.
+_DESCRIPTIONS = {
+    200: "thunderstorm with light rain",
+    201: "thunderstorm with rain",
+    202: "thunderstorm with heavy rain",
+    210: "light thunderstorm",
+    211: "thunderstorm",
+    212: "heavy thunderstorm",
+    221: "ragged thunderstorm",
+    230: "thunderstorm with light drizzle",
+    231: "thunderstorm with drizzle",
+    232: "thunderstorm with heavy drizzle",
+    300: "light intensity drizzle",
+    301: "drizzle",
+    302: "heavy intensity drizzle",
+    310: "light intensity drizzle rain",
+    311: "drizzle rain",
+    312: "heavy intensity drizzle rain",
+    313: "shower rain and drizzle",
+    314: "heavy shower rain and drizzle",
+    321: "shower drizzle",
+    500: "light rain",
+    501: "moderate rain",
+    502: "heavy intensity rain",
+    503: "very heavy rain",
+    504: "extreme rain",
+    511: "freezing rain",
+    520: "light intensity shower rain",
+    521: "shower rain",
+    522: "heavy intensity shower rain",
+    531: "ragged shower rain",
+    600: "light snow",
+    601: "snow",
+    602: "heavy snow",
+    611: "sleet",
+    612: "light shower sleet",
+    613: "shower sleet",
+    615: "light rain and snow",
+    616: "rain and snow",
+    620: "light shower snow",
+    621: "shower snow",
+    622: "heavy shower snow",
+    701: "mist",
+    711: "smoke",
+    721: "haze",
+    731: "sand/dust whirls",
+    741: "fog",
+    751: "sand",
+    761: "dust",
+    762: "volcanic ash",
+    771: "squalls",
+    781: "tornado",
+    800: "clear sky",
+    801: "few clouds",
+    802: "scattered clouds",
+    803: "broken clouds",
+    804: "overcast clouds",
+}
+
+
+def condition_main(code: int) -> str:
+    """OpenWeather's ``weather[0].main`` for a condition code."""
+    if 200 <= code < 300:
+        return "Thunderstorm"
+    if 300 <= code < 400:
+        return "Drizzle"
+    if 500 <= code < 600:
+        return "Rain"
+    if 600 <= code < 700:
+        return "Snow"
+    if 700 <= code < 800:
+        return _ATMOSPHERE.get(code, "Mist")
+    return "Clear" if code == 800 else "Clouds"
+
+
+def condition_description(code: int) -> str:
+    """OpenWeather's description for a condition code, title-cased as ``parse_bundle`` shows it."""
+    return _DESCRIPTIONS.get(code, condition_main(code)).title()
+
+
+@dataclass(slots=True)
+class Freshness:
+    fetched_at: datetime
+    age: timedelta
+    remaining: timedelta  # forecast left after now; negative once it has run out
+    blocks_ahead: int
+
+    def __str__(self) -> str:
+        hours = max(0.0, self.remaining.total_seconds() / 3600)
+        return (
+            f"fetched {self.age.total_seconds() / 60:.0f} min ago, "
+            f"{self.blocks_ahead} block(s) and {hours:.0f} h of forecast left"
+        )
+
+
+@dataclass(slots=True)
+class ForecastSeries:
+    """A whole 5-day/3-hour forecast response as columns.
+
+    Row 0 is the observation fetched with it and rows 1.. the forecast blocks,
+    in time order, so interpolation also covers the hours before the first
+    block. The observation has no rain chance and takes the first block's.
+    Sunrise and sunset of the observation tell day from night for the icons.
+    """
+
+    fetched_at: int  # Unix seconds
+    sunrise: int  # Unix seconds, 0 when the response had none
+    sunset: int
+    timestamps: "np.ndarray"  # int64 Unix seconds
+    temperature: "np.ndarray"  # float64
+    pop: "np.ndarray"  # float64, 0..1
+    condition: "np.ndarray"  # int16 OpenWeather condition code
+
+    @classmethod
+    def from_payloads(
+        cls, current_payload: Mapping[str, Any], forecast_payload: Mapping[str, Any], fetched_at: int
+    ) -> "ForecastSeries":
+        observed = int(current_payload["dt"])
+        blocks = [block for block in forecast_payload.get("list", []) if int(block["dt"]) > observed]
+        weather = current_payload.get("weather") or [{}]
+        rows = [(observed, current_payload["main"]["temp"], None, weather[0].get("id", 802))]
+        for block in blocks:
+            weather = block.get("weather") or [{}]
+            rows.append((int(block["dt"]), block["main"]["temp"], block.get("pop", 0.0), weather[0].get("id", 802)))
+        timestamps, temperature, pop, condition = zip(*rows)
+        pop = (pop[1] if len(pop) > 1 else 0.0,) + pop[1:]
+        sun = current_payload.get("sys") or {}
+        return cls(
+            fetched_at=fetched_at,
+            sunrise=int(sun.get("sunrise", 0)),
+            sunset=int(sun.get("sunset", 0)),
+            timestamps=np.array(timestamps, dtype=np.int64),
+            temperature=np.array(temperature, dtype=np.float64),
+            pop=np.array(pop, dtype=np.float64),
+            condition=np.array(condition, dtype=np.int16),
+        )
+
+    @property
+    def observed_at(self) -> int:
+        return int(self.timestamps[0])
+
+    def covers(self, when: datetime) -> bool:
+        """Whether at least one forecast block starts after ``when``."""
+        return len(self.timestamps) > 1 and when.timestamp() < self.timestamps[-1]
+
+    def values_at(self, when: Any) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Temperature, rain chance and condition code at ``when`` (Unix seconds, scalar or array).
+
+        Temperature and rain chance are interpolated linearly between rows and
+        held flat past either end; the condition is that of the last row at or
+        before ``when``.
+        """
+        when = np.asarray(when, dtype=np.float64)
+        temperature = np.interp(when, self.timestamps, self.temperature)
+        pop = np.interp(when, self.timestamps, self.pop)
+        row = np.clip(np.searchsorted(self.timestamps, when, side="right") - 1, 0, len(self.timestamps) - 1)
+        return temperature, pop, self.condition[row]
+
+    def entries(self, when: datetime, icons: IconResolver, count: int = 4) -> List[ForecastEntry]:
+        """The next-hours strip at ``when``: the first ``count`` blocks starting at or after it."""
+        start = 1 + int(np.searchsorted(self.timestamps[1:], when.timestamp(), side="left"))
+        entries = []
+        for row in range(start, min(start + count, len(self.timestamps))):
+            code = int(self.condition[row])
+            main = condition_main(code)
+            icon_key, icon_color = icons.resolve(code, main, True)
+            entries.append(
+                ForecastEntry(
+                    timestamp=datetime.fromtimestamp(int(self.timestamps[row]), when.tzinfo),
+                    temperature=float(self.temperature[row]),
+                    precipitation_probability=float(self.pop[row]),
+                    icon_key=icon_key,
+                    icon_color=icon_color,
+                    description=main,
+                    condition_code=code,
+                )
+            )
+        return entries
+
+    def snapshot(self, observed: WeatherSnapshot, when: datetime, icons: IconResolver) -> WeatherSnapshot:
+        """``observed`` carried forward to ``when``.
+
+        The temperature is interpolated (feels-like moves with it) and, once the
+        first block has started, the condition is that block's. The icon is
+        resolved for day or night at ``when``, and the observed description is
+        kept while the condition is unchanged. Humidity and wind, which blocks
+        do not carry, stay as observed.
+        """
+        stamp = when.timestamp()
+        if stamp <= observed.timestamp.timestamp():
+            return observed
+        temperature, _, code = self.values_at(stamp)
+        temperature = float(temperature)
+        code = int(code)
+        if code == observed.condition_code:
+            main, description = observed.condition_label, observed.description
+        else:
+            main, description = condition_main(code), condition_description(code)
+        icon_key, icon_color = icons.resolve(code, main, icons.is_daytime(stamp, self.sunrise, self.sunset))
+        return replace(
+            observed,
+            timestamp=when,
+            temperature=temperature,
+            feels_like=observed.feels_like + temperature - observed.temperature,
+            condition_code=code,
+            condition_label=main,
+            description=description,
+            icon_key=icon_key,
+            icon_color=icon_color,
+        )
+
+    def bundle(self, observed: WeatherSnapshot, when: datetime, icons: IconResolver, count: int = 4) -> WeatherBundle:
+        """Current conditions and next-hours strip at ``when``, derived without a fetch."""
+        return WeatherBundle(current=self.snapshot(observed, when, icons), next_hours=self.entries(when, icons, count))
+
+    def freshness(self, now: datetime) -> Freshness:
+        stamp = now.timestamp()
+        return Freshness(
+            fetched_at=datetime.fromtimestamp(self.fetched_at, now.tzinfo),
+            age=timedelta(seconds=stamp - self.fetched_at),
+            remaining=timedelta(seconds=float(self.timestamps[-1]) - stamp),
+            blocks_ahead=int(np.count_nonzero(self.timestamps[1:] > stamp)),
+        )
+
+
+class ForecastStore:
+    """The last full forecast, kept as a compressed ``.npz`` of :class:`ForecastSeries` columns."""
+
+    def __init__(self, path: Path) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for ForecastStore")
+        self.path = path
+
+    def save(self, series: ForecastSeries) -> None:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            version=np.int64(FORMAT_VERSION),
+            fetched_at=np.int64(series.fetched_at),
+            sunrise=np.int64(series.sunrise),
+            sunset=np.int64(series.sunset),
+            timestamps=series.timestamps,
+            temperature=series.temperature,
+            pop=series.pop,
+            condition=series.condition,
+        )
+        atomic_write_bytes(self.path, buffer.getvalue())
+
+    def load(self) -> Optional[ForecastSeries]:
+        try:
+            with np.load(self.path, allow_pickle=False) as columns:
+                if int(columns["version"]) != FORMAT_VERSION:
+                    LOGGER.info("Ignoring stored forecast with format version %s", int(columns["version"]))
+                    return None
+                return ForecastSeries(
+                    fetched_at=int(columns["fetched_at"]),
+                    sunrise=int(columns["sunrise"]),
+                    sunset=int(columns["sunset"]),
+                    timestamps=columns["timestamps"],
+                    temperature=columns["temperature"],
+                    pop=columns["pop"],
+                    condition=columns["condition"],
+                )
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as exc:
+            LOGGER.warning("Ignoring unreadable stored forecast %s: %s", self.path, exc)
+            return None
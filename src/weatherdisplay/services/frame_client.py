@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import requests
+
+from ..config import Settings
+from ..hardware.frame_codec import (
+    DELTA_CONTENT_TYPE,
+    FRAME_CONTENT_TYPE,
+    PANEL_SIZE,
+    FrameFormatError,
+    apply_delta,
+    frame_etag,
+    packed_size,
+)
+from ..hardware.regions import Region
+from ..utils.spans import span
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FrameFetchError(RuntimeError):
+    """The frame server could not be reached or sent an unusable frame."""
+
+
+@dataclass(slots=True)
+class FrameUpdate:
+    etag: str
+    buffer: bytes
+    # Regions patched by a delta; empty for a full frame.
+    regions: List[Region] = field(default_factory=list)
+    transferred: int = 0
+
+
+class FrameClient:
+    """Fetch this device's packed frame from ``FRAME_SERVER_URL``.
+
+    The ETag of the frame on the panel goes out as ``If-None-Match``, so an
+    unchanged frame costs one bodiless 304. When the previous frame's bytes are
+    at hand the client also accepts a tile delta and patches them locally; the
+    result must hash to the new ETag, otherwise the full frame is requested.
+    """
+
+    def __init__(self, settings: Settings, size: Tuple[int, int] = PANEL_SIZE) -> None:
+        if not settings.frame_server_url:
+            raise ValueError("FRAME_SERVER_URL is not set")
+        self._url = settings.frame_server_url
+        self._size = size
+        self._session = requests.Session()
+        self._timeout = (settings.fetch_connect_timeout, settings.fetch_deadline)
+
+    def fetch(self, etag: Optional[str] = None, base: Optional[bytes] = None) -> Optional[FrameUpdate]:
+        """The server's current frame, or ``None`` when it is still ``etag``."""
+        if etag is not None and base is not None and len(base) == packed_size(self._size):
+            try:
+                return self._get(etag, base)
+            except FrameFormatError as exc:
+                LOGGER.warning("Discarding frame delta (%s); requesting the full frame", exc)
+        try:
+            return self._get(etag, None)
+        except FrameFormatError as exc:
+            raise FrameFetchError(f"Frame server sent an unusable frame: {exc}") from exc
+
+    def _get(self, etag: Optional[str], base: Optional[bytes]) -> Optional[FrameUpdate]:
+        headers = {"Accept": FRAME_CONTENT_TYPE}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if base is not None:
+            headers["Accept"] = f"{DELTA_CONTENT_TYPE}, {FRAME_CONTENT_TYPE}"
+        try:
+            with span("http", endpoint="frame", delta=base is not None) as attrs:
+                response = self._session.get(self._url, headers=headers, timeout=self._timeout)
+                attrs["status"] = response.status_code
+            if response.status_code == 304:
+                LOGGER.info("Frame unchanged on the server (%s)", etag)
+                return None
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise FrameFetchError(f"Unable to fetch frame from {self._url}: {exc}") from exc
+
+        new_etag = response.headers.get("ETag", "")
+        body = response.content
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip()
+        if content_type == DELTA_CONTENT_TYPE:
+            if base is None:
+                raise FrameFormatError("unrequested delta")
+            buffer, regions = apply_delta(base, body, self._size)
+            buffer = bytes(buffer)
+        else:
+            buffer, regions = body, []
+            if len(buffer) != packed_size(self._size):
+                raise FrameFormatError(f"frame is {len(buffer)} bytes, expected {packed_size(self._size)}")
+        if frame_etag(buffer) != new_etag:
+            raise FrameFormatError(f"frame does not hash to its ETag {new_etag or '(none)'}")
+        kind = f"delta ({len(regions)} region(s))" if content_type == DELTA_CONTENT_TYPE else "full"
+        LOGGER.info("Received %s frame %s, %d bytes", kind, new_etag, len(body))
+        return FrameUpdate(new_etag, buffer, regions, len(body))
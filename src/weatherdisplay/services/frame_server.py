@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..hardware.frame_codec import (
+    DELTA_CONTENT_TYPE,
+    FRAME_CONTENT_TYPE,
+    FrameFormatError,
+    encode_delta,
+    frame_etag,
+    packed_size,
+    parse_etags,
+)
+from .fleet import DEVICE_ID
+
+LOGGER = logging.getLogger(__name__)
+
+FRAME_SUFFIX = ".epd"
+
+
+@dataclass(slots=True)
+class _Version:
+    mtime_ns: int
+    size: int
+    etag: str
+    data: bytes
+
+
+class FrameStore:
+    """Packed frames in ``directory`` (``<device id>.epd``) plus recent versions for deltas.
+
+    A file is re-read only when its mtime or size changes. The last ``history``
+    versions of each device's frame stay in memory so a client that reports
+    one of them as its current frame can be sent only the tiles that changed.
+    """
+
+    def __init__(self, directory: Path, size: Tuple[int, int], history: int = 4) -> None:
+        self.directory = directory
+        self.size = size
+        self._history_limit = max(1, history)
+        self._current: Dict[str, _Version] = {}
+        self._history: Dict[str, "OrderedDict[str, bytes]"] = {}
+        self._lock = threading.Lock()
+
+    def current(self, device_id: str) -> Optional[Tuple[str, bytes]]:
+        """``(etag, frame)`` for ``device_id``, or ``None`` if it has no frame."""
+        path = self.directory / f"{device_id}{FRAME_SUFFIX}"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            version = self._current.get(device_id)
+            if version is not None and (version.mtime_ns, version.size) == (stat.st_mtime_ns, stat.st_size):
+                return version.etag, version.data
+        data = path.read_bytes()
+        if len(data) != packed_size(self.size):
+            raise FrameFormatError(f"{path} is {len(data)} bytes, expected {packed_size(self.size)}")
+        version = _Version(stat.st_mtime_ns, stat.st_size, frame_etag(data), data)
+        with self._lock:
+            self._current[device_id] = version
+            history = self._history.setdefault(device_id, OrderedDict())
+            history[version.etag] = data
+            history.move_to_end(version.etag)
+            while len(history) > self._history_limit:
+                history.popitem(last=False)
+        return version.etag, data
+
+    def version(self, device_id: str, etag: str) -> Optional[bytes]:
+        with self._lock:
+            return self._history.get(device_id, {}).get(etag)
+
+
+class FrameServer(ThreadingHTTPServer):
+    """Serve ``GET /frames/<device id>`` from a :class:`FrameStore`.
+
+    - ``If-None-Match`` naming the current frame gets a bodiless 304.
+    - A client that also accepts ``application/vnd.weatherdisplay.epd4-delta``
+      and names a frame still in the store's history gets only the changed
+      tiles, as long as they are smaller than the whole frame.
+    - Anything else gets the full packed frame.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], store: FrameStore, tile: int = 80) -> None:
+        super().__init__(address, _Handler)
+        self.store = store
+        self.tile = tile
+        self.stats: Counter[str] = Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread (for tests and in-process benchmarks)."""
+        thread = threading.Thread(target=self.serve_forever, name="frame-server", daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FrameServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0].rstrip("/")
+        prefix, _, device_id = path.rpartition("/")
+        if prefix != "/frames" or not DEVICE_ID.fullmatch(device_id):
+            self._send(404, b"not found\n", "text/plain")
+            return
+        server = self.server
+        try:
+            current = server.store.current(device_id)
+        except (OSError, FrameFormatError) as exc:
+            LOGGER.error("Cannot serve frame for %s: %s", device_id, exc)
+            self._send(500, b"frame unavailable\n", "text/plain")
+            return
+        if current is None:
+            self._send(404, b"no frame for this device\n", "text/plain")
+            return
+
+        etag, frame = current
+        known = parse_etags(self.headers.get("If-None-Match"))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in known:
+            server.count("not_modified")
+            self._send(304, b"", None, headers)
+            return
+        if DELTA_CONTENT_TYPE in self.headers.get("Accept", ""):
+            for base_etag in known:
+                base = server.store.version(device_id, base_etag)
+                if base is None:
+                    continue
+                delta, regions = encode_delta(base, frame, server.store.size, server.tile)
+                if len(delta) < len(frame):
+                    server.count("delta")
+                    server.count("bytes", len(delta))
+                    headers["Delta-Base"] = base_etag
+                    self._send(200, delta, DELTA_CONTENT_TYPE, headers)
+                    LOGGER.info(
+                        "%s: delta of %d region(s), %d of %d bytes", device_id, len(regions), len(delta), len(frame)
+                    )
+                    return
+                break
+        server.count("full")
+        server.count("bytes", len(frame))
+        headers["X-Frame-Size"] = "{}x{}".format(*server.store.size)
+        self._send(200, frame, FRAME_CONTENT_TYPE, headers)
+
+    def _send(
+        self, status: int, body: bytes, content_type: Optional[str], headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header("Content-Type", content_type)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
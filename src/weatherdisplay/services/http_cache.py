@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Optional
+
+from ..utils.fs import atomic_write_bytes
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hit(s), {self.revalidated} revalidated, "
+            f"{self.misses} miss(es), {self.bytes_saved} bytes saved"
+        )
+
+
+class ResponseCache:
+    """On-disk store of raw HTTP bodies plus their validators.
+
+    Each entry is one file: a JSON metadata line followed by the response body.
+    Files are replaced atomically so a power cut never leaves a torn entry.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+
+    @staticmethod
+    def key(name: str, url: str, params: Mapping[str, object]) -> str:
+        digest = hashlib.sha1(url.encode("utf-8"))
+        for param, value in sorted(params.items()):
+            digest.update(f"\0{param}={value}".encode("utf-8"))
+        return f"{name}-{digest.hexdigest()[:16]}"
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.cache"
+
+    def load(self, key: str) -> Optional[CachedResponse]:
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        header, sep, body = raw.partition(b"\n")
+        try:
+            meta = json.loads(header)
+            if not sep or len(body) != meta["length"]:
+                raise ValueError("length mismatch")
+        except (ValueError, KeyError) as exc:
+            LOGGER.warning("Discarding corrupt HTTP cache entry %s: %s", path.name, exc)
+            return None
+        return CachedResponse(
+            body=body,
+            fetched_at=float(meta["fetched_at"]),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def store(self, key: str, entry: CachedResponse) -> None:
+        meta = {
+            "fetched_at": entry.fetched_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "length": len(entry.body),
+        }
+        header = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        atomic_write_bytes(self._path(key), header + b"\n" + entry.body)
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
 
 import requests
 from zoneinfo import ZoneInfo
 
-from ..config import Settings
+from ..config import DEFAULT_OPENWEATHER_BASE_URL, Settings
 from ..models import ForecastEntry, WeatherBundle, WeatherSnapshot
+from ..utils.spans import span
+from .http_cache import CachedResponse, CacheStats, ResponseCache
+from .owm_decode import decode_payload
+from .retry import RetryPolicy, classify, retry_after
+
+if TYPE_CHECKING:
+    from .forecast_store import ForecastStore
 
 LOGGER = logging.getLogger(__name__)
-CURRENT_API_URL = "https://api.openweathermap.org/data/2.5/weather"
-FORECAST_API_URL = "https://api.openweathermap.org/data/2.5/forecast"
+CURRENT_API_URL = f"{DEFAULT_OPENWEATHER_BASE_URL}/weather"
+FORECAST_API_URL = f"{DEFAULT_OPENWEATHER_BASE_URL}/forecast"
 
 
 class WeatherFetchError(RuntimeError):
@@ -41,6 +52,17 @@ class IconResolver:
             icon = self.icon_map.get("clouds", {"icon": "cloud", "accent": "#0052CC"})
         return icon["icon"], icon["accent"]
 
+    @staticmethod
+    def is_daytime(moment: float, sunrise: float, sunset: float) -> bool:
+        """Whether ``moment`` lies between sunrise and sunset (all Unix seconds).
+
+        Moments on other days are judged by the same times of day, which is
+        within minutes for the few days a forecast covers.
+        """
+        if sunset <= sunrise:
+            return sunrise <= moment <= sunset
+        return (moment - sunrise) % 86400 <= sunset - sunrise
+
     @staticmethod
     def _family_from_code(condition_code: int, descriptor: str) -> str:
         if 200 <= condition_code < 300:
@@ -61,10 +83,44 @@ class IconResolver:
 
 
 class OpenWeatherClient:
-    def __init__(self, settings: Settings) -> None:
+    """Fetch and parse current conditions and the 5-day/3-hour forecast.
+
+    The bundle keeps the first four forecast blocks; with a ``forecast_store``
+    every fetch also stores the whole response as a :class:`ForecastSeries`.
+    """
+
+    def __init__(self, settings: Settings, forecast_store: Optional[ForecastStore] = None) -> None:
         self._settings = settings
+        self._forecast_store = forecast_store
         self._session = requests.Session()
         self._icons = IconResolver(settings.icon_map)
+        self._cache = ResponseCache(settings.cache_dir / "http")
+        self._ttls = {
+            "current": settings.current_cache_ttl,
+            "forecast": settings.forecast_cache_ttl,
+        }
+        self._urls = {
+            "current": f"{settings.openweather_base_url}/weather",
+            "forecast": f"{settings.openweather_base_url}/forecast",
+        }
+        self._retry = RetryPolicy.from_settings(settings)
+        self._stats_lock = threading.Lock()
+        # One worker per endpoint; the requests.Session connection pool is shared.
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="owm-fetch")
+
+    @property
+    def icons(self) -> IconResolver:
+        return self._icons
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Cache counters accumulated over the client's lifetime."""
+        return self._cache.stats
+
+    def close(self) -> None:
+        """Stop the fetch threads (after any request in flight) and close the HTTP session."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._session.close()
 
     def fetch_bundle(self) -> WeatherBundle:
         params = {
@@ -73,23 +129,42 @@ class OpenWeatherClient:
             "appid": self._settings.api_key,
             "units": self._settings.units,
         }
-        
-        # Fetch current weather
-        try:
-            resp = self._session.get(CURRENT_API_URL, params=params, timeout=12)
-            resp.raise_for_status()
-            current_payload = resp.json()
-        except requests.RequestException as exc:
-            raise WeatherFetchError("Unable to reach OpenWeatherMap (current)") from exc
+        stats = CacheStats()
+        deadline = time.monotonic() + self._settings.fetch_deadline
+
+        # Current conditions and the 5-day/3-hour forecast are requested concurrently
+        # and share a single deadline for the whole fetch.
+        futures = {
+            name: self._pool.submit(self._get_json, name, url, params, stats, deadline)
+            for name, url in self._urls.items()
+        }
+        payloads: dict[str, Any] = {}
+        for name, future in futures.items():
+            try:
+                payloads[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError as exc:
+                raise WeatherFetchError(
+                    f"Timed out reaching OpenWeatherMap ({name}) after {self._settings.fetch_deadline:g}s"
+                ) from exc
+        LOGGER.info("HTTP cache: %s (lifetime: %s)", stats, self._cache.stats)
+        bundle = self.parse_bundle(payloads["current"], payloads["forecast"])
+        if self._forecast_store is not None:
+            self._store_series(payloads["current"], payloads["forecast"])
+        return bundle
+
+    def _store_series(self, current_payload: Mapping[str, Any], forecast_payload: Mapping[str, Any]) -> None:
+        from .forecast_store import ForecastSeries
 
-        # Fetch hourly forecast (5-day/3-hour forecast)
         try:
-            resp = self._session.get(FORECAST_API_URL, params=params, timeout=12)
-            resp.raise_for_status()
-            forecast_payload = resp.json()
-        except requests.RequestException as exc:
-            raise WeatherFetchError("Unable to reach OpenWeatherMap (forecast)") from exc
+            series = ForecastSeries.from_payloads(current_payload, forecast_payload, int(time.time()))
+            self._forecast_store.save(series)
+        except (KeyError, TypeError, ValueError, OSError) as exc:  # the bundle itself parsed; keep it
+            LOGGER.warning("Unable to store the full forecast: %s", exc)
+            return
+        LOGGER.debug("Stored %d forecast block(s) in %s", len(series.timestamps) - 1, self._forecast_store.path)
 
+    def parse_bundle(self, current_payload: Mapping[str, Any], forecast_payload: Mapping[str, Any]) -> WeatherBundle:
+        """Build a WeatherBundle from decoded current and forecast responses."""
         tz = ZoneInfo(self._settings.timezone)
         weather_meta = current_payload["weather"][0]
         now = datetime.fromtimestamp(current_payload["dt"], tz)
@@ -97,7 +172,7 @@ class OpenWeatherClient:
         # Determine if it's daytime
         sunrise = current_payload.get("sys", {}).get("sunrise", 0)
         sunset = current_payload.get("sys", {}).get("sunset", 0)
-        is_day = sunrise <= current_payload["dt"] <= sunset
+        is_day = self._icons.is_daytime(current_payload["dt"], sunrise, sunset)
         
         icon_name, icon_color = self._icons.resolve(weather_meta["id"], weather_meta["main"], is_day)
 
@@ -113,23 +188,147 @@ class OpenWeatherClient:
             description=weather_meta.get("description", "").title(),
             icon_key=icon_name,
             icon_color=icon_color,
+            sunrise=datetime.fromtimestamp(sunrise, tz) if sunrise else None,
+            sunset=datetime.fromtimestamp(sunset, tz) if sunset else None,
         )
 
-        forecast = self._parse_forecast(forecast_payload.get("list", []), tz, limit=4)
+        forecast = self._parse_forecast(
+            forecast_payload.get("list", []), tz, limit=4, not_before=current_payload["dt"]
+        )
         return WeatherBundle(current=current, next_hours=forecast)
 
-    def _parse_forecast(self, data: Sequence[Mapping[str, object]], tz: ZoneInfo, limit: int) -> list[ForecastEntry]:
+    def _get_json(
+        self,
+        name: str,
+        url: str,
+        params: Mapping[str, Any],
+        stats: CacheStats,
+        deadline: float,
+    ) -> Any:
+        """GET ``url`` through the on-disk response cache.
+
+        Entries younger than the endpoint's TTL are served without touching the
+        network. Older entries are revalidated with their ETag/Last-Modified, and a
+        304 reuses the stored body.
+        """
+        key = self._cache.key(name, url, params)
+        cached = self._cache.load(key)
+        if cached is not None and cached.age() < self._ttls[name]:
+            self._record(stats, hits=1, bytes_saved=len(cached.body))
+            LOGGER.debug("HTTP cache hit for %s (age %.0fs)", name, cached.age())
+            return decode_payload(name, cached.body)
+
+        headers = cached.validators() if cached is not None else {}
+        resp, payload = self._request(name, url, params, headers, deadline)
+        if resp.status_code == 304 and cached is not None:
+            cached.fetched_at = time.time()
+            self._cache.store(key, cached)
+            self._record(stats, revalidated=1, bytes_saved=len(cached.body))
+            LOGGER.debug("HTTP cache revalidated %s (304)", name)
+            return decode_payload(name, cached.body)
+
+        self._cache.store(
+            key,
+            CachedResponse(
+                body=resp.content,
+                fetched_at=time.time(),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            ),
+        )
+        self._record(stats, misses=1)
+        return payload
+
+    def _request(
+        self,
+        name: str,
+        url: str,
+        params: Mapping[str, Any],
+        headers: Mapping[str, str],
+        deadline: float,
+    ) -> tuple[requests.Response, Any]:
+        """GET ``url`` under the retry policy; returns the response and its JSON (``None`` on a 304)."""
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.monotonic()
+            try:
+                with span("http", endpoint=name, attempt=attempt) as attrs:
+                    resp = self._session.get(
+                        url, params=params, headers=headers, timeout=self._retry.timeout(deadline - started)
+                    )
+                    attrs["status"] = resp.status_code
+                    payload = None
+                    if not (resp.status_code == 304 and headers):
+                        resp.raise_for_status()
+                        payload = self._decode(name, resp)
+            except requests.RequestException as exc:
+                elapsed = time.monotonic() - started
+                error_class = classify(exc)
+                outcome = f"HTTP {exc.response.status_code}" if exc.response is not None else type(exc).__name__
+                if error_class == "rate_limit" and retry_after(exc) is not None:
+                    outcome += f", Retry-After {retry_after(exc):.0f}s"
+                wait = self._retry.delay(exc, error_class, attempt, deadline - time.monotonic())
+                if wait is None:
+                    LOGGER.warning(
+                        "OpenWeatherMap %s attempt %d: %s (%s) after %.2fs; giving up",
+                        name, attempt, outcome, error_class, elapsed,
+                    )
+                    raise WeatherFetchError(
+                        f"Unable to reach OpenWeatherMap ({name}) after {attempt} attempt(s): {outcome}"
+                    ) from exc
+                LOGGER.warning(
+                    "OpenWeatherMap %s attempt %d: %s (%s) after %.2fs; retrying in %.2fs (%.1fs of budget left)",
+                    name, attempt, outcome, error_class, elapsed, wait, deadline - time.monotonic(),
+                )
+                time.sleep(wait)
+                continue
+            LOGGER.info(
+                "OpenWeatherMap %s attempt %d: HTTP %d in %.2fs",
+                name, attempt, resp.status_code, time.monotonic() - started,
+            )
+            return resp, payload
+
+    @staticmethod
+    def _decode(name: str, resp: requests.Response) -> Any:
+        """The fields of ``resp`` the client uses; a malformed body is retried like a cut-off read."""
+        try:
+            return decode_payload(name, resp.content)
+        except ValueError as exc:
+            raise requests.exceptions.InvalidJSONError(f"Malformed {name} response: {exc}", response=resp) from exc
+
+    def _record(
+        self,
+        stats: CacheStats,
+        hits: int = 0,
+        revalidated: int = 0,
+        misses: int = 0,
+        bytes_saved: int = 0,
+    ) -> None:
+        with self._stats_lock:
+            for target in (stats, self._cache.stats):
+                target.hits += hits
+                target.revalidated += revalidated
+                target.misses += misses
+                target.bytes_saved += bytes_saved
+
+    def _parse_forecast(
+        self,
+        data: Sequence[Mapping[str, object]],
+        tz: ZoneInfo,
+        limit: int,
+        not_before: int = 0,
+    ) -> list[ForecastEntry]:
         """Parse 5-day/3-hour forecast data into hourly entries."""
         entries: list[ForecastEntry] = []
-        # Take the first 'limit' entries (each is 3 hours apart)
-        for block in data[:limit]:
+        # Take the first 'limit' upcoming entries (each is 3 hours apart); a cached
+        # forecast may already contain blocks that lie in the past.
+        upcoming = [block for block in data if int(block["dt"]) >= not_before]
+        for block in upcoming[:limit]:
             weather_list = block.get("weather") or []
             descriptor = weather_list[0].get("main", "Clouds") if weather_list else "Clouds"
-            icon_name, icon_color = self._icons.resolve(
-                int(weather_list[0]["id"]) if weather_list else 802, 
-                descriptor, 
-                True
-            )
+            code = int(weather_list[0]["id"]) if weather_list else 802
+            icon_name, icon_color = self._icons.resolve(code, descriptor, True)
             entries.append(
                 ForecastEntry(
                     timestamp=datetime.fromtimestamp(int(block["dt"]), tz),
@@ -138,6 +337,7 @@ class OpenWeatherClient:
                     icon_key=icon_name,
                     icon_color=icon_color,
                     description=descriptor,
+                    condition_code=code,
                 )
             )
         return entries
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore
+
+# A shape names the fields to keep: ``None`` keeps a value whole, a mapping keeps
+# those keys of an object, and a one-element list applies its shape to every
+# element of an array.
+Shape = Union[None, Mapping[str, "Shape"], List["Shape"]]
+
+# What parse_bundle and ForecastSeries read from each endpoint.
+FIELDS: Dict[str, Shape] = {
+    "current": {
+        "dt": None,
+        "main": {"temp": None, "feels_like": None, "humidity": None},
+        "wind": {"speed": None, "gust": None},
+        "weather": [{"id": None, "main": None, "description": None}],
+        "sys": {"sunrise": None, "sunset": None},
+    },
+    "forecast": {
+        "list": [{"dt": None, "main": {"temp": None}, "pop": None, "weather": [{"id": None, "main": None}]}],
+    },
+}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def compile_shape(shape: Shape) -> Optional[Callable[[Any], Any]]:
+    """A function returning the parts of a decoded value that ``shape`` names, or ``None`` to keep it whole.
+
+    Values of a type the shape does not expect are kept whole too.
+    """
+    if shape is None:
+        return None
+    if isinstance(shape, list):
+        element = compile_shape(shape[0])
+        if element is None:
+            return None
+
+        def each(value: Any) -> Any:
+            return [element(item) for item in value] if type(value) is list else value
+
+        return each
+    fields = tuple((key, compile_shape(sub)) for key, sub in shape.items())
+
+    def pick(value: Any) -> Any:
+        if type(value) is not dict:
+            return value
+        picked = {}
+        for key, sub in fields:
+            if key in value:
+                picked[key] = value[key] if sub is None else sub(value[key])
+        return picked
+
+    return pick
+
+
+def _skip(text: str, index: int) -> int:
+    return _WHITESPACE.match(text, index).end()
+
+
+def _expect(text: str, index: int, char: str) -> int:
+    if text[index : index + 1] != char:
+        raise json.JSONDecodeError(f"Expecting {char!r}", text, index)
+    return index + 1
+
+
+def _stream_array(text: str, index: int, pick: Optional[Callable[[Any], Any]]) -> Tuple[List[Any], int]:
+    """Decode the array at ``index`` one element at a time, keeping only what ``pick`` returns of each."""
+    items: List[Any] = []
+    index = _skip(text, _expect(text, index, "["))
+    if text[index : index + 1] == "]":
+        return items, index + 1
+    while True:
+        value, index = _decoder.raw_decode(text, index)
+        items.append(value if pick is None else pick(value))
+        index = _skip(text, index)
+        if text[index : index + 1] == "]":
+            return items, index + 1
+        index = _skip(text, _expect(text, index, ","))
+
+
+def _stream_object(text: str, members: Mapping[str, Tuple[bool, Optional[Callable[[Any], Any]]]]) -> Dict[str, Any]:
+    """Decode a top-level object member by member.
+
+    Members not in ``members`` are decoded and dropped straight away, and
+    arrays are streamed element by element, so the full tree of the response
+    never exists at once.
+    """
+    result: Dict[str, Any] = {}
+    index = _skip(text, _expect(text, _skip(text, 0), "{"))
+    if text[index : index + 1] == "}":
+        return result
+    while True:
+        key, index = _decoder.raw_decode(text, index)
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", text, index)
+        index = _skip(text, _expect(text, _skip(text, index), ":"))
+        member = members.get(key)
+        if member is None:
+            _, index = _decoder.raw_decode(text, index)
+        elif member[0] and text[index : index + 1] == "[":
+            result[key], index = _stream_array(text, index, member[1])
+        else:
+            value, index = _decoder.raw_decode(text, index)
+            result[key] = value if member[1] is None or member[0] else member[1](value)
+        index = _skip(text, index)
+        if text[index : index + 1] == "}":
+            break
+        index = _skip(text, _expect(text, index, ","))
+    if _skip(text, index + 1) != len(text):
+        raise json.JSONDecodeError("Extra data", text, index + 1)
+    return result
+
+
+def _members(shape: Mapping[str, Shape]) -> Dict[str, Tuple[bool, Optional[Callable[[Any], Any]]]]:
+    """Per top-level key: whether it is streamed as an array, and the picker for it (or for its elements)."""
+    return {
+        key: (True, compile_shape(sub[0])) if isinstance(sub, list) else (False, compile_shape(sub))
+        for key, sub in shape.items()
+    }
+
+
+_PICKERS = {endpoint: compile_shape(shape) for endpoint, shape in FIELDS.items()}
+_MEMBERS = {endpoint: _members(shape) for endpoint, shape in FIELDS.items()}
+
+
+def decode_payload(endpoint: str, body: bytes, fast: bool = True) -> Any:
+    """Decode an OpenWeather response body down to the fields :data:`FIELDS` lists for ``endpoint``.
+
+    orjson, when installed (and ``fast``), decodes the whole body faster than
+    the stdlib can stream it, and the projection drops the rest. Without it the
+    stdlib decoder streams the body (see :func:`_stream_object`). Malformed
+    bodies, and bodies that are not a JSON object, raise ``ValueError`` either way.
+    """
+    if fast and orjson is not None:
+        payload = orjson.loads(body)
+        if type(payload) is not dict:
+            raise ValueError(f"Expected a JSON object, got {type(payload).__name__}")
+        return _PICKERS[endpoint](payload)
+    text = body.decode("utf-8") if isinstance(body, (bytes, bytearray, memoryview)) else body
+    return _stream_object(text, _MEMBERS[endpoint])
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from zoneinfo import ZoneInfo
+
+from ..config import Settings
+from ..hardware.frame_codec import frame_etag
+from ..models import BatteryStatus, RenderPayload, WeatherBundle
+from ..utils.fs import atomic_write_bytes, atomic_write_text
+from ..utils.spans import span
+
+if TYPE_CHECKING:
+    from ..render.layout import LayoutRenderer
+    from .forecast_store import ForecastSeries
+    from .openweather import IconResolver
+
+LOGGER = logging.getLogger(__name__)
+
+PRERENDER_DIR_NAME = "prerender"
+INDEX_NAME = "index.json"
+FORMAT_VERSION = 1
+
+
+@dataclass(slots=True)
+class PrerenderedFrame:
+    at: datetime
+    until: datetime
+    buffer: bytes
+    etag: str
+
+
+def slot_start(moment: datetime, minutes: int) -> datetime:
+    """Start of the ``minutes``-long wake slot containing ``moment``, on a grid anchored at the Unix epoch."""
+    step = max(1, minutes) * 60
+    seconds = int(moment.timestamp())
+    return datetime.fromtimestamp(seconds - seconds % step, moment.tzinfo)
+
+
+def slot_weather(
+    weather: WeatherBundle,
+    at: datetime,
+    series: Optional[ForecastSeries] = None,
+    icons: Optional[IconResolver] = None,
+) -> Optional[WeatherBundle]:
+    """``weather`` as a wake at ``at`` should show it, or ``None`` past the forecast.
+
+    With the full forecast of the same fetch (``series``) this is
+    :meth:`ForecastSeries.bundle`. Otherwise the block of ``weather`` covering
+    ``at`` stands in for the current conditions (humidity and wind, which
+    blocks do not carry, stay as fetched, and the feels-like temperature moves
+    with the temperature) and the blocks after it become the outlook. The
+    icon is resolved for day or night at ``at`` when ``icons`` is given. A
+    slot needs at least one block ahead of it.
+    """
+    if series is not None and icons is not None and series.observed_at == int(weather.current.timestamp.timestamp()):
+        return series.bundle(weather.current, at, icons) if series.covers(at) else None
+    ahead = [entry for entry in weather.next_hours if entry.timestamp > at]
+    if not ahead:
+        return None
+    current = weather.current
+    covering = [entry for entry in weather.next_hours if entry.timestamp <= at]
+    if covering and covering[-1].timestamp > current.timestamp:
+        from .forecast_store import condition_description
+
+        block = covering[-1]
+        if block.condition_code == current.condition_code:
+            label, description = current.condition_label, current.description
+        else:
+            label, description = block.description, condition_description(block.condition_code)
+        current = replace(
+            current,
+            timestamp=block.timestamp,
+            temperature=block.temperature,
+            feels_like=current.feels_like + block.temperature - current.temperature,
+            condition_code=block.condition_code,
+            condition_label=label,
+            description=description,
+            icon_key=block.icon_key,
+            icon_color=block.icon_color,
+        )
+    if icons is not None:
+        sunrise = current.sunrise.timestamp() if current.sunrise is not None else 0
+        sunset = current.sunset.timestamp() if current.sunset is not None else 0
+        is_day = icons.is_daytime(at.timestamp(), sunrise, sunset)
+        icon_key, icon_color = icons.resolve(current.condition_code, current.condition_label, is_day)
+        current = replace(current, icon_key=icon_key, icon_color=icon_color)
+    return WeatherBundle(current=current, next_hours=ahead)
+
+
+class SlotFrameStore:
+    """Packed frames for upcoming wake slots: ``<slot epoch>.epd`` files and a JSON index.
+
+    The index records the render profile the frames were drawn with, so a
+    change of fonts, palette or buffer mode makes them miss instead of showing
+    the old look.
+    """
+
+    def __init__(self, directory: Path, profile: str) -> None:
+        self._dir = directory
+        self._index_path = directory / INDEX_NAME
+        self._profile = profile
+
+    def lookup(self, now: datetime) -> Optional[PrerenderedFrame]:
+        """The frame for the slot containing ``now``, if one was prerendered."""
+        try:
+            index = json.loads(self._index_path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError as exc:
+            LOGGER.warning("Ignoring unreadable prerender index %s: %s", self._index_path, exc)
+            return None
+        if index.get("v") != FORMAT_VERSION or index.get("profile") != self._profile:
+            LOGGER.info("Prerendered frames were drawn with other settings; ignoring them")
+            return None
+        stamp = now.timestamp()
+        interval = int(index["interval"])
+        for at, etag in index["slots"]:
+            if at <= stamp < at + interval:
+                try:
+                    buffer = (self._dir / f"{at}.epd").read_bytes()
+                except FileNotFoundError:
+                    LOGGER.warning("Prerendered frame %s.epd is missing", at)
+                    return None
+                if frame_etag(buffer) != etag:
+                    LOGGER.warning("Prerendered frame %s.epd is corrupt", at)
+                    return None
+                start = datetime.fromtimestamp(at, now.tzinfo)
+                return PrerenderedFrame(start, datetime.fromtimestamp(at + interval, now.tzinfo), buffer, etag)
+        return None
+
+    def save(self, frames: Sequence[Tuple[datetime, bytes]], interval_minutes: int) -> None:
+        """Replace the stored frames with ``frames`` (slot start, packed buffer)."""
+        slots = []
+        for at, buffer in frames:
+            stamp = int(at.timestamp())
+            atomic_write_bytes(self._dir / f"{stamp}.epd", buffer)
+            slots.append([stamp, frame_etag(buffer)])
+        interval = max(1, interval_minutes) * 60
+        index = {"v": FORMAT_VERSION, "profile": self._profile, "interval": interval, "slots": slots}
+        # The index goes last, so a power cut never leaves it naming a frame that was not written.
+        atomic_write_text(self._index_path, json.dumps(index, separators=(",", ":")))
+        keep = {f"{stamp}.epd" for stamp, _ in slots}
+        for path in self._dir.glob("*.epd"):
+            if path.name not in keep:
+                path.unlink()
+
+
+def prerender_frames(
+    settings: Settings,
+    renderer: LayoutRenderer,
+    store: SlotFrameStore,
+    weather: WeatherBundle,
+    battery: Optional[BatteryStatus],
+    now: datetime,
+    series: Optional[ForecastSeries] = None,
+    icons: Optional[IconResolver] = None,
+) -> List[datetime]:
+    """Render, pack and store frames for up to ``PRERENDER_SLOTS`` slots after the one containing ``now``.
+
+    Each frame shows its slot's start time, the weather from :func:`slot_weather`
+    (interpolated along ``series`` when given) and the clothing card for that
+    weather. The battery gauge keeps the reading taken now. Returns the slots
+    that were stored.
+    """
+    from ..hardware.epd_buffer import PanelBufferPacker
+    from ..render.clothing import choose_clothing_card
+
+    # "driver" means the vendor getbuffer, which the byte-identical "vendor" mode reproduces.
+    mode = "vendor" if settings.epd_buffer_mode == "driver" else settings.epd_buffer_mode
+    packer = PanelBufferPacker(settings.palette, mode)
+    tz = ZoneInfo(settings.timezone)
+    step = max(1, settings.update_interval_minutes) * 60
+    first = slot_start(now, settings.update_interval_minutes)
+    frames: List[Tuple[datetime, bytes]] = []
+    for number in range(1, settings.prerender_slots + 1):
+        at = datetime.fromtimestamp(first.timestamp() + number * step, tz)
+        bundle = slot_weather(weather, at, series, icons)
+        if bundle is None:
+            break
+        with span("prerender.frame", slot=at.isoformat(timespec="minutes")):
+            payload = RenderPayload(
+                weather=bundle,
+                battery=battery,
+                clothing_image=choose_clothing_card(bundle, settings.clothing_dir, settings.clothing_cards),
+                last_updated=at,
+            )
+            frames.append((at, bytes(packer.pack(renderer.build(payload)))))
+    store.save(frames, settings.update_interval_minutes)
+    return [at for at, _ in frames]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+import requests
+
+from ..config import Settings
+
+
+@dataclass(frozen=True, slots=True)
+class RetryRule:
+    """How many attempts a failure class may use, and whether to back off between them."""
+
+    attempts: int
+    backoff: bool = True
+
+
+# Connect failures (DNS, TLS, refused) are typical right after Wi-Fi association
+# and cost little, so they get the most attempts. A read failure means a server
+# that accepted the connection and then stalled or cut the body, which is the
+# expensive case. 429s wait for Retry-After instead of backing off.
+DEFAULT_RULES: Mapping[str, RetryRule] = {
+    "connect": RetryRule(attempts=4),
+    "read": RetryRule(attempts=2),
+    "server": RetryRule(attempts=3),
+    "rate_limit": RetryRule(attempts=2, backoff=False),
+    "client": RetryRule(attempts=1),
+}
+
+
+def classify(exc: BaseException) -> str:
+    """Map a request failure onto a key of ``DEFAULT_RULES``."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        if status == 429:
+            return "rate_limit"
+        return "server" if status >= 500 else "client"
+    if isinstance(exc, requests.ConnectTimeout):
+        return "connect"
+    if isinstance(exc, (requests.ReadTimeout, requests.exceptions.ChunkedEncodingError, ValueError)):
+        return "read"
+    if isinstance(exc, requests.ConnectionError):
+        return "connect"
+    return "read"
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds requested by a ``Retry-After`` header (delta or HTTP date), if any."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """Jittered exponential backoff bounded by the fetch deadline.
+
+    ``max_attempts`` caps every class; ``rules`` can lower it per class. A retry
+    is only scheduled when, after its delay, at least ``min_attempt_time``
+    remains before the deadline.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 4.0
+    connect_timeout: float = 4.0
+    min_attempt_time: float = 1.0
+    rules: Mapping[str, RetryRule] = field(default_factory=lambda: dict(DEFAULT_RULES))
+    rng: random.Random = field(default_factory=random.Random)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.fetch_retry_attempts,
+            base_delay=settings.fetch_retry_backoff,
+            connect_timeout=settings.fetch_connect_timeout,
+        )
+
+    def attempts_for(self, error_class: str) -> int:
+        rule = self.rules.get(error_class, RetryRule(attempts=1))
+        return max(1, min(self.max_attempts, rule.attempts))
+
+    def timeout(self, remaining: float) -> tuple[float, float]:
+        """``(connect, read)`` timeouts for an attempt with ``remaining`` seconds left."""
+        remaining = max(0.1, remaining)
+        return min(self.connect_timeout, remaining), remaining
+
+    def delay(self, exc: BaseException, error_class: str, attempt: int, remaining: float) -> Optional[float]:
+        """Seconds to wait before attempt ``attempt + 1``, or ``None`` to give up."""
+        if attempt >= self.attempts_for(error_class):
+            return None
+        rule = self.rules.get(error_class, RetryRule(attempts=1))
+        if error_class == "rate_limit":
+            wait = retry_after(exc)
+            wait = self.base_delay if wait is None else wait
+        elif rule.backoff:
+            # "Full jitter": uniform over [0, capped exponential].
+            wait = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        else:
+            wait = 0.0
+        if remaining - wait < self.min_attempt_time:
+            return None
+        return wait
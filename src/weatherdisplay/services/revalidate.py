@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from zoneinfo import ZoneInfo
+
+from ..config import Settings
+from ..models import WeatherBundle
+from .bundle_store import BundleStore
+from .openweather import OpenWeatherClient, WeatherFetchError
+
+if TYPE_CHECKING:
+    from .forecast_store import ForecastStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidate:
+    """Bound wake latency by rendering the last good bundle when the network is slow.
+
+    A fresh fetch gets ``settings.stale_render_budget`` seconds. If it fails or
+    misses that budget, the stored snapshot is returned together with its age,
+    and the fetch keeps running so a successful response refreshes the snapshot
+    for the next cycle (a one-shot wake bounds that wait with :meth:`settle`).
+    With a ``forecast`` store holding the full forecast of the same fetch, the
+    snapshot is first carried forward to the present along it.
+    """
+
+    def __init__(
+        self,
+        client: OpenWeatherClient,
+        store: BundleStore,
+        settings: Settings,
+        forecast: Optional[ForecastStore] = None,
+    ) -> None:
+        self._client = client
+        self._store = store
+        self._forecast = forecast
+        self._settings = settings
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="owm-revalidate")
+        self._pending: Optional[Future[WeatherBundle]] = None
+
+    def fetch(self) -> tuple[WeatherBundle, Optional[datetime]]:
+        """Return ``(bundle, stale_since)``; ``stale_since`` is ``None`` for fresh data."""
+        if self._pending is None or self._pending.done():
+            self._pending = self._pool.submit(self._refresh)
+        else:
+            LOGGER.info("Previous revalidation still in flight; waiting on it")
+        future = self._pending
+
+        budget = self._settings.stale_render_budget
+        try:
+            return future.result(timeout=budget), None
+        except FutureTimeoutError:
+            reason = f"no response within {budget:g}s; revalidating in background"
+        except WeatherFetchError as exc:
+            reason = str(exc)
+
+        stored = self._store.load(ZoneInfo(self._settings.timezone))
+        if stored is None:
+            LOGGER.warning("Weather fetch slow or failing (%s) and no snapshot stored; waiting", reason)
+            return future.result(), None
+        LOGGER.warning("Rendering weather snapshot from %s (%s)", stored.saved_at.strftime("%H:%M"), reason)
+        return self._carry_forward(stored.bundle), stored.saved_at
+
+    def settle(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a background revalidation; ``False`` if it is still running."""
+        pending = self._pending
+        if pending is None or pending.done():
+            return True
+        try:
+            pending.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception:  # its failure was the reason for the stale render; nothing more to do
+            pass
+        return True
+
+    def _carry_forward(self, bundle: WeatherBundle) -> WeatherBundle:
+        series = self._forecast.load() if self._forecast is not None else None
+        if series is None or series.observed_at != int(bundle.current.timestamp.timestamp()):
+            return bundle
+        now = datetime.now(ZoneInfo(self._settings.timezone))
+        if not series.covers(now):
+            LOGGER.info("The stored forecast has run out (%s)", series.freshness(now))
+            return bundle
+        LOGGER.info("Deriving current conditions from the stored forecast (%s)", series.freshness(now))
+        return series.bundle(bundle.current, now, self._client.icons)
+
+    def _refresh(self) -> WeatherBundle:
+        bundle = self._client.fetch_bundle()
+        try:
+            self._store.save(bundle)
+        except OSError as exc:
+            LOGGER.warning("Unable to persist weather snapshot: %s", exc)
+        return bundle
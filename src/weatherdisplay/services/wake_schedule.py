@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from zoneinfo import ZoneInfo
+
+from ..config import Settings
+from ..models import BatteryStatus, WeatherBundle
+
+# Shutdown and the Witty Pi's power-cut delay need time before an alarm can fire.
+MIN_LEAD = timedelta(minutes=2)
+
+
+@dataclass(slots=True)
+class WakePlan:
+    at: datetime
+    minutes: float
+    reasons: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return f"{self.at.isoformat(timespec='minutes')} (+{self.minutes:.0f} min: {'; '.join(self.reasons)})"
+
+
+def forecast_rates(weather: WeatherBundle) -> Tuple[float, float]:
+    """Steepest temperature change (degrees per hour) and largest rain-chance swing ahead."""
+    points = [(weather.current.timestamp, weather.current.temperature, None)]
+    points += [(entry.timestamp, entry.temperature, entry.precipitation_probability) for entry in weather.next_hours]
+    temp_rate = 0.0
+    for (t0, temp0, _), (t1, temp1, _) in zip(points, points[1:]):
+        hours = (t1 - t0).total_seconds() / 3600
+        if hours > 0:
+            temp_rate = max(temp_rate, abs(temp1 - temp0) / hours)
+    pops = [pop for _, _, pop in points if pop is not None]
+    pop_swing = max(pops) - min(pops) if pops else 0.0
+    return temp_rate, pop_swing
+
+
+class WakeScheduler:
+    """Choose when the Witty Pi should next power the Pi on.
+
+    Starts from ``UPDATE_INTERVAL_MINUTES`` and adjusts it:
+
+    - Retry soon after a failed fetch.
+    - Wake less often on a low battery.
+    - Wake more often when the forecast is moving faster than the display's
+      significance thresholds, and less often when nothing visible would change.
+    - Sleep through quiet hours.
+
+    The result is clamped to ``WAKE_MIN_MINUTES``..``WAKE_MAX_MINUTES``, except
+    that quiet hours may push a wake past the maximum.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._base = float(settings.update_interval_minutes)
+        self._min = float(settings.wake_min_minutes)
+        self._max = float(max(settings.wake_max_minutes, settings.wake_min_minutes))
+        self._quiet = settings.quiet_hours
+        self._tz = ZoneInfo(settings.timezone)
+        self._temperature_step = float(settings.significance["temperature"])
+        self._pop_step = float(settings.significance["pop"])
+
+    def plan(
+        self,
+        now: datetime,
+        battery: Optional[BatteryStatus],
+        weather: Optional[WeatherBundle],
+        fetch_failed: bool = False,
+    ) -> WakePlan:
+        minutes = self._base
+        reasons = [f"base {self._base:g} min"]
+
+        if fetch_failed:
+            minutes = self._min
+            reasons.append("retry after failed fetch")
+        elif weather is not None:
+            temp_rate, pop_swing = forecast_rates(weather)
+            expected = temp_rate * self._base / 60
+            if expected >= 2 * self._temperature_step or pop_swing >= 3 * self._pop_step:
+                minutes /= 2
+                reasons.append(f"forecast changing ({temp_rate:.1f}°/h, rain chance swing {pop_swing:.0%})")
+            elif expected < self._temperature_step / 2 and pop_swing < self._pop_step:
+                minutes *= 2
+                reasons.append(f"forecast steady ({temp_rate:.1f}°/h)")
+
+        if battery is not None and not battery.is_external_power:
+            if battery.percentage < 25:
+                minutes *= 3
+                reasons.append(f"battery {battery.percentage}%")
+            elif battery.percentage < 50:
+                minutes *= 1.5
+                reasons.append(f"battery {battery.percentage}%")
+
+        minutes = min(self._max, max(self._min, minutes))
+        at = now + max(MIN_LEAD, timedelta(minutes=minutes))
+        quiet_end = self._quiet_end(at)
+        if quiet_end is not None:
+            at = quiet_end.astimezone(at.tzinfo)
+            reasons.append(f"quiet hours until {quiet_end.astimezone(self._tz):%H:%M}")
+
+        # Alarms are programmed to the second; round up to a whole minute.
+        if at.second or at.microsecond:
+            at = at.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        return WakePlan(at=at, minutes=math.ceil((at - now).total_seconds() / 60), reasons=reasons)
+
+    def _quiet_end(self, at: datetime) -> Optional[datetime]:
+        """End of the quiet window containing ``at``, or ``None`` if ``at`` is outside it."""
+        if self._quiet is None:
+            return None
+        start, end = self._quiet
+        local = at.astimezone(self._tz)
+        hour = local.hour
+        inside = start <= hour < end if start < end else hour >= start or hour < end
+        if not inside:
+            return None
+        wake = local.replace(hour=end, minute=0, second=0, microsecond=0)
+        if wake <= local:
+            wake += timedelta(days=1)
+        return wake
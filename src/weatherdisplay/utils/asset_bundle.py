@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import logging
+import mmap
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from .fs import atomic_write_bytes
+
+LOGGER = logging.getLogger(__name__)
+MAGIC = b"WDASSET1\n"
+# Bump when the header layout or the compiled contents change.
+BUNDLE_VERSION = 1
+# Characters the text font must cover: printable ASCII plus Latin-1 (degree sign, accented descriptions).
+TEXT_CHARACTERS = [*range(0x20, 0x7F), *range(0xA0, 0x100)]
+# IconResolver's last-resort icon when the map has no "clouds" entry.
+FALLBACK_ICON = "cloud"
+
+
+@dataclass(slots=True)
+class AssetSources:
+    """Source files the bundle is compiled from."""
+
+    fonts: Mapping[str, Path]
+    icon_map: Path
+    codepoints: Path
+    clothing_dirs: Tuple[Path, ...]  # in order of preference; the first with a card wins
+
+    def paths(self) -> List[Path]:
+        return [*self.fonts.values(), self.icon_map, self.codepoints, *self.clothing_dirs]
+
+
+@dataclass(slots=True)
+class AssetBundle:
+    """Everything start-up used to parse from the asset tree on every run.
+
+    ``glyphs`` holds only the Material icons the icon map can name, ``fonts``
+    the subset font files (empty when they were not subset), and ``signature``
+    the mtime and size of every source the bundle was compiled from.
+    """
+
+    icon_map: Mapping[str, Mapping[str, str]]
+    glyphs: Mapping[str, str]
+    clothing_dir: Path
+    clothing_cards: FrozenSet[str]
+    fonts: Mapping[str, bytes | memoryview] = field(default_factory=dict)
+    signature: Dict[str, list] = field(default_factory=dict)
+
+    def __reduce__(self):
+        # Font data may be a view of the memory map; copy it so settings can cross into spawned workers.
+        fonts = {name: bytes(data) for name, data in self.fonts.items()}
+        args = (self.icon_map, self.glyphs, self.clothing_dir, self.clothing_cards, fonts, self.signature)
+        return (AssetBundle, args)
+
+
+def source_signature(sources: AssetSources) -> Dict[str, list]:
+    """``[mtime_ns, size]`` per source path; ``None`` for one that does not exist.
+
+    A directory's mtime changes when a file is added, removed or renamed in it,
+    which is all the clothing index depends on.
+    """
+    signature = {}
+    for path in sources.paths():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            signature[str(path)] = None
+        else:
+            signature[str(path)] = [stat.st_mtime_ns, stat.st_size]
+    return signature
+
+
+def _load_codepoints(path: Path, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    wanted = None if names is None else set(names)
+    mapping: Dict[str, str] = {}
+    for line in path.read_text().splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, code = line.split()
+        if wanted is None or name in wanted:
+            mapping[name] = chr(int(code, 16))
+    return mapping
+
+
+def compile_assets(sources: AssetSources) -> AssetBundle:
+    """Read and index the asset sources, the way start-up did before bundles existed."""
+    for name, path in sources.fonts.items():
+        if not path.exists():
+            raise FileNotFoundError(f"Font '{name}' expected at {path}")
+    icon_map = json.loads(sources.icon_map.read_text())
+    if not sources.codepoints.exists():
+        raise FileNotFoundError(f"Missing Material icon codepoints file at {sources.codepoints}")
+    names = {entry["icon"] for entry in icon_map.values()} | {FALLBACK_ICON}
+    glyphs = _load_codepoints(sources.codepoints, names)
+
+    clothing_dir = sources.clothing_dirs[-1]
+    cards: FrozenSet[str] = frozenset()
+    for directory in sources.clothing_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+    for directory in sources.clothing_dirs:
+        found = frozenset(path.name for path in directory.glob("*.png"))
+        if found or directory == sources.clothing_dirs[-1]:
+            clothing_dir, cards = directory, found
+            break
+    return AssetBundle(icon_map, glyphs, clothing_dir, cards, signature=source_signature(sources))
+
+
+def subset_font(path: Path, characters: Iterable[int]) -> bytes:
+    """``path`` reduced to the glyphs for ``characters``, hinting kept so rasterization is unchanged."""
+    try:
+        from fontTools import subset as font_subset
+        from fontTools.ttLib import TTFont
+    except ImportError as exc:
+        raise RuntimeError("fontTools is required to subset fonts") from exc
+    options = font_subset.Options()
+    options.hinting = True
+    options.notdef_outline = True
+    options.name_IDs = ["*"]
+    font = TTFont(str(path))
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=list(characters))
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def build_bundle(path: Path, sources: AssetSources, subset: bool = True) -> AssetBundle:
+    """Compile ``sources`` and write them to ``path``; fonts are subset when ``subset`` and fontTools allow."""
+    bundle = compile_assets(sources)
+    blobs: List[bytes] = []
+    fonts: Dict[str, list] = {}
+    # Optional, and imported only here: without fontTools the fonts load from their source files.
+    if subset and importlib.util.find_spec("fontTools") is not None:
+        characters = {
+            "text": TEXT_CHARACTERS,
+            "icons": sorted(ord(glyph) for glyph in bundle.glyphs.values()),
+        }
+        offset = 0
+        for name, font_path in sorted(sources.fonts.items()):
+            data = subset_font(font_path, characters.get(name, TEXT_CHARACTERS))
+            fonts[name] = [offset, len(data)]
+            blobs.append(data)
+            offset += len(data)
+            LOGGER.info("Subset %s: %d -> %d bytes", font_path.name, font_path.stat().st_size, len(data))
+    elif subset:
+        LOGGER.info("fontTools is not installed; fonts stay in their source files")
+    header = {
+        "version": BUNDLE_VERSION,
+        "sources": bundle.signature,
+        "icon_map": bundle.icon_map,
+        "glyphs": {name: ord(glyph) for name, glyph in sorted(bundle.glyphs.items())},
+        "clothing_dir": str(bundle.clothing_dir),
+        "clothing_cards": sorted(bundle.clothing_cards),
+        "fonts": fonts,
+    }
+    encoded = json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    atomic_write_bytes(path, MAGIC + encoded + b"\n" + b"".join(blobs))
+    _loaded.pop(path, None)
+    return load_bundle(path, sources) or bundle
+
+
+# Bundles mapped by this process, so a fleet building many Settings maps the file once.
+_loaded: Dict[Path, AssetBundle] = {}
+
+
+def load_bundle(path: Path, sources: AssetSources) -> Optional[AssetBundle]:
+    """The bundle at ``path``, or ``None`` if it is missing, unreadable or older than a source."""
+    signature = source_signature(sources)
+    bundle = _loaded.get(path)
+    if bundle is not None and bundle.signature == signature:
+        return bundle
+    try:
+        with path.open("rb") as handle:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    view = memoryview(data)
+    try:
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError("bad magic")
+        header_end = data.find(b"\n", len(MAGIC))
+        header = json.loads(bytes(view[len(MAGIC) : header_end]))
+    except ValueError as exc:
+        LOGGER.warning("Discarding unreadable asset bundle %s: %s", path, exc)
+        return None
+    if header.get("version") != BUNDLE_VERSION or header.get("sources") != signature:
+        LOGGER.info("Asset sources changed; the asset bundle is stale")
+        return None
+    start = header_end + 1
+    bundle = AssetBundle(
+        icon_map=header["icon_map"],
+        glyphs={name: chr(code) for name, code in header["glyphs"].items()},
+        clothing_dir=Path(header["clothing_dir"]),
+        clothing_cards=frozenset(header["clothing_cards"]),
+        fonts={name: view[start + offset : start + offset + size] for name, (offset, size) in header["fonts"].items()},
+        signature=signature,
+    )
+    _loaded[path] = bundle
+    return bundle
+
+
+def load_or_build(path: Path, sources: AssetSources) -> AssetBundle:
+    """Load the bundle, recompiling it (without font subsetting) when it is missing or stale."""
+    bundle = load_bundle(path, sources)
+    if bundle is None:
+        # Subsetting imports fontTools and can take seconds on a Pi Zero; build_asset_bundle.py does it offline.
+        bundle = build_bundle(path, sources, subset=False)
+        LOGGER.info("Rebuilt asset bundle %s", path)
+    return bundle
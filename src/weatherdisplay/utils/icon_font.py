@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Mapping, Optional
 
 
 class MaterialIconFont:
-    def __init__(self, font_path: Path, codepoints_path: Path) -> None:
+    def __init__(self, font_path: Path, codepoints_path: Path, glyphs: Optional[Mapping[str, str]] = None) -> None:
         self.font_path = font_path
         self.codepoints_path = codepoints_path
-        self._glyphs = self._load_codepoints(codepoints_path)
+        # An asset bundle supplies the few glyphs the icon map uses; otherwise parse the whole codepoints file.
+        self._glyphs = dict(glyphs) if glyphs is not None else self._load_codepoints(codepoints_path)
 
     @staticmethod
     def _load_codepoints(path: Path) -> Dict[str, str]:
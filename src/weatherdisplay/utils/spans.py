@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+LOGGER = logging.getLogger(__name__)
+SPAN_LOG_NAME = "spans.jsonl"
+
+
+@dataclass(slots=True)
+class Span:
+    run: str
+    name: str
+    start: float  # seconds from the start of the run
+    duration: float
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        record = {"run": self.run, "span": self.name, "t": round(self.start, 4), "ms": round(self.duration * 1000, 2)}
+        if self.error is not None:
+            record["err"] = self.error
+        record.update(self.attrs)
+        return json.dumps(record, separators=(",", ":"), default=str)
+
+
+class SpanLog:
+    """Append-only JSON-lines file, rotated to ``<name>.1`` once it reaches ``max_bytes``."""
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def backup(self) -> Path:
+        return self.path.with_name(self.path.name + ".1")
+
+    def append(self, spans: Sequence[Span]) -> None:
+        if not spans:
+            return
+        data = "".join(span.to_json() + "\n" for span in spans).encode("utf-8")
+        with self._lock:
+            try:
+                if self.path.stat().st_size + len(data) > self.max_bytes:
+                    os.replace(self.path, self.backup)
+            except FileNotFoundError:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as handle:
+                handle.write(data)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Every record, oldest first; lines cut short by a power loss are skipped."""
+        for path in (self.backup, self.path):
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except FileNotFoundError:
+                continue
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "run" in record and "span" in record:
+                    yield record
+
+
+class Run:
+    """Spans of one wake (or one daemon cycle).
+
+    Spans are buffered and written in one append by :meth:`finish`. Spans that
+    end after that, such as a refresh the daemon left running on the display
+    worker, are appended on their own as they complete.
+    """
+
+    def __init__(self) -> None:
+        self.id = datetime.now().isoformat(timespec="milliseconds")
+        self._origin = time.perf_counter()
+        self._spans: List[Span] = []
+        self._log: Optional[SpanLog] = None
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started: float, ended: float, error: Optional[str], attrs: Dict[str, Any]) -> None:
+        span = Span(self.id, name, started - self._origin, ended - started, error, attrs)
+        with self._lock:
+            if not self._finished:
+                self._spans.append(span)
+                return
+            log = self._log
+        if log is not None:
+            self._append(log, [span])
+
+    def finish(self, log: Optional[SpanLog]) -> None:
+        with self._lock:
+            spans, self._spans = self._spans, []
+            self._log, self._finished = log, True
+        if log is not None:
+            self._append(log, spans)
+
+    @staticmethod
+    def _append(log: SpanLog, spans: Sequence[Span]) -> None:
+        try:
+            log.append(spans)
+        except OSError as exc:  # timing data must never fail a wake
+            LOGGER.warning("Could not write spans to %s: %s", log.path, exc)
+
+
+_current: Optional[Run] = None
+_bound = threading.local()
+
+
+def start_run() -> Run:
+    global _current
+    _current = Run()
+    return _current
+
+
+def current_run() -> Optional[Run]:
+    return getattr(_bound, "run", None) or _current
+
+
+def finish_run(log: Optional[SpanLog]) -> None:
+    """Write the current run's spans to ``log`` (or drop them if ``None``) and end it."""
+    global _current
+    run, _current = _current, None
+    if run is not None:
+        run.finish(log)
+
+
+@contextmanager
+def bind(run: Optional[Run]) -> Iterator[None]:
+    """Record this thread's spans into ``run`` instead of the current run."""
+    previous = getattr(_bound, "run", None)
+    _bound.run = run
+    try:
+        yield
+    finally:
+        _bound.run = previous
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time the block as ``name``; the yielded dict takes attributes known only inside it.
+
+    Outside a run this only yields, so library code can be instrumented freely.
+    """
+    run = current_run()
+    if run is None:
+        yield attrs
+        return
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        run.record(name, started, time.perf_counter(), error, attrs)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def report(log: SpanLog, runs: int = 50) -> str:
+    """Per-span p50/p95/max of the time each of the last ``runs`` runs spent in it."""
+    per_run: Dict[str, Dict[str, List[float]]] = {}
+    for record in log.read():
+        per_run.setdefault(record["run"], {}).setdefault(record["span"], []).append(float(record.get("ms", 0.0)))
+    recent = sorted(per_run)[-runs:]
+    if not recent:
+        return f"No spans recorded in {log.path}"
+    totals: Dict[str, List[float]] = {}
+    calls: Dict[str, int] = {}
+    for run_id in recent:
+        for name, durations in per_run[run_id].items():
+            totals.setdefault(name, []).append(sum(durations))
+            calls[name] = calls.get(name, 0) + len(durations)
+    lines = [
+        f"{len(recent)} run(s) from {recent[0]} to {recent[-1]}; milliseconds per run",
+        f"{'span':<22}{'runs':>6}{'calls':>7}{'p50':>10}{'p95':>10}{'max':>10}",
+    ]
+    for name, values in sorted(totals.items(), key=lambda item: percentile(item[1], 0.5), reverse=True):
+        lines.append(
+            f"{name:<22}{len(values):>6}{calls[name] / len(values):>7.1f}"
+            f"{percentile(values, 0.5):>10.1f}{percentile(values, 0.95):>10.1f}{max(values):>10.1f}"
+        )
+    return "\n".join(lines)
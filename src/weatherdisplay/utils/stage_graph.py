@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from .spans import span
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StageCancelled(RuntimeError):
+    """Raised for stages that never ran because the graph was cancelled."""
+
+
+class StageSkipped(RuntimeError):
+    """Raised for stages that never ran because a dependency failed."""
+
+
+@dataclass(slots=True)
+class Stage:
+    name: str
+    fn: Callable[[Mapping[str, Any]], Any]
+    deps: Sequence[str] = ()
+
+
+@dataclass(slots=True)
+class StageTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass(slots=True)
+class GraphResult:
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    cancel_reason: Optional[str] = None
+    deps: Dict[str, Sequence[str]] = field(default_factory=dict)
+
+    def critical_path(self) -> List[str]:
+        """Chain of stages, each waiting on the previous one, that ended last."""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage: self.timings[stage].end)
+        path = [name]
+        while True:
+            ran = [dep for dep in self.deps.get(name, ()) if dep in self.timings]
+            if not ran:
+                break
+            name = max(ran, key=lambda stage: self.timings[stage].end)
+            path.append(name)
+        return path[::-1]
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {timing.start:.2f}-{timing.end:.2f}s"
+            for name, timing in sorted(self.timings.items(), key=lambda item: item[1].start)
+        ]
+        path = self.critical_path()
+        total = self.timings[path[-1]].end if path else 0.0
+        return f"{', '.join(parts)}; critical path {' -> '.join(path) or 'none'} ({total:.2f}s)"
+
+
+class StageGraph:
+    """Run stages as soon as their dependencies have produced results.
+
+    Each stage receives a mapping of its dependencies' results. A stage whose
+    dependency raised is skipped. :meth:`cancel` (callable from inside a stage)
+    stops new stages from starting and makes :meth:`run` return without waiting
+    for stages already in flight; those check :attr:`cancelled` to wind down.
+    With ``max_workers=1`` stages run one at a time in insertion order.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._stages: Dict[str, Stage] = {}
+        self._max_workers = max_workers
+        self._cancel = threading.Event()
+        self._cancel_reason: Optional[str] = None
+
+    def add(self, name: str, fn: Callable[[Mapping[str, Any]], Any], deps: Sequence[str] = ()) -> None:
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name!r} depends on unknown stage(s): {', '.join(missing)}")
+        self._stages[name] = Stage(name, fn, tuple(deps))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self, reason: str) -> None:
+        if not self._cancel.is_set():
+            self._cancel_reason = reason
+            self._cancel.set()
+
+    def run(self) -> GraphResult:
+        result = GraphResult(deps={name: stage.deps for name, stage in self._stages.items()})
+        origin = time.monotonic()
+        pending = dict(self._stages)
+        running: Dict[Future, str] = {}
+        timings: Dict[str, StageTiming] = {}
+        lock = threading.Lock()
+
+        def execute(stage: Stage, inputs: Mapping[str, Any]) -> Any:
+            started = time.monotonic() - origin
+            try:
+                with span(f"stage.{stage.name}"):
+                    return stage.fn(inputs)
+            finally:
+                with lock:
+                    timings[stage.name] = StageTiming(started, time.monotonic() - origin)
+
+        pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="wake")
+        try:
+            while pending or running:
+                if not self._cancel.is_set():
+                    for name, stage in list(pending.items()):
+                        if any(dep in result.errors for dep in stage.deps):
+                            result.errors[name] = StageSkipped(f"{name}: dependency failed")
+                            del pending[name]
+                        elif all(dep in result.results for dep in stage.deps):
+                            inputs = {dep: result.results[dep] for dep in stage.deps}
+                            running[pool.submit(execute, stage, inputs)] = name
+                            del pending[name]
+                if self._cancel.is_set():
+                    break
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result.results[name] = future.result()
+                    except Exception as exc:  # surfaced to the caller via result.errors
+                        result.errors[name] = exc
+        finally:
+            pool.shutdown(wait=not self._cancel.is_set(), cancel_futures=True)
+
+        if self._cancel.is_set():
+            result.cancel_reason = self._cancel_reason
+            for name in list(pending) + list(running.values()):
+                result.errors.setdefault(name, StageCancelled(f"{name}: {self._cancel_reason}"))
+        with lock:
+            # Stages still winding down after a cancel keep writing to ``timings``.
+            result.timings = dict(timings)
+        return result
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+LOGGER = logging.getLogger(__name__)
+IMPORT_TIME_PREFIX = "import time:"
+
+
+@dataclass(slots=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+def parse_import_time_line(line: str) -> ImportTiming | None:
+    """Parse one ``-X importtime`` line; return ``None`` for the header row."""
+    body = line[len(IMPORT_TIME_PREFIX):]
+    try:
+        self_raw, cumulative_raw, name = body.split("|", 2)
+        self_us = int(self_raw)
+        cumulative_us = int(cumulative_raw)
+    except ValueError:
+        return None
+    module = name.rstrip("\n")
+    depth = (len(module) - len(module.lstrip(" "))) // 2
+    return ImportTiming(module=module.strip(), self_us=self_us, cumulative_us=cumulative_us, depth=depth)
+
+
+def run_with_import_profile(argv: Sequence[str], top: int = 20) -> int:
+    """Re-run ``argv`` under the interpreter's import timer and log a breakdown.
+
+    The child inherits stdout; its stderr is filtered so regular log output still
+    reaches the journal while the ``import time:`` rows are collected.
+    """
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME="1")
+    proc = subprocess.Popen([sys.executable, *argv], stderr=subprocess.PIPE, text=True, env=env)
+    timings: List[ImportTiming] = []
+    assert proc.stderr is not None
+    for line in proc.stderr:
+        if line.startswith(IMPORT_TIME_PREFIX):
+            timing = parse_import_time_line(line)
+            if timing is not None:
+                timings.append(timing)
+        else:
+            sys.stderr.write(line)
+    status = proc.wait()
+    report_import_timings(timings, top=top)
+    return status
+
+
+def report_import_timings(timings: Sequence[ImportTiming], top: int = 20) -> None:
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    by_package: Dict[str, int] = {}
+    for timing in timings:
+        by_package[timing.package] = by_package.get(timing.package, 0) + timing.self_us
+
+    LOGGER.info("Startup imports: %d modules, %.1f ms total", len(timings), total_us / 1000)
+    LOGGER.info("Top packages by import time:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        LOGGER.info("  %-32s %8.1f ms", package, self_us / 1000)
+    LOGGER.info("Top modules by cumulative import time:")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        LOGGER.info(
+            "  %-48s %8.1f ms (self %.1f ms)",
+            timing.module,
+            timing.cumulative_us / 1000,
+            timing.self_us / 1000,
+        )